@@ -0,0 +1,116 @@
+"""
+Benchmark JSON extraction from agent transcripts.
+
+Compares the greedy first-to-last-brace regex the result parser used before
+with the brace-balancing scanner in src.services.json_extract, on synthetic
+transcripts shaped like real agent runs: page text with inline CSS/JS
+braces, intermediate extraction JSON, and a final answer with many related
+posts.
+
+Usage:
+    python -m benchmarks.bench_json_extract [--steps 60] [--posts 300] [--repeat 20]
+"""
+import argparse
+import json
+import random
+import re
+import time
+from typing import Callable, List, Optional
+
+from src.services.json_extract import find_json_object
+
+KEYS = ("url", "question", "sources", "sections", "relatedPosts", "relatedTopics")
+
+
+def build_transcript(steps: int, posts: int, seed: int = 7) -> List[str]:
+    """Build the extracted content of an agent run"""
+    rng = random.Random(seed)
+    words = "water pressure valve pipe shower heater plumber fix leak reddit thread tip".split()
+
+    def sentence(n: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    contents = []
+    for step in range(steps):
+        page = "\n".join(
+            f"{sentence(12)} .btn{{color:#{step:03x}}} if (x) {{ y({i}) }} \"{sentence(3)}\""
+            for i in range(40)
+        )
+        contents.append(f"Step {step}: navigated. Page text:\n{page}")
+        if step % 10 == 5:
+            contents.append(f'Extracted: {{"url": "https://www.reddit.com/answers/{step}", "status": "partial"}}')
+
+    answer = {
+        "url": "https://www.reddit.com/answers/abc",
+        "question": "why is my water pressure low",
+        "sources": [f"https://www.reddit.com/r/sub{i}" for i in range(20)],
+        "sections": [
+            {"heading": sentence(3), "content": [sentence(40) + " {see note}" for _ in range(4)]}
+            for _ in range(10)
+        ],
+        "relatedPosts": [
+            {
+                "rank": str(i + 1),
+                "title": sentence(8),
+                "subreddit": f"sub{i % 20}",
+                "url": f"https://www.reddit.com/r/sub{i % 20}/comments/{i:x}/",
+                "upvotes": rng.randint(0, 5000),
+                "comments": rng.randint(0, 500),
+                "domain": "self.plumbing",
+                "promoted": False,
+                "score": rng.randint(0, 5000)
+            }
+            for i in range(posts)
+        ],
+        "relatedTopics": [sentence(5) for _ in range(10)]
+    }
+    contents.append(f"Task completed. Result: {json.dumps(answer)} Let me know if you need more.")
+    return contents
+
+
+def greedy_regex(texts: List[str]) -> Optional[dict]:
+    """The previous approach: first '{' to last '}' of the joined output"""
+    match = re.search(r"\{.*\}", str(texts), re.DOTALL)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(0))
+    except ValueError:
+        return None
+
+
+def scanner(texts: List[str]) -> Optional[dict]:
+    return find_json_object(texts, KEYS)
+
+
+def bench(name: str, fn: Callable[[List[str]], Optional[dict]], texts: List[str], repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(texts)
+    elapsed = (time.perf_counter() - started) / repeat
+    found = bool(result and len(result.get("relatedPosts", [])) > 0)
+    print(f"{name:<14} {elapsed * 1000:10.2f} ms   answer found: {found}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=60, help="agent steps in the transcript")
+    parser.add_argument("--posts", type=int, default=300, help="related posts in the final answer")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per approach")
+    args = parser.parse_args()
+
+    texts = build_transcript(args.steps, args.posts)
+    size = sum(len(t) for t in texts)
+    print(f"transcript: {len(texts)} entries, {size / 1024:.0f} KiB")
+    bench("greedy regex", greedy_regex, texts, args.repeat)
+    bench("scanner", scanner, texts, args.repeat)
+
+    # The answer alone, as final_result() returns it
+    final = texts[-1:]
+    print(f"final result: {len(final[0]) / 1024:.0f} KiB")
+    bench("greedy regex", greedy_regex, final, args.repeat)
+    bench("scanner", scanner, final, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark task reads through the API.
+
+Compares the previous read path (rebuild the task with its result, return
+the model and let FastAPI validate it against the response model and
+encode it) with the current one (serialize the task envelope and splice in
+the result bytes serialized at completion), for a single finished task and
+for a listing of finished tasks. The current path is also measured with
+gzip accepted and with a matching If-None-Match. Requests go through the
+ASGI app in process, so the numbers include routing but no network.
+
+Usage:
+    python -m benchmarks.bench_task_read [--posts 300] [--tasks 50] [--repeat 200]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List, Optional
+from unittest.mock import AsyncMock
+
+import httpx
+from fastapi import FastAPI
+
+from src.models import ContentSection, ExtractionResult, PostMetadata, TaskInfo, TaskStatusResponse
+
+
+def build_result(question: str, posts: int) -> ExtractionResult:
+    """A result shaped like a large answers page"""
+    return ExtractionResult(
+        url="https://www.reddit.com/answers/abc",
+        question=question,
+        sources=[f"https://www.reddit.com/r/sub{i}" for i in range(20)],
+        sections=[
+            ContentSection(heading=f"Section {i}", content=["Check the pressure regulator. " * 8] * 3)
+            for i in range(8)
+        ],
+        relatedPosts=[
+            PostMetadata(
+                rank=str(i + 1),
+                title=f"Low water pressure after replacing the valve ({i})",
+                subreddit=f"sub{i % 20}",
+                url=f"https://www.reddit.com/r/sub{i % 20}/comments/{i:x}/",
+                upvotes=i * 7,
+                comments=i,
+                domain="self.plumbing"
+            )
+            for i in range(posts)
+        ],
+        relatedTopics=[f"related question {i}" for i in range(10)]
+    )
+
+
+def legacy_routes(app: FastAPI, task_manager):
+    """The read endpoints as they were before the result JSON cache"""
+
+    @app.get("/legacy/tasks/{task_id}", response_model=TaskStatusResponse)
+    async def get_task_status(task_id: str):
+        return task_manager.task_snapshot(task_manager.get_task(task_id))
+
+    @app.get("/legacy/tasks", response_model=List[TaskInfo])
+    async def list_tasks(limit: int = 100):
+        return task_manager.list_tasks(limit=limit)
+
+
+async def bench(client: httpx.AsyncClient, path: str, repeat: int, headers: Optional[dict] = None) -> float:
+    """Best per-request time over several rounds"""
+    headers = {"Accept-Encoding": "identity", **(headers or {})}
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            response = await client.get(path, headers=headers)
+            assert response.status_code in (200, 304)
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best
+
+
+async def run(posts: int, tasks: int, repeat: int):
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["RESULT_CACHE_BACKEND"] = "memory"
+    os.environ["RESULT_SPILL_DIR"] = tempfile.mkdtemp()
+
+    import src.main as main
+    from src.services.task_manager import TaskManager
+
+    task_manager = TaskManager(max_concurrent_tasks=2)
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(
+        side_effect=lambda question, **kwargs: build_result(question, posts)
+    )
+    task_ids = [task_manager.create_task(f"question {i}") for i in range(tasks)]
+    for task_id in task_ids:
+        await task_manager.execute_task(task_id)
+    main.task_manager = task_manager
+    legacy_routes(main.app, task_manager)
+
+    first = task_manager.get_task(task_ids[0], load_result=False)
+    size = len(task_manager.result_json_bytes(first))
+    print(f"result: {size / 1024:.0f} KiB, spilled: {bool(first.metadata.get('result_spilled'))}")
+    print(f"{'read':<10} {'legacy':>12} {'current':>12} {'speedup':>8} {'gzip':>12} {'304':>12}")
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, path, count in (
+            ("task", f"/tasks/{task_ids[0]}", repeat),
+            ("listing", f"/tasks?limit={tasks}", max(1, repeat // tasks))
+        ):
+            old = await bench(client, f"/legacy{path}", count)
+            new = await bench(client, f"/api/v1{path}", count)
+            gzipped = await bench(client, f"/api/v1{path}", count, {"Accept-Encoding": "gzip"})
+            etag = (await client.get(f"/api/v1{path}")).headers["etag"]
+            unchanged = await bench(client, f"/api/v1{path}", count, {"If-None-Match": etag})
+            print(
+                f"{name:<10} {old * 1e6:>9.0f} us {new * 1e6:>9.0f} us {old / new:>7.2f}x"
+                f" {gzipped * 1e6:>9.0f} us {unchanged * 1e6:>9.0f} us"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=300, help="related posts per result")
+    parser.add_argument("--tasks", type=int, default=50, help="finished tasks in the listing")
+    parser.add_argument("--repeat", type=int, default=200, help="requests per measurement")
+    args = parser.parse_args()
+    asyncio.run(run(args.posts, args.tasks, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
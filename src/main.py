@@ -3,24 +3,35 @@ FastAPI-based web content extraction platform.
 Industrial-grade automated content extraction service.
 """
 import logging
+import math
 import os
 from contextlib import asynccontextmanager
 from typing import List, Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Query, status
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 from src.models import (
+    BatchExtractionRequest,
     ExtractionRequest,
     ExtractionResult,
     TaskCreateResponse,
+    TaskGroupCreateResponse,
+    TaskGroupStatusResponse,
+    TaskPriority,
     TaskStatus,
     TaskStatusResponse,
     TaskInfo
 )
+from src.services import metrics
+from src.services.circuit_breaker import CircuitOpenError
+from src.services.extraction_service import ExtractionTimeoutError
+from src.services.json_response import create_response_encoder
+from src.services.scheduler import QueueFullError
 from src.services.task_manager import TaskManager
+from src.services.work_queue import create_work_queue
 
 # Load environment variables
 load_dotenv()
@@ -35,6 +46,15 @@ logger = logging.getLogger(__name__)
 # Global task manager instance
 task_manager: Optional[TaskManager] = None
 
+# Idle seconds between keep-alives on task event streams
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+# Longest long-poll accepted by the task status endpoint
+MAX_WAIT_SECONDS = float(os.getenv("MAX_WAIT_SECONDS", "120"))
+
+# ETags and compression for the task read endpoints
+response_encoder = create_response_encoder()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -46,7 +66,15 @@ async def lifespan(app: FastAPI):
     
     # Initialize task manager
     max_concurrent = int(os.getenv("MAX_CONCURRENT_TASKS", "5"))
-    task_manager = TaskManager(max_concurrent_tasks=max_concurrent)
+    
+    # In queue mode tasks are only enqueued here and run by `python -m src.worker`
+    work_queue = None
+    if os.getenv("TASK_EXECUTION_MODE", "local").lower() == "queue":
+        work_queue = create_work_queue()
+    task_manager = TaskManager(max_concurrent_tasks=max_concurrent, work_queue=work_queue)
+    
+    # Fill the Steel session pool before serving traffic
+    await task_manager.start()
     
     logger.info("Platform started successfully")
     
@@ -54,6 +82,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down platform...")
+    await task_manager.close()
+    if work_queue is not None:
+        work_queue.close()
 
 
 # Create FastAPI app
@@ -71,6 +102,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
@@ -88,6 +120,16 @@ async def global_exception_handler(request, exc):
     )
 
 
+def _unavailable(error: CircuitOpenError) -> HTTPException:
+    """503 telling the client when the failing dependency will be retried"""
+    logger.warning(f"Rejected extraction: {error}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+    )
+
+
 # Health check endpoint
 @app.get("/health", tags=["System"])
 async def health_check():
@@ -107,10 +149,39 @@ async def get_statistics():
         raise HTTPException(status_code=503, detail="Service not ready")
     
     stats = task_manager.get_statistics()
-    return {
+    response = {
         "statistics": stats,
-        "max_concurrent_tasks": task_manager.max_concurrent_tasks
+        "max_concurrent_tasks": task_manager.max_concurrent_tasks,
+        "concurrency": task_manager.semaphore.get_statistics(),
+        "circuits": task_manager.extraction_service.get_circuit_statistics(),
+        "trajectory": task_manager.extraction_service.get_trajectory_statistics(),
+        "tokens": task_manager.get_token_statistics(),
+        "queue": task_manager.get_queue_statistics(),
+        "groups": len(task_manager.groups),
+        "result_json": task_manager.result_json.get_statistics(),
+        "responses": response_encoder.get_statistics()
     }
+    if task_manager.result_cache:
+        response["cache"] = task_manager.result_cache.get_statistics()
+    return response
+
+
+# Prometheus metrics endpoint
+@app.get("/metrics", tags=["System"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    if task_manager:
+        for name, count in task_manager.get_statistics().items():
+            if name in TaskStatus._value2member_map_:
+                metrics.TASKS_BY_STATUS.labels(name).set(count)
+        for name, depth in task_manager.get_queue_statistics().items():
+            if name in TaskPriority._value2member_map_:
+                metrics.TASK_QUEUE_DEPTH.labels(name).set(depth)
+    
+    return PlainTextResponse(
+        metrics.registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 # Extraction endpoints
@@ -125,7 +196,9 @@ async def create_extraction_task(request: ExtractionRequest):
     Create a new content extraction task.
     
     The task will be executed asynchronously. Use the returned task_id
-    to check the status and retrieve results.
+    to check the status and retrieve results. Tasks wait in a priority
+    queue for a free slot; when the queue is full the request is
+    rejected with 429.
     
     Args:
         request: Extraction request with question
@@ -138,17 +211,31 @@ async def create_extraction_task(request: ExtractionRequest):
     
     try:
         # Create task
-        task_id = task_manager.create_task(request.question)
+        task_id = task_manager.create_task(
+            request.question,
+            max_age=request.max_age,
+            no_cache=request.no_cache,
+            priority=request.priority,
+            timeout_seconds=request.timeout_seconds,
+            max_steps=request.max_steps
+        )
         
         # Submit for execution
-        task_manager.submit_task(task_id)
+        queue_position = task_manager.submit_task(task_id)
+        task = task_manager.get_task(task_id)
         
         return TaskCreateResponse(
             task_id=task_id,
-            status=TaskStatus.PENDING,
-            message="Task created and submitted for processing"
+            status=task.status if task else TaskStatus.PENDING,
+            message="Task created and submitted for processing",
+            queue_position=queue_position
         )
         
+    except QueueFullError as e:
+        logger.warning(f"Rejected task: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except CircuitOpenError as e:
+        raise _unavailable(e)
     except ValueError as e:
         logger.error(f"Invalid request: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -157,17 +244,146 @@ async def create_extraction_task(request: ExtractionRequest):
         raise HTTPException(status_code=500, detail="Failed to create extraction task")
 
 
+@app.post(
+    "/api/v1/extract/batch",
+    response_model=TaskGroupCreateResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Extraction"]
+)
+async def create_batch_extraction(request: BatchExtractionRequest):
+    """
+    Create one extraction task per question as a task group.
+    
+    Batch tasks default to low priority and share one scheduler flow that
+    takes turns with other traffic, so large batches do not starve
+    interactive requests. The whole batch is rejected with 429 if the
+    queue cannot hold it.
+    
+    Args:
+        request: Batch request with questions
+        
+    Returns:
+        Group ID and the IDs of the created tasks
+    """
+    if not task_manager:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    try:
+        group = task_manager.create_group(
+            request.questions,
+            max_age=request.max_age,
+            no_cache=request.no_cache,
+            priority=request.priority,
+            timeout_seconds=request.timeout_seconds,
+            max_steps=request.max_steps
+        )
+    except QueueFullError as e:
+        logger.warning(f"Rejected batch: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    except CircuitOpenError as e:
+        raise _unavailable(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return TaskGroupCreateResponse(
+        group_id=group.group_id,
+        task_ids=group.task_ids,
+        total=len(group.task_ids),
+        message="Task group created and submitted for processing"
+    )
+
+
+@app.get(
+    "/api/v1/groups/{group_id}",
+    response_model=TaskGroupStatusResponse,
+    tags=["Extraction"]
+)
+async def get_group_status(group_id: str):
+    """
+    Get aggregate progress of a task group.
+    
+    Args:
+        group_id: Group ID from batch creation
+        
+    Returns:
+        Task counts by status and whether every task finished
+    """
+    if not task_manager:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    group = task_manager.get_group_status(group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="Task group not found")
+    return group
+
+
+@app.get(
+    "/api/v1/groups/{group_id}/results",
+    tags=["Extraction"]
+)
+async def stream_group_results(group_id: str):
+    """
+    Stream the results of a task group as newline-delimited JSON.
+    
+    Each line is the TaskStatusResponse of one finished task, in completion
+    order; already finished tasks come first. The stream ends when every
+    task has finished. Blank lines are sent as keep-alives.
+    
+    Args:
+        group_id: Group ID from batch creation
+        
+    Returns:
+        application/x-ndjson stream
+    """
+    if not task_manager:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    if task_manager.get_group(group_id) is None:
+        raise HTTPException(status_code=404, detail="Task group not found")
+    
+    async def result_stream():
+        async for snapshot in task_manager.watch_group(group_id, heartbeat=STREAM_HEARTBEAT_SECONDS):
+            if snapshot is None:
+                yield "\n"
+                continue
+            yield snapshot.model_dump_json() + "\n"
+    
+    return StreamingResponse(
+        result_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get(
     "/api/v1/tasks/{task_id}",
     response_model=TaskStatusResponse,
     tags=["Extraction"]
 )
-async def get_task_status(task_id: str):
+async def get_task_status(
+    request: Request,
+    task_id: str,
+    wait: Optional[float] = Query(
+        None,
+        ge=0,
+        le=MAX_WAIT_SECONDS,
+        description="Hold the request up to this many seconds until the task finishes"
+    )
+):
     """
     Get the status and result of an extraction task.
     
+    With `wait`, the request is held until the task reaches a final status
+    or the wait expires, and then returns the task as it is at that point.
+    The result of a finished task is served as serialized at completion.
+    Responses carry an ETag; send it back in `If-None-Match` to get a 304
+    while the task is unchanged. Large responses are gzip (or brotli)
+    compressed for clients that accept it.
+    
     Args:
+        request: Incoming request
         task_id: Task ID from task creation
+        wait: Long-poll timeout in seconds (optional)
         
     Returns:
         Task status and result (if completed)
@@ -175,36 +391,129 @@ async def get_task_status(task_id: str):
     if not task_manager:
         raise HTTPException(status_code=503, detail="Service not ready")
     
-    task = task_manager.get_task(task_id)
+    if wait:
+        task = await task_manager.wait_for_task(task_id, wait, load_result=False)
+    else:
+        task = task_manager.get_task(task_id, load_result=False)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return TaskStatusResponse(
-        task_id=task.task_id,
-        status=task.status,
-        progress=task.metadata.get("progress"),
-        result=task.result,
-        error=task.error,
-        created_at=task.created_at,
-        updated_at=task.updated_at
+    return response_encoder.respond(
+        request,
+        task_manager.task_status_etag(task),
+        lambda: task_manager.task_status_json(task),
+        final=task.status not in (TaskStatus.PENDING, TaskStatus.RUNNING)
+    )
+
+
+def _event_name(snapshot: TaskStatusResponse) -> str:
+    """Stream event name: status while the task is active, then result"""
+    if snapshot.status in (TaskStatus.PENDING, TaskStatus.RUNNING):
+        return "status"
+    return "result"
+
+
+@app.get(
+    "/api/v1/tasks/{task_id}/events",
+    tags=["Extraction"]
+)
+async def stream_task_events(task_id: str):
+    """
+    Stream task updates as Server-Sent Events.
+    
+    Sends the current state, then a `status` event on every status or
+    progress change and a final `result` event when the task finishes,
+    after which the stream ends. Idle streams receive keep-alive comments.
+    A WebSocket on the same path delivers the same events as JSON messages.
+    
+    Args:
+        task_id: Task ID from task creation
+        
+    Returns:
+        text/event-stream of TaskStatusResponse payloads
+    """
+    if not task_manager:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    if not task_manager.get_task(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    async def event_stream():
+        async for snapshot in task_manager.watch_task(task_id, heartbeat=STREAM_HEARTBEAT_SECONDS):
+            if snapshot is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {_event_name(snapshot)}\ndata: {snapshot.model_dump_json()}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
+@app.websocket("/api/v1/tasks/{task_id}/events")
+async def task_events_websocket(websocket: WebSocket, task_id: str):
+    """
+    Stream task updates over a WebSocket.
+    
+    Each message is {"event": "status" | "result" | "heartbeat", "data": ...}.
+    The server closes the socket after the result, with code 4404 for
+    unknown tasks and 1013 while the service is starting.
+    
+    Args:
+        websocket: Client connection
+        task_id: Task ID from task creation
+    """
+    await websocket.accept()
+    
+    if not task_manager:
+        await websocket.close(code=1013, reason="Service not ready")
+        return
+    
+    if not task_manager.get_task(task_id):
+        await websocket.close(code=4404, reason="Task not found")
+        return
+    
+    try:
+        async for snapshot in task_manager.watch_task(task_id, heartbeat=STREAM_HEARTBEAT_SECONDS):
+            if snapshot is None:
+                await websocket.send_json({"event": "heartbeat"})
+                continue
+            await websocket.send_json({
+                "event": _event_name(snapshot),
+                "data": snapshot.model_dump(mode="json")
+            })
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Event stream client for task {task_id} disconnected")
+
+
 @app.get(
     "/api/v1/tasks",
     response_model=List[TaskInfo],
     tags=["Extraction"]
 )
 async def list_tasks(
+    request: Request,
     status: Optional[TaskStatus] = Query(None, description="Filter by status"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of tasks")
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of tasks"),
+    after: Optional[str] = Query(None, description="Cursor: return tasks older than this task ID"),
+    before: Optional[str] = Query(None, description="Cursor: return tasks newer than this task ID")
 ):
     """
     List extraction tasks with optional filtering.
     
+    Tasks are returned newest first. To page through large listings pass
+    the last task_id of a page as `after` (or the first as `before`).
+    Listings support `If-None-Match` and compression like task reads.
+    
     Args:
+        request: Incoming request
         status: Filter by task status (optional)
         limit: Maximum number of tasks to return
+        after: Cursor task ID for the next (older) page
+        before: Cursor task ID for the previous (newer) page
         
     Returns:
         List of task information
@@ -212,8 +521,25 @@ async def list_tasks(
     if not task_manager:
         raise HTTPException(status_code=503, detail="Service not ready")
     
-    tasks = task_manager.list_tasks(status=status, limit=limit)
-    return tasks
+    if after and before:
+        raise HTTPException(status_code=400, detail="Use either after or before, not both")
+    
+    try:
+        tasks = task_manager.list_tasks(
+            status=status,
+            limit=limit,
+            after=after,
+            before=before,
+            load_results=False
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return response_encoder.respond(
+        request,
+        task_manager.task_list_etag(tasks),
+        lambda: task_manager.task_list_json(tasks),
+        final=all(task.status not in (TaskStatus.PENDING, TaskStatus.RUNNING) for task in tasks)
+    )
 
 
 @app.delete(
@@ -222,7 +548,9 @@ async def list_tasks(
 )
 async def cancel_task(task_id: str):
     """
-    Cancel a pending extraction task.
+    Cancel a pending or running extraction task.
+    
+    A running extraction is stopped and its browser session released.
     
     Args:
         task_id: Task ID to cancel
@@ -237,7 +565,7 @@ async def cancel_task(task_id: str):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    if task.status != TaskStatus.PENDING:
+    if task.status not in (TaskStatus.PENDING, TaskStatus.RUNNING):
         raise HTTPException(
             status_code=400,
             detail=f"Cannot cancel task with status: {task.status}"
@@ -263,6 +591,8 @@ async def extract_sync(request: ExtractionRequest):
     
     Warning: This endpoint will block until extraction completes.
     For production use, prefer the async endpoint (/api/v1/extract).
+    If the extraction runs out of its time or step budget the response is
+    504 with any partial result.
     
     Args:
         request: Extraction request with question
@@ -274,12 +604,28 @@ async def extract_sync(request: ExtractionRequest):
         raise HTTPException(status_code=503, detail="Service not ready")
     
     try:
-        # Execute extraction directly
-        result = await task_manager.extraction_service.extract_reddit_answers(
-            request.question
+        # Execute extraction directly (cached or shared with identical requests)
+        result = await task_manager.extract(
+            request.question,
+            max_age=request.max_age,
+            no_cache=request.no_cache,
+            timeout_seconds=request.timeout_seconds,
+            max_steps=request.max_steps
         )
         return result
         
+    except ExtractionTimeoutError as e:
+        logger.warning(f"Extraction timed out: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content={
+                "error": str(e),
+                "status": TaskStatus.TIMED_OUT.value,
+                "partial_result": e.partial.model_dump(mode="json") if e.partial else None
+            }
+        )
+    except CircuitOpenError as e:
+        raise _unavailable(e)
     except ValueError as e:
         logger.error(f"Invalid request: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -301,9 +647,14 @@ async def root():
             "docs": "/docs",
             "async_extract": "/api/v1/extract",
             "sync_extract": "/api/v1/extract/sync",
+            "batch_extract": "/api/v1/extract/batch",
+            "group_status": "/api/v1/groups/{group_id}",
+            "group_results": "/api/v1/groups/{group_id}/results",
             "task_status": "/api/v1/tasks/{task_id}",
+            "task_events": "/api/v1/tasks/{task_id}/events",
             "list_tasks": "/api/v1/tasks",
-            "statistics": "/api/v1/stats"
+            "statistics": "/api/v1/stats",
+            "metrics": "/metrics"
         }
     }
 
@@ -3,7 +3,7 @@ Data models for the web content extraction platform.
 Follows the structure defined in examples/README.md
 """
 from typing import List, Optional, Any, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from enum import Enum
 
@@ -15,10 +15,39 @@ class TaskStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+
+class TaskPriority(str, Enum):
+    """Task scheduling priority"""
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
 
 
 # Input Models
-class ExtractionRequest(BaseModel):
+class ExtractionOptions(BaseModel):
+    """Options shared by single and batch extraction requests"""
+    max_age: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Accept a cached result only if it is at most this many seconds old"
+    )
+    no_cache: bool = Field(False, description="Skip the result cache and run a fresh extraction")
+    priority: TaskPriority = Field(TaskPriority.NORMAL, description="Scheduling priority of the task")
+    timeout_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Time budget for the extraction (defaults to EXTRACTION_TIMEOUT_SECONDS)"
+    )
+    max_steps: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Agent step budget for the extraction (defaults to AGENT_MAX_STEPS)"
+    )
+
+
+class ExtractionRequest(ExtractionOptions):
     """Input schema for extraction requests"""
     question: str = Field(..., description="Question to search for answers")
     
@@ -30,6 +59,22 @@ class ExtractionRequest(BaseModel):
         }
 
 
+class BatchExtractionRequest(ExtractionOptions):
+    """Input schema for batch extraction requests"""
+    questions: List[str] = Field(..., min_length=1, description="Questions to search for answers")
+    priority: TaskPriority = Field(TaskPriority.LOW, description="Scheduling priority of the batch tasks")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "questions": [
+                    "tips to improve water pressure",
+                    "how many planet are in our solar system?"
+                ]
+            }
+        }
+
+
 # Output Models
 class PostMetadata(BaseModel):
     """Related post metadata"""
@@ -46,24 +91,18 @@ class PostMetadata(BaseModel):
     class Config:
         # Allow coercion of types (int -> str for rank)
         coerce_numbers_to_str = True
-        
+    
+    @field_validator("title", "subreddit", "url", "domain", mode="before")
     @classmethod
-    def model_validate(cls, obj):
-        """Custom validation to handle type conversions"""
-        if isinstance(obj, dict):
-            # Convert rank to string if it's an int
-            if 'rank' in obj and isinstance(obj['rank'], int):
-                obj['rank'] = str(obj['rank'])
-            # Handle None values
-            if obj.get('domain') is None:
-                obj['domain'] = ""
-            if obj.get('upvotes') is None:
-                obj['upvotes'] = 0
-            if obj.get('comments') is None:
-                obj['comments'] = 0
-            if obj.get('score') is None:
-                obj['score'] = 0
-        return super().model_validate(obj)
+    def _none_to_empty(cls, value: Any) -> Any:
+        """Agents report missing text fields as null"""
+        return "" if value is None else value
+    
+    @field_validator("upvotes", "comments", "score", mode="before")
+    @classmethod
+    def _none_to_zero(cls, value: Any) -> Any:
+        """Agents report missing counts as null"""
+        return 0 if value is None else value
 
 
 class ContentSection(BaseModel):
@@ -115,11 +154,20 @@ class TaskInfo(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+class TaskGroupInfo(BaseModel):
+    """Group of tasks submitted together by a batch request"""
+    group_id: str
+    created_at: datetime
+    task_ids: List[str] = Field(default_factory=list)
+    counts: Dict[TaskStatus, int] = Field(default_factory=dict)
+
+
 class TaskCreateResponse(BaseModel):
     """Response after creating a task"""
     task_id: str
     status: TaskStatus
     message: str
+    queue_position: Optional[int] = None
 
 
 class TaskStatusResponse(BaseModel):
@@ -127,7 +175,27 @@ class TaskStatusResponse(BaseModel):
     task_id: str
     status: TaskStatus
     progress: Optional[str] = None
+    queue_position: Optional[int] = None
     result: Optional[ExtractionResult] = None
     error: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+
+
+class TaskGroupCreateResponse(BaseModel):
+    """Response after creating a task group"""
+    group_id: str
+    task_ids: List[str]
+    total: int
+    message: str
+
+
+class TaskGroupStatusResponse(BaseModel):
+    """Aggregate progress of a task group"""
+    group_id: str
+    total: int
+    finished: int
+    done: bool
+    counts: Dict[TaskStatus, int]
+    task_ids: List[str]
+    created_at: datetime
@@ -0,0 +1,222 @@
+"""
+Circuit breakers and retry with jitter for external dependencies.
+A breaker opens after consecutive failures of a dependency so callers fail
+fast instead of holding a concurrency slot while it is down, then lets a
+single probe call through to find out whether it recovered.
+"""
+import asyncio
+import logging
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from src.services.metrics import CIRCUIT_REJECTIONS, CIRCUIT_STATE
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because a dependency's breaker is open"""
+
+    def __init__(self, dependency: str, retry_after: float):
+        super().__init__(
+            f"{dependency} is unavailable (circuit open, retry in {retry_after:.0f}s)"
+        )
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Initialize circuit breaker
+
+        Args:
+            name: Dependency name used in errors, logs and metrics
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds the circuit stays open before a probe
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open = False
+        self._probing = False
+        self.opened_total = 0
+        self.rejected_total = 0
+
+        CIRCUIT_STATE.labels(name).set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open"""
+        if not self._open:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= self.recovery_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through"""
+        if not self._open:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def check(self):
+        """
+        Fail fast if the circuit is open, without taking a probe
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if self.state == OPEN:
+            self._reject()
+
+    def acquire(self):
+        """
+        Ask to make a call; in half-open state only one probe is let through
+
+        Raises:
+            CircuitOpenError: If the call is refused
+        """
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[HALF_OPEN])
+            logger.info(f"Circuit {self.name} half-open, probing")
+            return
+        self._reject()
+
+    def record_success(self):
+        """Record a call that reached a healthy dependency"""
+        if self._open:
+            logger.info(f"Circuit {self.name} closed")
+            CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[CLOSED])
+        self._failures = 0
+        self._open = False
+        self._probing = False
+
+    def record_failure(self):
+        """Record a call failed by the dependency"""
+        self._failures += 1
+        if self._probing or (not self._open and self._failures >= self.failure_threshold):
+            if not self._open:
+                self.opened_total += 1
+            logger.warning(
+                f"Circuit {self.name} open for {self.recovery_timeout:g}s "
+                f"after {self._failures} consecutive failures"
+            )
+            self._open = True
+            self._opened_at = time.monotonic()
+            CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[OPEN])
+        self._probing = False
+
+    @contextmanager
+    def guard(self, is_failure: Optional[Callable[[Exception], bool]] = None) -> Iterator[None]:
+        """
+        Run a call under the breaker
+
+        Args:
+            is_failure: Tells whether an exception is a dependency failure;
+                others show the dependency answered and count as success
+                (default: every exception is a failure)
+
+        Raises:
+            CircuitOpenError: If the call is refused
+        """
+        self.acquire()
+        try:
+            yield
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # Cancelled before an answer; the probe slot is free again
+            self._probing = False
+            raise
+        else:
+            self.record_success()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get breaker statistics
+
+        Returns:
+            Dictionary with the state, consecutive failures and counters
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_after_seconds": round(self.retry_after, 1),
+            "opened_total": self.opened_total,
+            "rejected_total": self.rejected_total
+        }
+
+    def _reject(self):
+        self.rejected_total += 1
+        CIRCUIT_REJECTIONS.labels(self.name).inc()
+        raise CircuitOpenError(self.name, self.retry_after)
+
+
+async def retry_with_jitter(
+    fn: Callable[[], Awaitable[T]],
+    attempts: int = 3,
+    base_delay: float = 0.5,
+    max_delay: float = 10.0,
+    breaker: Optional[CircuitBreaker] = None
+) -> T:
+    """
+    Call an async function, retrying failures with full-jitter backoff
+
+    Each attempt goes through the breaker, so retries stop as soon as the
+    circuit opens.
+
+    Args:
+        fn: Function making one attempt
+        attempts: Maximum number of attempts
+        base_delay: Upper bound in seconds of the first backoff, doubled
+            after every attempt
+        max_delay: Cap on the backoff upper bound
+        breaker: Circuit breaker guarding the dependency
+
+    Returns:
+        Result of the first successful attempt
+
+    Raises:
+        CircuitOpenError: If the breaker refuses an attempt
+        Exception: The last failure once attempts run out
+    """
+    for attempt in range(attempts):
+        try:
+            if breaker is None:
+                return await fn()
+            with breaker.guard():
+                return await fn()
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            if attempt + 1 >= attempts:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            name = breaker.name if breaker else "call"
+            logger.warning(f"{name} attempt {attempt + 1}/{attempts} failed: {e}; retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
@@ -0,0 +1,153 @@
+"""
+Adaptive concurrency limit for extraction runs.
+An asyncio semaphore whose number of permits follows AIMD: it grows by one
+per limit's worth of healthy runs and is cut back when runs fail or their
+latency climbs well above its usual level, staying within min/max bounds.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """Semaphore with a limit adjusted from run latency and failures"""
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: Optional[int] = None,
+        backoff: float = 0.75,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2,
+        baseline_smoothing: float = 0.02
+    ):
+        """
+        Initialize limiter, starting at the maximum limit
+
+        Args:
+            max_limit: Upper bound of the limit
+            min_limit: Lower bound of the limit (defaults to max_limit,
+                which makes the limit fixed)
+            backoff: Factor applied to the limit on overload
+            latency_tolerance: Overload when recent latency exceeds the
+                baseline latency by this factor
+            smoothing: Weight of a new sample in the recent latency average
+            baseline_smoothing: Weight of a new sample in the baseline average
+        """
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(min_limit if min_limit is not None else max_limit, max_limit))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.baseline_smoothing = baseline_smoothing
+
+        self._limit = float(max_limit)
+        self._in_use = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self.decreases = 0
+        # Runs started before a decrease report on the old limit
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Number of runs currently allowed at once"""
+        return int(self._limit)
+
+    @property
+    def in_use(self) -> int:
+        """Number of permits held"""
+        return self._in_use
+
+    def locked(self) -> bool:
+        """Check whether acquire would wait"""
+        return self._in_use >= self.limit or bool(self._waiters)
+
+    async def acquire(self):
+        """Wait for a permit"""
+        if not self.locked():
+            self._in_use += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before the cancellation; pass it on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self):
+        """Return a permit"""
+        self._in_use -= 1
+        self._wake()
+
+    def record(self, latency: float, ok: bool = True, started: Optional[float] = None):
+        """
+        Adjust the limit from the outcome of a run
+
+        Args:
+            latency: Run duration in seconds
+            ok: False if the run failed
+            started: time.monotonic() when the run started; runs that started
+                before the last decrease cannot trigger another one
+        """
+        if self.latency is None:
+            self.latency = self.baseline = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+            self.baseline += self.baseline_smoothing * (latency - self.baseline)
+
+        overloaded = not ok or self.latency > self.baseline * self.latency_tolerance
+        if overloaded:
+            if started is not None and started < self._last_decrease:
+                return
+            self._set_limit(self._limit * self.backoff)
+            self._last_decrease = time.monotonic()
+            self.decreases += 1
+        else:
+            # Additive increase: about one permit per limit's worth of runs
+            self._set_limit(self._limit + 1 / max(self._limit, 1))
+
+    def get_statistics(self) -> Dict[str, float]:
+        """
+        Get limiter statistics
+
+        Returns:
+            Dictionary with the current limit and its bounds, permits in use,
+            waiting acquirers and the latency averages
+        """
+        return {
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_use": self._in_use,
+            "waiting": len(self._waiters),
+            "latency_seconds": round(self.latency, 3) if self.latency is not None else None,
+            "baseline_latency_seconds": round(self.baseline, 3) if self.baseline is not None else None,
+            "decreases": self.decreases
+        }
+
+    def _set_limit(self, value: float):
+        previous = self.limit
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), value))
+        if self.limit != previous:
+            logger.info(f"Concurrency limit changed from {previous} to {self.limit}")
+            self._wake()
+
+    def _wake(self):
+        while self._waiters and self._in_use < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_use += 1
+                waiter.set_result(None)
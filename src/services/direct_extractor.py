@@ -0,0 +1,308 @@
+"""
+Deterministic Reddit Answers extractor.
+Loads the answers page for a question in the task's browser with a fixed
+script (open the search URL, wait for the answer to render, expand "View
+all") and parses the rendered layout into an ExtractionResult, with no LLM.
+Results that fail validation raise DirectExtractionError so the caller can
+fall back to the browser agent on the same browser.
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse
+
+from src.models import ContentSection, ExtractionResult, PostMetadata
+
+logger = logging.getLogger(__name__)
+
+REDDIT_ORIGIN = "https://www.reddit.com"
+ANSWERS_URL = f"{REDDIT_ORIGIN}/answers/"
+
+_SUBREDDIT_PATH = re.compile(r"^/r/([A-Za-z0-9_]+)/?$")
+_POST_PATH = re.compile(r"^/r/([A-Za-z0-9_]+)/comments/[A-Za-z0-9]+(?:/[^?#]*)?$")
+_ANSWERS_PATH = re.compile(r"^/answers/")
+
+_HEADINGS = {"h1", "h2", "h3", "h4"}
+_TEXT_BLOCKS = {"p", "li"}
+# Page chrome whose text is never part of the answer
+_SKIPPED = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside"}
+
+# Error and interstitial pages can have a heading and a sentence; an
+# answer has paragraphs
+MIN_ANSWER_CHARS = 100
+
+# Runs in the page: expands the related posts once, then resolves with the
+# rendered document when the thread links stop changing or time runs out
+_RENDER_SCRIPT = """(timeoutMs, settleMs) => new Promise((resolve) => {
+    const started = Date.now();
+    let expanded = false;
+    let seen = -1;
+    let changedAt = started;
+    const tick = () => {
+        if (!expanded) {
+            const more = Array.from(document.querySelectorAll("button, a"))
+                .find((el) => /^\\s*view all\\s*$/i.test(el.textContent || ""));
+            if (more) {
+                more.click();
+                expanded = true;
+            }
+        }
+        const threads = document.querySelectorAll("a[href*='/comments/']").length;
+        if (threads !== seen) {
+            seen = threads;
+            changedAt = Date.now();
+        }
+        const settled = threads > 0 && Date.now() - changedAt >= settleMs;
+        if (settled || Date.now() - started >= timeoutMs) {
+            resolve(JSON.stringify({url: location.href, html: document.documentElement.outerHTML}));
+        } else {
+            setTimeout(tick, 250);
+        }
+    };
+    tick();
+})"""
+
+
+class DirectExtractionError(Exception):
+    """Raised when the deterministic extractor cannot produce a valid result"""
+
+
+class _AnswersPageParser(HTMLParser):
+    """Collects headings, text blocks and links of an answers page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[Tuple[str, str]] = []
+        self.links: List[Tuple[str, str]] = []
+
+        self._skip_depth = 0
+        self._block: Optional[str] = None
+        self._block_text: List[str] = []
+        self._link: Optional[str] = None
+        self._link_text: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs):
+        if tag in _SKIPPED:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+
+        if tag in _HEADINGS or tag in _TEXT_BLOCKS:
+            # Nested blocks (a paragraph inside a list item) end the outer one
+            self._end_block()
+            self._block = tag
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self._link = href
+                self._link_text = []
+
+    def handle_endtag(self, tag: str):
+        if tag in _SKIPPED:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth:
+            return
+
+        if tag == self._block:
+            self._end_block()
+        elif tag == "a" and self._link is not None:
+            self.links.append((self._link, _clean("".join(self._link_text))))
+            self._link = None
+
+    def handle_data(self, data: str):
+        if self._skip_depth:
+            return
+        if self._block is not None:
+            self._block_text.append(data)
+        if self._link is not None:
+            self._link_text.append(data)
+
+    def close(self):
+        super().close()
+        self._end_block()
+
+    def _end_block(self):
+        if self._block is not None:
+            text = _clean("".join(self._block_text))
+            if text:
+                self.blocks.append((self._block, text))
+        self._block = None
+        self._block_text = []
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def parse_answers_page(html: str, url: str, question: str) -> ExtractionResult:
+    """
+    Parse a Reddit Answers page
+
+    Args:
+        html: Page HTML
+        url: Final URL of the page
+        question: Question the page answers
+
+    Returns:
+        ExtractionResult built from the page
+    """
+    parser = _AnswersPageParser()
+    parser.feed(html)
+    parser.close()
+
+    # Answer sections: each heading collects the text blocks that follow it;
+    # the page title (the question itself) does not start a section
+    sections: List[ContentSection] = []
+    for tag, text in parser.blocks:
+        if tag in _HEADINGS:
+            if tag == "h1" and not sections:
+                continue
+            sections.append(ContentSection(heading=text, content=[]))
+        elif sections:
+            sections[-1].content.append(text)
+    sections = [s for s in sections if s.content]
+
+    sources: List[str] = []
+    posts: Dict[str, PostMetadata] = {}
+    topics: List[str] = []
+    for href, text in parser.links:
+        absolute = urljoin(REDDIT_ORIGIN, href)
+        parsed = urlparse(absolute)
+        if not parsed.netloc.endswith("reddit.com"):
+            continue
+
+        subreddit = _SUBREDDIT_PATH.match(parsed.path)
+        post = _POST_PATH.match(parsed.path)
+        if subreddit:
+            source = f"{REDDIT_ORIGIN}/r/{subreddit.group(1)}"
+            if source not in sources:
+                sources.append(source)
+        elif post:
+            post_url = f"{REDDIT_ORIGIN}{parsed.path}"
+            known = posts.get(post_url)
+            # Post cards link several times; the longest text is the title.
+            # Votes, comments and domain are not in the page's links, so
+            # they stay unknown
+            if known is None:
+                posts[post_url] = PostMetadata(
+                    rank="",
+                    title=text,
+                    subreddit=post.group(1),
+                    url=post_url
+                )
+            elif len(text) > len(known.title):
+                known.title = text
+        elif _ANSWERS_PATH.match(parsed.path) and "q" in parse_qs(parsed.query):
+            topic = text or parse_qs(parsed.query)["q"][0]
+            if topic and topic not in topics and topic.lower() != question.lower():
+                topics.append(topic)
+
+    related_posts = [p for p in posts.values() if p.title]
+    for rank, post in enumerate(related_posts, 1):
+        post.rank = str(rank)
+
+    return ExtractionResult(
+        url=url,
+        question=question,
+        sources=sources,
+        sections=sections,
+        relatedPosts=related_posts,
+        relatedTopics=topics
+    )
+
+
+def validate_result(result: ExtractionResult):
+    """
+    Check that a parsed page holds an actual answer
+
+    Raises:
+        DirectExtractionError: If the result is unusable
+    """
+    if urlparse(result.url).path.rstrip("/") in ("", "/answers"):
+        raise DirectExtractionError(f"Not an answers page: {result.url}")
+    if not result.sections:
+        raise DirectExtractionError("No answer sections found")
+    answer_chars = sum(len(text) for section in result.sections for text in section.content)
+    if answer_chars < MIN_ANSWER_CHARS:
+        raise DirectExtractionError(f"Answer body too short ({answer_chars} characters)")
+    if not result.relatedPosts:
+        raise DirectExtractionError("Answer links no Reddit threads")
+
+
+class RedditAnswersExtractor:
+    """Extracts Reddit Answers results with a scripted page load"""
+
+    def __init__(self, answers_url: str = ANSWERS_URL, load_timeout: float = 15.0, settle_seconds: float = 1.0):
+        """
+        Initialize extractor
+
+        Args:
+            answers_url: Reddit Answers search URL
+            load_timeout: Seconds to wait for the answer to render
+            settle_seconds: Seconds the related posts must stay unchanged
+                before the page counts as loaded
+        """
+        self.answers_url = answers_url
+        self.load_timeout = load_timeout
+        self.settle_seconds = settle_seconds
+
+    def search_url(self, question: str) -> str:
+        """URL of the answers page for a question"""
+        return f"{self.answers_url}?{urlencode({'q': question})}"
+
+    async def extract(self, browser_session: Any, question: str) -> ExtractionResult:
+        """
+        Load and parse the answers page for a question
+
+        The page stays open afterwards, so an agent taking over after a
+        failed validation starts on it.
+
+        Args:
+            browser_session: browser-use BrowserSession to load the page in
+            question: Question to search for
+
+        Returns:
+            Validated ExtractionResult
+
+        Raises:
+            DirectExtractionError: If the page cannot be loaded or parsed
+        """
+        try:
+            await browser_session.start()
+            await browser_session.navigate_to(self.search_url(question))
+            rendered = await self._render(browser_session)
+        except asyncio.CancelledError:
+            raise
+        except DirectExtractionError:
+            raise
+        except Exception as e:
+            raise DirectExtractionError(f"Failed to load answers page: {e}") from e
+
+        result = parse_answers_page(rendered["html"], rendered["url"], question)
+        validate_result(result)
+        return result
+
+    async def _render(self, browser_session: Any) -> Dict[str, str]:
+        """Wait for the page to render and read back its document"""
+        deadline = time.monotonic() + self.load_timeout
+        while True:
+            page = await browser_session.must_get_current_page()
+            remaining = max(0.0, deadline - time.monotonic())
+            try:
+                raw = await page.evaluate(
+                    _RENDER_SCRIPT,
+                    int(remaining * 1000),
+                    int(self.settle_seconds * 1000)
+                )
+                return json.loads(raw)
+            except RuntimeError:
+                # The document was replaced by a redirect mid-evaluation
+                if time.monotonic() >= deadline:
+                    raise DirectExtractionError("Answers page did not finish loading")
+                await asyncio.sleep(0.25)
@@ -5,17 +5,31 @@ Implements intelligent content extraction from web pages.
 import asyncio
 import logging
 import os
-import json
-import re
+import time
+from dataclasses import dataclass, replace
 from typing import Optional, Dict, Any, List
+import httpx
+import openai
 from steel import Steel
 from browser_use import Agent, BrowserSession
+from browser_use.agent.views import AgentHistoryList
+from browser_use.llm.exceptions import ModelProviderError
 from browser_use.llm.openai.chat import ChatOpenAI
 
 from src.models import ExtractionResult, ContentSection, PostMetadata
+from src.services.circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError
+from src.services.direct_extractor import ANSWERS_URL, DirectExtractionError, RedditAnswersExtractor
+from src.services.json_extract import find_json_object
+from src.services.metrics import DIRECT_EXTRACTIONS, EXTRACTION_DURATION, PARSE_FAILURES, TRAJECTORY_REPLAYS
+from src.services.session_pool import SteelSessionLifecycle, SteelSessionPool
+from src.services.token_usage import TokenUsage
+from src.services.trajectory import TrajectoryStore
 
 logger = logging.getLogger(__name__)
 
+# Keys identifying the agent's structured answer among other JSON in its output
+RESULT_KEYS = tuple(ExtractionResult.model_fields)
+
 
 def replace_protocol_mapping(url: str) -> str:
     """Convert HTTP/HTTPS protocol to WebSocket protocol"""
@@ -30,6 +44,72 @@ def replace_protocol_mapping(url: str) -> str:
     return url
 
 
+class ExtractionTimeoutError(Exception):
+    """Raised when an extraction runs out of its time, step or token budget"""
+    
+    def __init__(self, message: str, partial: Optional[ExtractionResult] = None):
+        super().__init__(message)
+        self.partial = partial
+
+
+class _AgentRun:
+    """Agent and token usage of an extraction in progress"""
+    
+    def __init__(self, usage: TokenUsage):
+        self.agent: Optional[Agent] = None
+        self.usage = usage
+
+
+def _is_llm_outage(error: Exception) -> bool:
+    """
+    Whether an LLM error means the endpoint is failing, not the request
+    
+    browser-use reports every failure as a ModelProviderError, including
+    empty or unparseable output from a healthy endpoint, so the decision is
+    made on the OpenAI client error it wraps.
+    """
+    cause = error.__cause__ if isinstance(error, ModelProviderError) else error
+    # APITimeoutError is an APIConnectionError
+    if isinstance(cause, (openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    if isinstance(cause, openai.APIStatusError):
+        return cause.status_code >= 500
+    return False
+
+
+@dataclass
+class _GuardedChatOpenAI(ChatOpenAI):
+    """ChatOpenAI whose calls go through the LLM circuit breaker and count tokens"""
+    
+    breaker: Optional[CircuitBreaker] = None
+    usage: Optional[TokenUsage] = None
+    
+    async def ainvoke(self, messages, output_format=None, **kwargs):
+        if self.breaker is None:
+            result = await super().ainvoke(messages, output_format, **kwargs)
+        else:
+            with self.breaker.guard(is_failure=_is_llm_outage):
+                result = await super().ainvoke(messages, output_format, **kwargs)
+        if self.usage is not None and result.usage:
+            self.usage.add(result.usage.prompt_tokens, result.usage.completion_tokens)
+        return result
+
+
+class _NoReplaySummary:
+    """
+    Summary model for trajectory replays that declines every call
+    
+    Agent.rerun_history ends with an LLM summary of the replay. The summary
+    is not used, so declining makes it fall back to its plain step count
+    instead of paying for a call with a screenshot.
+    """
+    
+    model = "none"
+    
+    async def ainvoke(self, messages, output_format=None, **kwargs):
+        raise NotImplementedError("Trajectory replays are not summarized")
+
+
 class ExtractionService:
     """Service for extracting structured content from websites"""
     
@@ -77,6 +157,159 @@ class ExtractionService:
             raise ValueError("OPENAI_API_KEY is required")
         if not self.model:
             raise ValueError("MODEL is required")
+        
+        # Budgets bounding a single extraction (overridable per request)
+        self.default_timeout = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "300"))
+        self.default_max_steps = int(os.getenv("AGENT_MAX_STEPS", "50"))
+        
+        # LLM token accounting and budgets (0 disables a budget)
+        self.token_budget = int(os.getenv("LLM_TOKEN_BUDGET", "0"))
+        self.cost_budget = float(os.getenv("LLM_COST_BUDGET", "0"))
+        self.prompt_price = float(os.getenv("LLM_PROMPT_PRICE_PER_MTOK", "0"))
+        self.completion_price = float(os.getenv("LLM_COMPLETION_PRICE_PER_MTOK", "0"))
+        
+        # Compact mode: no screenshots, trimmed DOM and history, short prompt
+        self.compact_mode = os.getenv("AGENT_COMPACT_MODE", "false").lower() == "true"
+        self.compact_dom_chars = int(os.getenv("AGENT_COMPACT_DOM_CHARS", "12000"))
+        self.compact_history_items = int(os.getenv("AGENT_COMPACT_HISTORY_ITEMS", "6"))
+        
+        # Circuit breakers failing extractions fast while Steel or the LLM is down
+        failure_threshold = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        recovery_timeout = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+        self.steel_breaker = CircuitBreaker("steel", failure_threshold, recovery_timeout)
+        self.llm_breaker = CircuitBreaker("llm", failure_threshold, recovery_timeout)
+        self.steel_create_attempts = int(os.getenv("STEEL_CREATE_ATTEMPTS", "3"))
+        self.steel_retry_base_delay = float(os.getenv("STEEL_RETRY_BASE_DELAY", "0.5"))
+        
+        # Scripted page load and parse tried in the browser before the agent
+        self.direct_enabled = os.getenv("DIRECT_EXTRACTION_ENABLED", "true").lower() == "true"
+        self.direct_url = os.getenv("DIRECT_EXTRACTION_URL", ANSWERS_URL)
+        self.direct_timeout = float(os.getenv("DIRECT_EXTRACTION_TIMEOUT", "15"))
+        
+        # Recorded navigation replayed instead of letting the LLM plan it
+        self.trajectory_store: Optional[TrajectoryStore] = None
+        if os.getenv("TRAJECTORY_REPLAY_ENABLED", "true").lower() == "true":
+            self.trajectory_store = TrajectoryStore(
+                os.getenv("TRAJECTORY_PATH", "data/trajectory.json"),
+                max_failures=int(os.getenv("TRAJECTORY_MAX_FAILURES", "3"))
+            )
+        self.trajectory_step_delay = float(os.getenv("TRAJECTORY_STEP_DELAY", "1.0"))
+        self.trajectory_step_retries = int(os.getenv("TRAJECTORY_STEP_RETRIES", "1"))
+        
+        # Warm Steel session pool configuration
+        self.pool_enabled = os.getenv("STEEL_POOL_ENABLED", "true").lower() == "true"
+        self.pool_min_size = int(os.getenv("STEEL_POOL_MIN_SIZE", "1"))
+        self.pool_max_size = int(os.getenv("STEEL_POOL_MAX_SIZE", "5"))
+        self.pool_idle_timeout = float(os.getenv("STEEL_POOL_IDLE_TIMEOUT", "300"))
+        self.pool_max_uses = int(os.getenv("STEEL_POOL_MAX_USES", "10"))
+        self.session_pool: Optional[SteelSessionPool] = None
+        
+        # Blocking Steel SDK calls run on a bounded worker pool off the event loop
+        self.steel_io_workers = int(os.getenv("STEEL_IO_WORKERS", "4"))
+        self.session_lifecycle: Optional[SteelSessionLifecycle] = None
+        
+        # Shared HTTP connection pool configuration for Steel and LLM clients
+        self.http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+        self.http_max_keepalive_connections = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        self.http_keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+        self.http_timeout = float(os.getenv("HTTP_TIMEOUT", "60"))
+        
+        # Process-wide clients, created on first use and reused by every extraction
+        self._steel_client: Optional[Steel] = None
+        self._llm: Optional[ChatOpenAI] = None
+        self._llm_http_client: Optional[httpx.AsyncClient] = None
+        self._direct_extractor: Optional[RedditAnswersExtractor] = None
+    
+    @property
+    def use_steel(self) -> bool:
+        """Whether Steel is configured (API key OR base URL provided)"""
+        return bool(
+            (self.steel_api_key and self.steel_api_key.strip()) or
+            self.steel_base_url
+        )
+    
+    async def start(self):
+        """Pre-create warm Steel sessions so the first requests skip the cold start"""
+        if self.use_steel and self.pool_enabled:
+            await self._get_session_pool().start()
+    
+    async def close(self):
+        """Release pooled Steel sessions and close shared clients"""
+        if self.session_pool:
+            await self.session_pool.close()
+            self.session_pool = None
+        
+        if self.session_lifecycle:
+            await self.session_lifecycle.close()
+            self.session_lifecycle = None
+        
+        if self._steel_client:
+            try:
+                self._steel_client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Steel client: {e}")
+            self._steel_client = None
+        
+        if self._llm_http_client:
+            await self._llm_http_client.aclose()
+            self._llm_http_client = None
+        self._llm = None
+        
+        logger.info("Shared Steel and LLM clients closed")
+    
+    def get_steel_client(self) -> Steel:
+        """Get the shared Steel client, creating it on first use"""
+        if self._steel_client is None:
+            self._steel_client = self._create_steel_client()
+        return self._steel_client
+    
+    def get_llm(self) -> ChatOpenAI:
+        """Get the shared LLM client, creating it on first use"""
+        if self._llm is None:
+            self._llm = self._create_llm()
+        return self._llm
+    
+    def get_direct_extractor(self) -> RedditAnswersExtractor:
+        """Get the shared deterministic extractor, creating it on first use"""
+        if self._direct_extractor is None:
+            self._direct_extractor = RedditAnswersExtractor(self.direct_url, load_timeout=self.direct_timeout)
+        return self._direct_extractor
+    
+    def _http_limits(self) -> httpx.Limits:
+        """Connection pool limits shared by the Steel and LLM HTTP clients"""
+        return httpx.Limits(
+            max_connections=self.http_max_connections,
+            max_keepalive_connections=self.http_max_keepalive_connections,
+            keepalive_expiry=self.http_keepalive_expiry
+        )
+    
+    def _get_session_lifecycle(self) -> SteelSessionLifecycle:
+        """Get the async Steel session lifecycle, creating it on first use"""
+        if self.session_lifecycle is None:
+            self.session_lifecycle = SteelSessionLifecycle(
+                self.get_steel_client(),
+                max_workers=self.steel_io_workers,
+                breaker=self.steel_breaker,
+                create_attempts=self.steel_create_attempts,
+                retry_base_delay=self.steel_retry_base_delay
+            )
+        return self.session_lifecycle
+    
+    def _get_session_pool(self) -> SteelSessionPool:
+        """Get the Steel session pool, creating it on first use"""
+        if self.session_pool is None:
+            self.session_pool = SteelSessionPool(
+                self._get_session_lifecycle(),
+                min_size=self.pool_min_size,
+                max_size=self.pool_max_size,
+                idle_timeout=self.pool_idle_timeout,
+                max_uses=self.pool_max_uses
+            )
+            logger.info(
+                f"Steel session pool configured: min={self.pool_min_size}, "
+                f"max={self.pool_max_size}, max_uses={self.pool_max_uses}"
+            )
+        return self.session_pool
     
     def _create_steel_client(self) -> Steel:
         """
@@ -86,7 +319,12 @@ class ExtractionService:
         1. Official Steel: Use STEEL_API_KEY (base_url is optional)
         2. Self-hosted Steel: Use STEEL_BASE_URL (api_key not required)
         """
-        steel_params = {}
+        steel_params = {
+            "http_client": httpx.Client(
+                limits=self._http_limits(),
+                timeout=self.http_timeout
+            )
+        }
         
         # Official Steel with API key
         if self.steel_api_key and self.steel_api_key.strip():
@@ -115,6 +353,14 @@ class ExtractionService:
         if self.openai_base_url:
             llm_params["base_url"] = self.openai_base_url
         
+        # Share one keep-alive connection pool across all LLM requests
+        self._llm_http_client = httpx.AsyncClient(
+            limits=self._http_limits(),
+            timeout=self.http_timeout
+        )
+        llm_params["http_client"] = self._llm_http_client
+        llm_params["breaker"] = self.llm_breaker
+        
         # Check if model is DeepSeek (which doesn't support response_format)
         is_deepseek = "deepseek" in self.model.lower()
         if is_deepseek:
@@ -122,154 +368,444 @@ class ExtractionService:
             logger.warning("DeepSeek models  support structured output (response_format), and can sometimes return empty content.")
             logger.warning("This will cause failures. Please use gpt-4o, gpt-4o-mini, or claude instead.")
         
-        llm = ChatOpenAI(**llm_params)
+        llm = _GuardedChatOpenAI(**llm_params)
         logger.info(f"LLM created: provider={llm.provider}, model={llm.model}")
         return llm
     
-    async def extract_reddit_answers(self, question: str) -> ExtractionResult:
+    def check_available(self):
+        """
+        Fail fast if a dependency of the extraction is known to be down
+        
+        Raises:
+            CircuitOpenError: If the LLM's or Steel's circuit is open
+        """
+        self.llm_breaker.check()
+        if self.use_steel:
+            self.steel_breaker.check()
+    
+    def get_circuit_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get circuit breaker statistics
+        
+        Returns:
+            Dictionary of breaker statistics per dependency
+        """
+        breakers = [self.llm_breaker]
+        if self.use_steel:
+            breakers.append(self.steel_breaker)
+        return {breaker.name: breaker.get_statistics() for breaker in breakers}
+    
+    def create_usage(self) -> TokenUsage:
+        """Create an empty token usage priced at the configured rates"""
+        return TokenUsage(self.prompt_price, self.completion_price)
+    
+    def get_trajectory_statistics(self) -> Optional[Dict[str, Any]]:
+        """
+        Get trajectory replay statistics
+        
+        Returns:
+            Dictionary of replay counters, or None if replay is disabled
+        """
+        return self.trajectory_store.get_statistics() if self.trajectory_store else None
+    
+    async def extract_reddit_answers(
+        self,
+        question: str,
+        timeout: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        usage: Optional[TokenUsage] = None
+    ) -> ExtractionResult:
         """
         Extract structured content from Reddit Answers for a given question.
         
         Args:
             question: Question to search for on Reddit Answers
+            timeout: Seconds allowed for the whole extraction
+                (defaults to EXTRACTION_TIMEOUT_SECONDS)
+            max_steps: Maximum agent steps (defaults to AGENT_MAX_STEPS)
+            usage: Accumulates the LLM tokens the extraction uses
             
         Returns:
             ExtractionResult with structured data
+            
+        Raises:
+            ExtractionTimeoutError: If the time, step or token budget runs out; it
+                carries whatever partial result the agent produced
+            CircuitOpenError: If Steel or the LLM is unavailable
         """
-        steel_client = None
-        session = None
+        self.check_available()
+        
+        timeout = timeout or self.default_timeout
+        max_steps = max_steps or self.default_max_steps
+        run = _AgentRun(usage if usage is not None else self.create_usage())
         
+        started = time.perf_counter()
         try:
-            logger.info(f"Starting extraction for question: {question}")
-            
-            # Decide whether to use Steel (if API key OR base URL provided)
-            use_steel = bool(
-                (self.steel_api_key and self.steel_api_key.strip()) or 
-                self.steel_base_url
-            )
-            browser_session = None
-            
-            if use_steel:
-                # Create Steel session
-                if self.steel_api_key and self.steel_api_key.strip():
-                    logger.info("Using official Steel SDK for browser automation")
-                else:
-                    logger.info("Using self-hosted Steel SDK for browser automation")
-                
-                steel_client = self._create_steel_client()
-                session = steel_client.sessions.create()
-                logger.info(f"Steel session created: {session.session_viewer_url}")
-                
-                # Get CDP URL for browser-use connection
-                # Official Steel: Use wss://connect.steel.dev with apiKey and sessionId
-                # Self-hosted Steel: Use websocket_url from session or construct from base_url
-                
-                if self.steel_api_key and self.steel_api_key.strip() and not self.steel_base_url:
-                    # Official Steel: construct official CDP URL
-                    cdp_url = f"wss://connect.steel.dev?apiKey={self.steel_api_key}&sessionId={session.id}"
-                    logger.info(f"Using official Steel CDP URL: wss://connect.steel.dev?sessionId={session.id[:8]}...")
-                
-                elif self.steel_base_url:
-                    # Self-hosted Steel: prioritize base_url to construct CDP URL
-                    cdp_url = replace_protocol_mapping(self.steel_base_url)
-                    logger.info(f"Using self-hosted Steel CDP URL from base_url: {cdp_url}")
-                
-                elif hasattr(session, 'websocket_url') and session.websocket_url:
-                    # Fallback: use session.websocket_url if base_url not available
-                    cdp_url = session.websocket_url
-                    logger.info(f"Using Steel session websocket_url (fallback): {cdp_url}")
-                
-                else:
-                    raise ValueError("Unable to determine CDP URL for Steel session")
-                
-                browser_session = BrowserSession(cdp_url=cdp_url)
-            else:
-                logger.info("STEEL not configured — running with local browser session")
-                browser_session = BrowserSession()
-            
-            # Create AI agent with extraction task
-            logger.info("Creating LLM and AI agent...")
-            llm = self._create_llm()
-            
-            # Detailed extraction prompt for Reddit Answers
-            task = f"""
-            Go to https://www.reddit.com/answers/ and search for: {question} and  scroll down and click for: "View all" and wait for the page to load all related posts
-            
-            Then extract and structure the following information:
-            1. The full URL of the Reddit Answers page
-            2. The exact question as displayed
-            3. All source subreddit URLs mentioned
-            4. All answer sections with their headings and content (as separate paragraphs)
-            5. All related posts with rank, title, subreddit, URL, upvotes, comments, domain, promoted status, and score 
-            6. Related topics/questions suggested
-            
-            Return the data in JSON format following this structure:
-            {{
-                "url": "full URL",
-                "question": "the question",
-                "sources": ["list", "of", "subreddit", "urls"],
-                "sections": [
-                    {{"heading": "Section Name", "content": ["paragraph 1", "paragraph 2"]}}
-                ],
-                "relatedPosts": [
-                    {{
-                        "rank": "1",
-                        "title": "Post title",
-                        "subreddit": "subreddit_name",
-                        "url": "post url",
-                        "upvotes": 123,
-                        "comments": 45,
-                        "domain": "domain",
-                        "promoted": false,
-                        "score": 123
-                    }}
-                ],
-                "relatedTopics": ["related question 1", "related question 2"]
-            }}
-            """
-            
-            # Create agent with appropriate settings
-            agent_params = {
-                "task": task,
-                "llm": llm,
-                "browser_session": browser_session,
-            }
-            
-            # Disable vision for models that don't support it
-            is_deepseek = "deepseek" in self.model.lower()
-            if is_deepseek:
-                agent_params["use_vision"] = False
-                logger.info("Vision disabled for DeepSeek model")
-            
-            agent = Agent(**agent_params)
-            logger.info(f"Agent created with task length: {len(task)} chars")
-            
-            # Run the agent
-            logger.info("Running AI agent for content extraction...")
-            result = await agent.run()
-            
-            # Parse agent result - the agent should return structured data
-            logger.info("Extraction completed, parsing results...")
-            
-            # The agent.run() returns agent output - we need to extract the final result
-            # For now, create a structured result from the agent's history
-            extraction_result = self._parse_agent_result(result, question)
-            
-            logger.info(f"Successfully extracted data for: {question}")
-            return extraction_result
-            
+            result = await asyncio.wait_for(self._extract(question, max_steps, run), timeout)
+        except asyncio.TimeoutError:
+            EXTRACTION_DURATION.labels("timeout").observe(time.perf_counter() - started)
+            partial = self._parse_partial_result(run.agent.history, question) if run.agent else None
+            logger.warning(f"Extraction timed out after {timeout}s for question: {question}")
+            raise ExtractionTimeoutError(f"Extraction timed out after {timeout:g}s", partial=partial)
+        except ExtractionTimeoutError:
+            EXTRACTION_DURATION.labels("timeout").observe(time.perf_counter() - started)
+            logger.warning(f"Extraction used its {max_steps} step budget for question: {question}")
+            raise
+        except CircuitOpenError as e:
+            EXTRACTION_DURATION.labels("unavailable").observe(time.perf_counter() - started)
+            logger.warning(f"Extraction stopped: {e}")
+            raise
+        except asyncio.CancelledError:
+            EXTRACTION_DURATION.labels("cancelled").observe(time.perf_counter() - started)
+            logger.info(f"Extraction cancelled for question: {question}")
+            raise
         except Exception as e:
+            EXTRACTION_DURATION.labels("failure").observe(time.perf_counter() - started)
             logger.error(f"Extraction failed: {str(e)}", exc_info=True)
             raise
         
+        EXTRACTION_DURATION.labels("success").observe(time.perf_counter() - started)
+        return result
+    
+    async def _extract_direct(self, question: str, browser_session: BrowserSession) -> Optional[ExtractionResult]:
+        """Try the scripted page load; None means fall back to the agent"""
+        try:
+            result = await self.get_direct_extractor().extract(browser_session, question)
+        except DirectExtractionError as e:
+            DIRECT_EXTRACTIONS.labels("fallback").inc()
+            logger.info(f"Direct extraction unusable, falling back to agent: {e}")
+            return None
+        
+        DIRECT_EXTRACTIONS.labels("hit").inc()
+        logger.info(f"Direct extraction succeeded for question: {question}")
+        return result
+    
+    async def _extract(self, question: str, max_steps: int, run: _AgentRun) -> ExtractionResult:
+        """Acquire a browser session and run the extraction agent"""
+        logger.info(f"Starting extraction for question: {question}")
+        
+        if not self.use_steel:
+            logger.info("STEEL not configured — running with local browser session")
+            return await self._run_agent(question, BrowserSession(), max_steps, run)
+        
+        if self.steel_api_key and self.steel_api_key.strip():
+            logger.info("Using official Steel SDK for browser automation")
+        else:
+            logger.info("Using self-hosted Steel SDK for browser automation")
+        
+        if self.pool_enabled:
+            # Lease a warm session; it goes back to the pool afterwards
+            async with self._get_session_pool().lease() as pooled:
+                logger.info(f"Leased pooled Steel session {pooled.id} (use {pooled.uses})")
+                browser_session = self._create_browser_session(pooled.session, keep_alive=True)
+                return await self._run_agent(question, browser_session, max_steps, run)
+        
+        lifecycle = self._get_session_lifecycle()
+        session = await lifecycle.create()
+        logger.info(f"Steel session created: {session.session_viewer_url}")
+        
+        try:
+            browser_session = self._create_browser_session(session)
+            return await self._run_agent(question, browser_session, max_steps, run)
         finally:
-            # Clean up Steel session if used
-            if steel_client and session:
+            # Clean up Steel session in the background
+            lifecycle.release_later(session.id)
+    
+    def _create_browser_session(self, session: Any, keep_alive: bool = False) -> BrowserSession:
+        """
+        Create a browser-use session connected to a Steel session over CDP.
+        
+        Args:
+            session: Steel session
+            keep_alive: Keep the remote browser open after the agent finishes
+                (required for pooled sessions)
+            
+        Returns:
+            BrowserSession connected to the Steel browser
+        """
+        # Get CDP URL for browser-use connection
+        # Official Steel: Use wss://connect.steel.dev with apiKey and sessionId
+        # Self-hosted Steel: Use websocket_url from session or construct from base_url
+        
+        if self.steel_api_key and self.steel_api_key.strip() and not self.steel_base_url:
+            # Official Steel: construct official CDP URL
+            cdp_url = f"wss://connect.steel.dev?apiKey={self.steel_api_key}&sessionId={session.id}"
+            logger.info(f"Using official Steel CDP URL: wss://connect.steel.dev?sessionId={session.id[:8]}...")
+        
+        elif self.steel_base_url:
+            # Self-hosted Steel: prioritize base_url to construct CDP URL
+            cdp_url = replace_protocol_mapping(self.steel_base_url)
+            logger.info(f"Using self-hosted Steel CDP URL from base_url: {cdp_url}")
+        
+        elif hasattr(session, 'websocket_url') and session.websocket_url:
+            # Fallback: use session.websocket_url if base_url not available
+            cdp_url = session.websocket_url
+            logger.info(f"Using Steel session websocket_url (fallback): {cdp_url}")
+        
+        else:
+            raise ValueError("Unable to determine CDP URL for Steel session")
+        
+        if keep_alive:
+            return BrowserSession(cdp_url=cdp_url, keep_alive=True)
+        return BrowserSession(cdp_url=cdp_url)
+    
+    async def _run_agent(
+        self,
+        question: str,
+        browser_session: BrowserSession,
+        max_steps: Optional[int] = None,
+        run: Optional[_AgentRun] = None
+    ) -> ExtractionResult:
+        """
+        Run the browser-use agent against a browser session.
+        
+        Args:
+            question: Question to search for on Reddit Answers
+            browser_session: Browser session the agent drives
+            max_steps: Maximum agent steps (defaults to AGENT_MAX_STEPS)
+            run: Holder exposing the agent to the caller
+            
+        Returns:
+            ExtractionResult with structured data
+        """
+        # Load and parse the page with a fixed script; the agent only runs
+        # when that result does not validate
+        if self.direct_enabled:
+            try:
+                direct_result = await self._extract_direct(question, browser_session)
+            except BaseException:
+                await self._close_browser(browser_session)
+                raise
+            if direct_result is not None:
+                await self._close_browser(browser_session)
+                return direct_result
+        
+        # Create AI agent with extraction task
+        logger.info("Creating AI agent...")
+        # A per-run copy of the shared client counts this run's tokens
+        usage = run.usage if run is not None else self.create_usage()
+        llm = replace(self.get_llm(), usage=usage)
+        
+        # Replay the recorded navigation; the agent then only extracts
+        navigated = await self._replay_trajectory(question, browser_session, llm)
+        task = self._build_task(question, navigated, compact=self.compact_mode)
+        
+        # Create agent with appropriate settings
+        agent_params = {
+            "task": task,
+            "llm": llm,
+            "browser_session": browser_session,
+        }
+        if navigated:
+            agent_params["directly_open_url"] = False
+        
+        # Stop the agent once the run's token or cost budget is spent
+        if self.token_budget or self.cost_budget:
+            async def budget_spent() -> bool:
+                return usage.exceeded(self.token_budget, self.cost_budget) is not None
+            agent_params["register_should_stop_callback"] = budget_spent
+        
+        if self.compact_mode:
+            agent_params["use_vision"] = False
+            agent_params["use_thinking"] = False
+            agent_params["max_clickable_elements_length"] = self.compact_dom_chars
+            agent_params["max_history_items"] = self.compact_history_items
+            logger.info("Compact mode: vision off, DOM and history trimmed")
+        
+        # Disable vision for models that don't support it
+        is_deepseek = "deepseek" in self.model.lower()
+        if is_deepseek:
+            agent_params["use_vision"] = False
+            logger.info("Vision disabled for DeepSeek model")
+        
+        agent = Agent(**agent_params)
+        logger.info(f"Agent created with task length: {len(task)} chars")
+        if run is not None:
+            run.agent = agent
+        
+        # Run the agent
+        max_steps = max_steps or self.default_max_steps
+        logger.info("Running AI agent for content extraction...")
+        try:
+            result = await agent.run(max_steps=max_steps)
+        except asyncio.CancelledError:
+            agent.stop()
+            raise
+        finally:
+            if browser_session.browser_profile.keep_alive:
+                # Disconnect CDP but leave the pooled browser running
                 try:
-                    steel_client.sessions.release(session.id)
-                    logger.info("Steel session released")
+                    await browser_session.stop()
                 except Exception as e:
-                    logger.warning(f"Failed to release Steel session: {e}")
+                    logger.warning(f"Failed to disconnect from pooled browser: {e}")
+        
+        logger.info(f"Agent used {usage.total_tokens} tokens in {usage.calls} LLM calls")
+        
+        # Stopped by the token or cost budget before the agent finished
+        exhausted = usage.exceeded(self.token_budget, self.cost_budget)
+        if not result.is_done() and exhausted:
+            raise ExtractionTimeoutError(exhausted, partial=self._parse_partial_result(result, question))
+        
+        # Out of steps before the agent finished
+        if not result.is_done() and result.number_of_steps() >= max_steps:
+            raise ExtractionTimeoutError(
+                f"Agent step budget of {max_steps} exhausted",
+                partial=self._parse_partial_result(result, question)
+            )
+        
+        # The agent gave up because the LLM's circuit opened mid-run
+        if not result.is_done() and self.llm_breaker.state != CLOSED:
+            raise CircuitOpenError(self.llm_breaker.name, self.llm_breaker.retry_after)
+        
+        # Parse agent result - the agent should return structured data
+        logger.info("Extraction completed, parsing results...")
+        
+        # The agent.run() returns agent output - we need to extract the final result
+        # For now, create a structured result from the agent's history
+        extraction_result = self._parse_agent_result(result, question)
+        
+        if self.trajectory_store and not navigated and result.is_done():
+            self._record_trajectory(result, question)
+        
+        logger.info(f"Successfully extracted data for: {question}")
+        return extraction_result
+    
+    async def _close_browser(self, browser_session: BrowserSession):
+        """Disconnect from a pooled browser, or shut down one the run owns"""
+        try:
+            if browser_session.browser_profile.keep_alive:
+                await browser_session.stop()
+            else:
+                await browser_session.kill()
+        except Exception as e:
+            logger.warning(f"Failed to close browser session: {e}")
+    
+    def _build_task(self, question: str, navigated: bool = False, compact: bool = False) -> str:
+        """
+        Build the agent's task prompt
+        
+        Args:
+            question: Question to search for on Reddit Answers
+            navigated: Whether the answer page is already open
+            compact: Use the short prompt of compact mode
+            
+        Returns:
+            Task prompt
+        """
+        if navigated:
+            navigation = (
+                f"The Reddit Answers page for: {question} is already open in the current tab "
+                f"with all related posts loaded. Do not navigate away from it."
+            )
+        else:
+            navigation = (
+                f"Go to https://www.reddit.com/answers/ and search for: {question} and  scroll down "
+                f"and click for: \"View all\" and wait for the page to load all related posts"
+            )
+        
+        if compact:
+            return (
+                f"{navigation}\n"
+                "Then return JSON with keys url, question, sources (subreddit URLs), "
+                "sections ([{heading, content: [paragraphs]}]), relatedPosts ([{rank, title, "
+                "subreddit, url, upvotes, comments, domain, promoted, score}]) and relatedTopics."
+            )
+        
+        return f"""
+        {navigation}
+        
+        Then extract and structure the following information:
+        1. The full URL of the Reddit Answers page
+        2. The exact question as displayed
+        3. All source subreddit URLs mentioned
+        4. All answer sections with their headings and content (as separate paragraphs)
+        5. All related posts with rank, title, subreddit, URL, upvotes, comments, domain, promoted status, and score 
+        6. Related topics/questions suggested
+        
+        Return the data in JSON format following this structure:
+        {{
+            "url": "full URL",
+            "question": "the question",
+            "sources": ["list", "of", "subreddit", "urls"],
+            "sections": [
+                {{"heading": "Section Name", "content": ["paragraph 1", "paragraph 2"]}}
+            ],
+            "relatedPosts": [
+                {{
+                    "rank": "1",
+                    "title": "Post title",
+                    "subreddit": "subreddit_name",
+                    "url": "post url",
+                    "upvotes": 123,
+                    "comments": 45,
+                    "domain": "domain",
+                    "promoted": false,
+                    "score": 123
+                }}
+            ],
+            "relatedTopics": ["related question 1", "related question 2"]
+        }}
+        """
+    
+    async def _replay_trajectory(self, question: str, browser_session: BrowserSession, llm: ChatOpenAI) -> bool:
+        """
+        Replay the recorded navigation for a question without LLM planning
+        
+        Each step's elements are matched against the live page; when a step
+        no longer matches the agent navigates itself, and the trajectory is
+        discarded after TRAJECTORY_MAX_FAILURES failed replays in a row.
+        
+        Returns:
+            True if the answer page was reached by replay
+        """
+        if not self.trajectory_store:
+            return False
+        trajectory = self.trajectory_store.load(question)
+        if trajectory is None:
+            return False
+        
+        replayer = Agent(
+            task=f"Open the Reddit Answers page for: {question}",
+            llm=llm,
+            browser_session=browser_session,
+            directly_open_url=False
+        )
+        # rerun_history closes the agent when done; keep the browser open
+        # for the agent that extracts
+        profile = browser_session.browser_profile
+        keep_alive = profile.keep_alive
+        profile.keep_alive = True
+        try:
+            history = AgentHistoryList.load_from_dict(trajectory, replayer.AgentOutput)
+            await replayer.rerun_history(
+                history,
+                max_retries=self.trajectory_step_retries,
+                delay_between_actions=self.trajectory_step_delay,
+                max_step_interval=self.trajectory_step_delay,
+                summary_llm=_NoReplaySummary()
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            TRAJECTORY_REPLAYS.labels("failed").inc()
+            logger.warning(f"Trajectory replay failed, agent will navigate itself: {e}")
+            if self.trajectory_store.mark_failed():
+                logger.info("Discarded trajectory after repeated replay failures")
+            return False
+        finally:
+            profile.keep_alive = keep_alive
+        
+        TRAJECTORY_REPLAYS.labels("replayed").inc()
+        self.trajectory_store.mark_replayed()
+        logger.info(f"Replayed {len(history.history)} recorded navigation steps")
+        return True
+    
+    def _record_trajectory(self, history: Any, question: str):
+        """Store the navigation of a successful run for later replay"""
+        try:
+            self.trajectory_store.record(history.model_dump(), question)
+        except Exception as e:
+            logger.warning(f"Failed to record agent trajectory: {e}")
     
     def _parse_agent_result(self, agent_result: Any, question: str) -> ExtractionResult:
         """
@@ -285,7 +821,7 @@ class ExtractionService:
         logger.info(f"Parsing agent result, type: {type(agent_result)}")
         
         # Default structure
-        result_data = {
+        default_data = result_data = {
             "url": "https://www.reddit.com/answers/",
             "question": question,
             "sources": [],
@@ -302,72 +838,72 @@ class ExtractionService:
                 logger.info(f"Got final_result: {type(final_result)}")
                 if isinstance(final_result, str):
                     # Try to parse JSON from string
-                    json_match = re.search(r'\{.*\}', final_result, re.DOTALL)
-                    if json_match:
-                        result_data = json.loads(json_match.group(0))
+                    parsed = find_json_object([final_result], RESULT_KEYS)
+                    if parsed is not None:
+                        result_data = parsed
                 elif isinstance(final_result, dict):
                     result_data = final_result
             
             # Method 2: Check if result has history with extracted data
             elif hasattr(agent_result, 'history'):
-                # Look for the last done action in history
-                for item in reversed(agent_result.history):
-                    if hasattr(item, 'result') and item.result:
-                        text = str(item.result)
-                        json_match = re.search(r'\{.*\}', text, re.DOTALL)
-                        if json_match:
-                            parsed = json.loads(json_match.group(0))
-                            if 'url' in parsed or 'question' in parsed:
-                                result_data = parsed
-                                break
+                # Scan the extracted content of every step; the last best match wins
+                texts = [
+                    action_result.extracted_content
+                    for item in agent_result.history
+                    for action_result in (getattr(item, 'result', None) or [])
+                ]
+                parsed = find_json_object(texts, RESULT_KEYS)
+                if parsed is not None and ('url' in parsed or 'question' in parsed):
+                    result_data = parsed
             
             # Method 3: Try to parse from string representation
             elif isinstance(agent_result, str):
-                json_match = re.search(r'\{.*\}', agent_result, re.DOTALL)
-                if json_match:
-                    result_data = json.loads(json_match.group(0))
+                parsed = find_json_object([agent_result], RESULT_KEYS)
+                if parsed is not None:
+                    result_data = parsed
                     
-        except (AttributeError, json.JSONDecodeError, TypeError) as e:
+        except (AttributeError, TypeError) as e:
             logger.warning(f"Failed to parse agent result as JSON: {e}")
         
-        # Normalize data types for Pydantic validation
-        result_data = self._normalize_result_data(result_data)
+        # Rank and null coercions are declared on the models
+        try:
+            extraction_result = ExtractionResult.model_validate(result_data)
+        except ValueError as e:
+            logger.warning(f"Agent result does not match the result schema: {e}")
+            result_data = default_data
+            extraction_result = ExtractionResult.model_validate(result_data)
+        
+        if result_data is default_data:
+            PARSE_FAILURES.inc()
         
-        logger.info(f"Parsed result - URL: {result_data.get('url')}, Sections: {len(result_data.get('sections', []))}, Posts: {len(result_data.get('relatedPosts', []))}")
+        logger.info(f"Parsed result - URL: {extraction_result.url}, Sections: {len(extraction_result.sections)}, Posts: {len(extraction_result.relatedPosts)}")
         
-        return ExtractionResult(**result_data)
+        return extraction_result
     
-    def _normalize_result_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _parse_partial_result(self, history: Any, question: str) -> Optional[ExtractionResult]:
         """
-        Normalize result data types for Pydantic validation.
+        Build a best-effort result from an agent run that did not finish.
         
         Args:
-            data: Raw result data
+            history: AgentHistoryList of the interrupted run
+            question: Original question
             
         Returns:
-            Normalized data dictionary
+            The latest structured data the agent extracted, or None
         """
-        # Handle relatedPosts type conversions
-        if 'relatedPosts' in data and data['relatedPosts']:
-            for post in data['relatedPosts']:
-                # Convert rank to string
-                if 'rank' in post and isinstance(post['rank'], int):
-                    post['rank'] = str(post['rank'])
-                
-                # Handle None values - convert to appropriate defaults
-                if post.get('url') is None:
-                    post['url'] = ""
-                if post.get('title') is None:
-                    post['title'] = ""
-                if post.get('subreddit') is None:
-                    post['subreddit'] = ""
-                if post.get('domain') is None:
-                    post['domain'] = ""
-                if post.get('upvotes') is None:
-                    post['upvotes'] = 0
-                if post.get('comments') is None:
-                    post['comments'] = 0
-                if post.get('score') is None:
-                    post['score'] = 0
-        
-        return data
\ No newline at end of file
+        try:
+            contents = history.extracted_content()
+        except (AttributeError, TypeError):
+            return None
+        
+        for content in reversed(contents):
+            data = find_json_object([content], RESULT_KEYS)
+            if data is None or ('url' not in data and 'sections' not in data):
+                continue
+            try:
+                data.setdefault("url", "https://www.reddit.com/answers/")
+                data.setdefault("question", question)
+                return ExtractionResult.model_validate(data)
+            except (ValueError, TypeError) as e:
+                logger.debug(f"Skipping unparsable partial content: {e}")
+        return None
@@ -0,0 +1,74 @@
+"""
+JSON object extraction from agent output.
+Agent transcripts mix prose, page text and JSON. Candidate object starts
+('{' followed by a quoted key) are found with one regex pass, and each is
+decoded in place with raw_decode, which balances braces and strings in C.
+Decoded objects are skipped over, so well-formed output is scanned once,
+and the object that best matches the expected keys wins, as long as it
+shares enough of them to be more than a nested fragment.
+"""
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+_DECODER = json.JSONDecoder()
+_OBJECT_START = re.compile(r'\{\s*"')
+
+
+def iter_json_objects(text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the outermost JSON objects embedded in a text
+
+    Args:
+        text: Text to scan
+
+    Yields:
+        Decoded objects in order of appearance
+    """
+    pos = 0
+    while True:
+        match = _OBJECT_START.search(text, pos)
+        if match is None:
+            return
+        start = match.start()
+        try:
+            obj, end = _DECODER.raw_decode(text, start)
+        except ValueError:
+            # Not JSON here; an object may still start inside
+            pos = start + 1
+            continue
+        pos = end
+        yield obj
+
+
+def find_json_object(
+    texts: Iterable[str],
+    keys: Iterable[str],
+    min_keys: int = 2
+) -> Optional[Dict[str, Any]]:
+    """
+    Find the JSON object best matching the expected keys
+
+    When the wanted object is truncated it does not decode, and objects
+    nested in it (such as a related post sharing only "url") are found
+    instead; min_keys keeps those from being taken for it.
+
+    Args:
+        texts: Texts to scan; on equal scores later objects win
+        keys: Keys the wanted object should have
+        min_keys: Keys an object must share to be a candidate
+
+    Returns:
+        The object sharing the most keys, or None if none shares min_keys
+    """
+    keys = frozenset(keys)
+    best = None
+    best_score = max(min_keys, 1)
+    for text in texts:
+        if not isinstance(text, str) or "{" not in text:
+            continue
+        for obj in iter_json_objects(text):
+            score = len(keys.intersection(obj))
+            if score >= best_score:
+                best, best_score = obj, score
+    return best
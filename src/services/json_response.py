@@ -0,0 +1,343 @@
+"""
+Fast JSON responses for task reads.
+A finished task's result never changes, so it is serialized once when the
+task completes and the bytes are kept in a size-bounded LRU. Reads encode
+only the small task envelope and splice the cached result bytes into it,
+instead of revalidating and re-encoding the whole result per request.
+Responses carry an ETag, so clients polling an unchanged task get a 304,
+and large ones are compressed; compressed bodies of finished tasks are
+cached by ETag since they cannot change either.
+"""
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode content as compact JSON
+
+    Uses orjson when it is installed and the standard library otherwise.
+
+    Args:
+        content: JSON-compatible content
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Types orjson does not know fall back to the standard encoder
+            pass
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def embed_json(envelope: bytes, key: str, value: Optional[bytes]) -> bytes:
+    """
+    Add a pre-serialized value to a serialized JSON object
+
+    Args:
+        envelope: Serialized JSON object
+        key: Key to add; it must not be in the envelope already
+        value: Serialized value, or None for null
+
+    Returns:
+        The envelope with the key appended
+    """
+    member = b'"' + key.encode("utf-8") + b'":' + (value if value is not None else b"null")
+    body = envelope.rstrip()[:-1]
+    if body.rstrip() == b"{":
+        return body + member + b"}"
+    return body + b"," + member + b"}"
+
+
+def json_array(items: Iterable[bytes]) -> bytes:
+    """Join serialized JSON values into an array"""
+    return b"[" + b",".join(items) + b"]"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that passes pre-serialized bytes through unchanged"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
+
+
+class ResultJSONCache:
+    """LRU of serialized task results, bounded by their total size"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes: Total size of cached results; 0 disables the cache
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[datetime, bytes]]" = OrderedDict()
+
+    def get(self, task_id: str, updated_at: datetime) -> Optional[bytes]:
+        """
+        Look up a task's serialized result
+
+        Args:
+            task_id: Task ID
+            updated_at: Update time of the task as read; older entries miss
+
+        Returns:
+            Serialized result, or None on a miss
+        """
+        entry = self._entries.get(task_id)
+        if entry is None or entry[0] != updated_at:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(task_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, task_id: str, updated_at: datetime, data: bytes):
+        """
+        Store a task's serialized result
+
+        Args:
+            task_id: Task ID
+            updated_at: Update time of the task the result belongs to
+            data: Serialized result
+        """
+        self.discard(task_id)
+        if len(data) > self.max_bytes:
+            return
+        self._entries[task_id] = (updated_at, data)
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def discard(self, task_id: str):
+        """Drop a task's serialized result"""
+        entry = self._entries.pop(task_id, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with entries, size and hit counts
+        """
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from the values a response depends on
+
+    Args:
+        parts: Values identifying the response content
+
+    Returns:
+        Quoted weak entity tag
+    """
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, by weak comparison
+
+    Args:
+        if_none_match: Header value, if sent
+        etag: Current ETag of the response
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into codings and their q-values"""
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class ResponseEncoder:
+    """Conditional GET and compression for serialized JSON responses"""
+
+    def __init__(
+        self,
+        min_bytes: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_entries: int = 1000
+    ):
+        """
+        Initialize the response encoder
+
+        Args:
+            min_bytes: Smallest body that is compressed; 0 disables compression
+            gzip_level: gzip compression level
+            brotli_quality: Brotli quality, used when the brotli package is installed
+            cache_entries: Compressed bodies of final documents kept
+        """
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_entries = cache_entries
+        self.not_modified = 0
+        self._compressed: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """
+        Pick the content coding for a request
+
+        Args:
+            accept_encoding: Accept-Encoding header, if sent
+
+        Returns:
+            "br", "gzip", or None for an uncompressed body
+        """
+        if not self.min_bytes:
+            return None
+        accepted = _accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        codings = ("br", "gzip") if brotli is not None else ("gzip",)
+        best, best_quality = None, 0.0
+        for coding in codings:
+            quality = accepted.get(coding, wildcard)
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
+
+    def compress(self, body: bytes, coding: str) -> bytes:
+        """Compress a body with the given content coding"""
+        if coding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def respond(
+        self,
+        request: Request,
+        etag: str,
+        render: Callable[[], bytes],
+        final: bool = False
+    ) -> Response:
+        """
+        Build the response for a serialized JSON document
+
+        Args:
+            request: Incoming request
+            etag: ETag of the document's current state
+            render: Serializes the document; only called if the body is sent
+            final: The document can no longer change, so its compressed
+                body may be cached under the ETag
+
+        Returns:
+            304 if the client's copy is current, else the document,
+            compressed when it is large and the client accepts it
+        """
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        coding = self.negotiate(request.headers.get("accept-encoding"))
+        if coding is None:
+            return FastJSONResponse(render(), headers=headers)
+
+        key = (etag, coding)
+        body = self._compressed.get(key) if final else None
+        if body is not None:
+            self._compressed.move_to_end(key)
+        else:
+            body = render()
+            if len(body) < self.min_bytes:
+                return FastJSONResponse(body, headers=headers)
+            body = self.compress(body, coding)
+            if final:
+                self._compressed[key] = body
+                while len(self._compressed) > self.cache_entries:
+                    self._compressed.popitem(last=False)
+
+        headers["Content-Encoding"] = coding
+        return FastJSONResponse(body, headers=headers)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get encoder statistics
+
+        Returns:
+            Dictionary with 304 responses and the compressed body cache
+        """
+        return {
+            "not_modified": self.not_modified,
+            "encodings": ["br", "gzip"] if brotli is not None else ["gzip"],
+            "compressed_cached": len(self._compressed)
+        }
+
+
+def create_response_encoder() -> ResponseEncoder:
+    """
+    Create the response encoder configured by environment variables
+
+    Returns:
+        ResponseEncoder; compression is off when RESPONSE_COMPRESSION_ENABLED is false
+    """
+    enabled = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"
+    return ResponseEncoder(
+        min_bytes=int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024")) if enabled else 0,
+        gzip_level=int(os.getenv("RESPONSE_GZIP_LEVEL", "6")),
+        brotli_quality=int(os.getenv("RESPONSE_BROTLI_QUALITY", "5")),
+        cache_entries=int(os.getenv("RESPONSE_CACHE_ENTRIES", "1000"))
+    )
@@ -0,0 +1,285 @@
+"""
+Prometheus metrics for the extraction platform.
+Minimal counters, gauges and histograms rendered in the Prometheus text
+exposition format, cheap enough to update on every task.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class for labelled metrics"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> "_Metric":
+        """Get the child metric for a set of label values"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}"
+        ]
+        if self.labelnames:
+            for values, child in sorted(self._children.items()):
+                lines.extend(child._samples(self.name, self.labelnames, values))
+        else:
+            lines.extend(self._samples(self.name, (), ()))
+        return lines
+
+    def _new_child(self) -> "_Metric":
+        return type(self)(self.name, self.documentation)
+
+    def _samples(self, name: str, labelnames: Sequence[str], values: Sequence[str]) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def _samples(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def _samples(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets[:-1])
+
+    def _samples(self, name, labelnames, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        labels = _format_labels(labelnames, values)
+        lines.append(f"{name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and platform metrics
+registry = MetricsRegistry()
+
+TASKS_SUBMITTED = registry.counter(
+    "extraction_tasks_submitted_total",
+    "Extraction tasks submitted for execution"
+)
+TASKS_REJECTED = registry.counter(
+    "extraction_tasks_rejected_total",
+    "Extraction tasks rejected because the task queue was full"
+)
+TASKS_FINISHED = registry.counter(
+    "extraction_tasks_finished_total",
+    "Extraction tasks reaching a final status",
+    ["status"]
+)
+TASKS_BY_STATUS = registry.gauge(
+    "extraction_tasks",
+    "Extraction tasks currently stored, by status",
+    ["status"]
+)
+TASK_QUEUE_DEPTH = registry.gauge(
+    "extraction_task_queue_depth",
+    "Tasks waiting in the scheduler queue, by priority",
+    ["priority"]
+)
+TASK_QUEUE_WAIT = registry.histogram(
+    "extraction_task_queue_wait_seconds",
+    "Time from task creation until its extraction starts"
+)
+EXTRACTION_DURATION = registry.histogram(
+    "extraction_duration_seconds",
+    "Wall time of an extraction run",
+    ["outcome"]
+)
+EXTRACTIONS_IN_FLIGHT = registry.gauge(
+    "extraction_in_flight",
+    "Extraction runs currently holding a concurrency slot"
+)
+CONCURRENCY_LIMIT = registry.gauge(
+    "extraction_concurrency_limit",
+    "Maximum number of concurrent extraction runs"
+)
+STEEL_SESSION_CREATE = registry.histogram(
+    "steel_session_create_seconds",
+    "Latency of Steel session creation",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+STEEL_SESSION_RELEASE = registry.histogram(
+    "steel_session_release_seconds",
+    "Latency of Steel session release",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+CIRCUIT_STATE = registry.gauge(
+    "dependency_circuit_state",
+    "Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)",
+    ["dependency"]
+)
+CIRCUIT_REJECTIONS = registry.counter(
+    "dependency_circuit_rejections_total",
+    "Calls refused because a dependency's circuit was open",
+    ["dependency"]
+)
+DIRECT_EXTRACTIONS = registry.counter(
+    "extraction_direct_total",
+    "Deterministic extraction attempts, by outcome (hit or fallback to the agent)",
+    ["outcome"]
+)
+TRAJECTORY_REPLAYS = registry.counter(
+    "agent_trajectory_replays_total",
+    "Replays of recorded agent navigation, by outcome (replayed or failed)",
+    ["outcome"]
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total",
+    "LLM tokens used by extraction runs, by kind (prompt or completion)",
+    ["kind"]
+)
+LLM_COST = registry.counter(
+    "llm_cost_usd_total",
+    "LLM cost of extraction runs at the configured token prices"
+)
+PARSE_FAILURES = registry.counter(
+    "extraction_parse_failures_total",
+    "Agent results that could not be parsed as JSON"
+)
+RESULT_CACHE_LOOKUPS = registry.counter(
+    "result_cache_lookups_total",
+    "Result cache lookups",
+    ["result"]
+)
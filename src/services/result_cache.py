@@ -0,0 +1,272 @@
+"""
+Result cache for extraction results.
+Avoids re-running the browser agent for questions answered recently.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.models import ExtractionResult
+from src.services.metrics import RESULT_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question into a cache key.
+
+    Case, surrounding whitespace, repeated whitespace and trailing
+    punctuation do not change the answer page, so they are folded away.
+    """
+    return " ".join(question.casefold().split()).rstrip("?!. ")
+
+
+class CacheEntry:
+    """Cached extraction result with its storage and expiry times"""
+
+    def __init__(self, result: ExtractionResult, stored_at: float, expires_at: float):
+        self.result = result
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    @property
+    def age(self) -> float:
+        """Seconds since the entry was stored"""
+        return time.time() - self.stored_at
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+class CacheBackend:
+    """Storage backend interface for the result cache"""
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU backend"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend(CacheBackend):
+    """Local on-disk LRU backend, one JSON file per entry"""
+
+    def __init__(self, directory: str, max_entries: int = 10000):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+        # Recency index rebuilt from file modification times
+        files = [
+            f for f in os.listdir(directory)
+            if f.endswith(".json")
+        ]
+        files.sort(key=lambda f: os.path.getmtime(os.path.join(directory, f)))
+        self._index: "OrderedDict[str, None]" = OrderedDict((f[:-5], None) for f in files)
+
+        logger.info(f"Disk result cache at {directory} loaded with {len(self._index)} entries")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        name = self._name(key)
+        if name not in self._index:
+            return None
+
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entry = CacheEntry(
+                result=ExtractionResult.model_validate(data["result"]),
+                stored_at=data["stored_at"],
+                expires_at=data["expires_at"]
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Dropping unreadable cache entry {name}: {e}")
+            self.delete(key)
+            return None
+
+        self._index.move_to_end(name)
+        try:
+            os.utime(self._path(name))
+        except OSError:
+            pass
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        name = self._name(key)
+        path = self._path(name)
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "key": key,
+                "stored_at": entry.stored_at,
+                "expires_at": entry.expires_at,
+                "result": entry.result.model_dump(mode="json")
+            }, f)
+        os.replace(tmp_path, path)
+
+        self._index[name] = None
+        self._index.move_to_end(name)
+        while len(self._index) > self.max_entries:
+            oldest, _ = self._index.popitem(last=False)
+            self._remove_file(oldest)
+
+    def delete(self, key: str):
+        name = self._name(key)
+        self._index.pop(name, None)
+        self._remove_file(name)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _name(self, key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _remove_file(self, name: str):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+
+class ResultCache:
+    """TTL cache of extraction results keyed by normalized question"""
+
+    def __init__(self, backend: CacheBackend, ttl: float = 3600.0):
+        """
+        Initialize result cache
+
+        Args:
+            backend: Storage backend
+            ttl: Seconds a result stays valid
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, question: str, max_age: Optional[float] = None) -> Optional[ExtractionResult]:
+        """
+        Look up a cached result
+
+        Args:
+            question: Question as submitted
+            max_age: Only accept results stored at most this many seconds ago
+
+        Returns:
+            Cached ExtractionResult or None on a miss
+        """
+        key = normalize_question(question)
+        entry = self.backend.get(key)
+
+        if entry is not None and entry.expired:
+            self.backend.delete(key)
+            entry = None
+
+        if entry is None or (max_age is not None and entry.age > max_age):
+            self.misses += 1
+            RESULT_CACHE_LOOKUPS.labels("miss").inc()
+            return None
+
+        self.hits += 1
+        RESULT_CACHE_LOOKUPS.labels("hit").inc()
+        logger.info(f"Result cache hit for question: {question}")
+        return entry.result
+
+    def set(self, question: str, result: ExtractionResult):
+        """
+        Store a result
+
+        Args:
+            question: Question as submitted
+            result: Extraction result to cache
+        """
+        now = time.time()
+        try:
+            self.backend.set(
+                normalize_question(question),
+                CacheEntry(result=result, stored_at=now, expires_at=now + self.ttl)
+            )
+        except OSError as e:
+            logger.warning(f"Failed to cache result for question {question}: {e}")
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hit/miss counters and entry count
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.backend)
+        }
+
+
+def create_result_cache() -> Optional[ResultCache]:
+    """
+    Create the result cache configured by environment variables
+
+    Returns:
+        ResultCache, or None when RESULT_CACHE_BACKEND is "none"
+    """
+    backend_name = os.getenv("RESULT_CACHE_BACKEND", "memory").lower()
+    ttl = float(os.getenv("RESULT_CACHE_TTL", "3600"))
+    max_entries = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000"))
+
+    if backend_name == "none":
+        logger.info("Result cache disabled")
+        return None
+
+    if backend_name == "memory":
+        backend: CacheBackend = MemoryCacheBackend(max_entries=max_entries)
+    elif backend_name == "disk":
+        directory = os.getenv("RESULT_CACHE_DIR", ".cache/results")
+        backend = DiskCacheBackend(directory, max_entries=max_entries)
+    else:
+        raise ValueError(f"Unknown RESULT_CACHE_BACKEND: {backend_name}")
+
+    logger.info(f"Result cache enabled: backend={backend_name}, ttl={ttl}s, max_entries={max_entries}")
+    return ResultCache(backend, ttl=ttl)
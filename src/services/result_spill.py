@@ -0,0 +1,125 @@
+"""
+Spill of large extraction results to compressed files.
+Keeps big results out of the task table; they are loaded back lazily
+when a client asks for them.
+"""
+import gzip
+import logging
+import os
+from typing import Optional
+
+from src.models import ExtractionResult, TaskInfo
+
+logger = logging.getLogger(__name__)
+
+
+class ResultSpill:
+    """Stores large task results as gzip-compressed JSON files"""
+
+    def __init__(self, directory: str, threshold_bytes: int = 65536):
+        """
+        Initialize result spill
+
+        Args:
+            directory: Directory holding spilled results
+            threshold_bytes: Serialized result size above which results spill
+        """
+        self.directory = directory
+        self.threshold_bytes = threshold_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def spill(self, task: TaskInfo, data: Optional[bytes] = None) -> bool:
+        """
+        Move a task's result to disk if it is large
+
+        Args:
+            task: Task holding a result; its result is cleared when spilled
+            data: The result already serialized as JSON (optional)
+
+        Returns:
+            True if the result was spilled
+        """
+        if task.result is None:
+            return False
+
+        if data is None:
+            data = task.result.model_dump_json().encode("utf-8")
+        if len(data) < self.threshold_bytes:
+            return False
+
+        path = self._path(task.task_id)
+        tmp_path = f"{path}.tmp"
+        try:
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to spill result for task {task.task_id}: {e}")
+            return False
+
+        task.result = None
+        task.metadata["result_spilled"] = True
+        logger.info(f"Spilled {len(data)} byte result for task {task.task_id}")
+        return True
+
+    def load(self, task_id: str) -> Optional[ExtractionResult]:
+        """
+        Load a spilled result
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            ExtractionResult or None if the file is missing or unreadable
+        """
+        data = self.load_bytes(task_id)
+        if data is None:
+            return None
+        try:
+            return ExtractionResult.model_validate_json(data)
+        except ValueError as e:
+            logger.warning(f"Failed to load spilled result for task {task_id}: {e}")
+            return None
+
+    def load_bytes(self, task_id: str) -> Optional[bytes]:
+        """
+        Load a spilled result as the JSON it was stored as
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            Serialized result or None if the file is missing or unreadable
+        """
+        try:
+            with gzip.open(self._path(task_id), "rb") as f:
+                return f.read()
+        except OSError as e:
+            logger.warning(f"Failed to load spilled result for task {task_id}: {e}")
+            return None
+
+    def delete(self, task_id: str):
+        """Remove a spilled result"""
+        try:
+            os.remove(self._path(task_id))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, task_id: str) -> str:
+        return os.path.join(self.directory, f"{task_id}.json.gz")
+
+
+def create_result_spill() -> Optional[ResultSpill]:
+    """
+    Create the result spill configured by environment variables
+
+    Returns:
+        ResultSpill, or None when RESULT_SPILL_ENABLED is false
+    """
+    if os.getenv("RESULT_SPILL_ENABLED", "true").lower() != "true":
+        return None
+
+    return ResultSpill(
+        os.getenv("RESULT_SPILL_DIR", "data/results"),
+        threshold_bytes=int(os.getenv("RESULT_SPILL_THRESHOLD_BYTES", "65536"))
+    )
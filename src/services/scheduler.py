@@ -0,0 +1,189 @@
+"""
+Priority scheduler for extraction tasks.
+Orders queued tasks by priority and bounds the queue depth so bursts are
+rejected instead of piling up. Within a priority, each task group is its
+own flow and flows take turns, so one large batch cannot hold back other
+traffic at the same priority.
+"""
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from src.models import TaskPriority
+
+logger = logging.getLogger(__name__)
+
+# Dequeue order, highest priority first
+PRIORITY_ORDER = (TaskPriority.HIGH, TaskPriority.NORMAL, TaskPriority.LOW)
+
+# Flow of tasks that do not belong to a group
+INTERACTIVE_FLOW = ""
+
+
+class QueueFullError(Exception):
+    """Raised when the scheduler queue is at its maximum depth"""
+
+
+class TaskScheduler:
+    """Bounded multi-level queue of task IDs with round-robin across groups"""
+
+    def __init__(self, max_queue_depth: int = 1000):
+        """
+        Initialize scheduler
+
+        Args:
+            max_queue_depth: Maximum number of queued tasks across priorities
+        """
+        self.max_queue_depth = max_queue_depth
+        # Per priority, FIFO queues per flow in round-robin order
+        self._flows: Dict[TaskPriority, "OrderedDict[str, Deque[str]]"] = {
+            p: OrderedDict() for p in PRIORITY_ORDER
+        }
+        self._entry_of: Dict[str, Tuple[TaskPriority, str]] = {}
+        self._not_empty = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._entry_of)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._entry_of
+
+    @property
+    def free_slots(self) -> int:
+        """Number of tasks that can still be queued"""
+        return max(0, self.max_queue_depth - len(self))
+
+    def submit(
+        self,
+        task_id: str,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        force: bool = False,
+        group: Optional[str] = None
+    ) -> int:
+        """
+        Queue a task
+
+        Args:
+            task_id: Task ID
+            priority: Task priority
+            force: Bypass the depth limit (used when resuming tasks)
+            group: Task group sharing one flow (None for interactive tasks)
+
+        Returns:
+            1-based queue position
+
+        Raises:
+            QueueFullError: If the queue is full
+        """
+        if not force and len(self) >= self.max_queue_depth:
+            raise QueueFullError(f"Task queue is full ({self.max_queue_depth} tasks)")
+
+        flow = group or INTERACTIVE_FLOW
+        flows = self._flows[priority]
+        if flow not in flows:
+            flows[flow] = deque()
+        flows[flow].append(task_id)
+        self._entry_of[task_id] = (priority, flow)
+        self._not_empty.set()
+        return self.position(task_id)
+
+    async def wait(self):
+        """Wait until at least one task is queued"""
+        while not self._entry_of:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+    def pop(self) -> Optional[str]:
+        """
+        Remove the next task ID
+
+        Returns:
+            Task ID, or None if the queue is empty
+        """
+        for priority in PRIORITY_ORDER:
+            flows = self._flows[priority]
+            if not flows:
+                continue
+
+            # Take from the flow whose turn it is, then send it to the back
+            flow, queue = next(iter(flows.items()))
+            task_id = queue.popleft()
+            if queue:
+                flows.move_to_end(flow)
+            else:
+                del flows[flow]
+            del self._entry_of[task_id]
+            return task_id
+        return None
+
+    async def get(self) -> str:
+        """Wait for and remove the next task ID"""
+        await self.wait()
+        return self.pop()
+
+    def remove(self, task_id: str) -> bool:
+        """
+        Remove a queued task
+
+        Returns:
+            True if the task was queued
+        """
+        entry = self._entry_of.pop(task_id, None)
+        if entry is None:
+            return False
+
+        priority, flow = entry
+        queue = self._flows[priority][flow]
+        queue.remove(task_id)
+        if not queue:
+            del self._flows[priority][flow]
+        return True
+
+    def position(self, task_id: str) -> Optional[int]:
+        """
+        Get the 1-based position at which a task will be dequeued
+
+        Returns:
+            Position, or None if the task is not queued
+        """
+        entry = self._entry_of.get(task_id)
+        if entry is None:
+            return None
+
+        priority, flow = entry
+        ahead = 0
+        for p in PRIORITY_ORDER:
+            if p == priority:
+                break
+            ahead += sum(len(q) for q in self._flows[p].values())
+
+        # The task leaves in round `index`; every flow yields one task per
+        # round, and flows ahead of this one in the rotation go first
+        index = self._flows[priority][flow].index(task_id)
+        ahead_in_round = True
+        for other, queue in self._flows[priority].items():
+            if other == flow:
+                ahead_in_round = False
+                continue
+            ahead += min(len(queue), index + 1 if ahead_in_round else index)
+        return ahead + index + 1
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with queue depth per priority, the number of queued
+            task groups and the depth limit
+        """
+        stats = {
+            p.value: sum(len(q) for q in self._flows[p].values())
+            for p in PRIORITY_ORDER
+        }
+        stats["depth"] = len(self)
+        stats["groups"] = len({
+            flow for p in PRIORITY_ORDER for flow in self._flows[p] if flow != INTERACTIVE_FLOW
+        })
+        stats["max_depth"] = self.max_queue_depth
+        return stats
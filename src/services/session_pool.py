@@ -0,0 +1,446 @@
+"""
+Steel session lifecycle and warm session pool.
+Keeps pre-created, health-checked sessions ready so extractions don't pay
+the session creation cost on every task, and keeps the blocking Steel SDK
+calls off the event loop.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from steel import Steel
+
+from src.services.circuit_breaker import CircuitBreaker, retry_with_jitter
+from src.services.metrics import STEEL_SESSION_CREATE, STEEL_SESSION_RELEASE
+
+logger = logging.getLogger(__name__)
+
+
+class SteelSessionLifecycle:
+    """Async wrapper running Steel session calls on a bounded worker pool"""
+
+    def __init__(
+        self,
+        steel_client: Steel,
+        max_workers: int = 4,
+        breaker: Optional[CircuitBreaker] = None,
+        create_attempts: int = 3,
+        retry_base_delay: float = 0.5
+    ):
+        """
+        Initialize session lifecycle
+
+        Args:
+            steel_client: Synchronous Steel client
+            max_workers: Maximum number of concurrent blocking Steel calls
+            breaker: Circuit breaker guarding session creation
+            create_attempts: Attempts per session creation
+            retry_base_delay: Upper bound in seconds of the first jittered
+                backoff between attempts
+        """
+        self.steel_client = steel_client
+        self.breaker = breaker
+        self.create_attempts = create_attempts
+        self.retry_base_delay = retry_base_delay
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="steel-io"
+        )
+        self._release_queue: Optional[asyncio.Queue] = None
+        self._release_worker: Optional[asyncio.Task] = None
+
+        self.created_total = 0
+        self.released_total = 0
+
+    async def create(self) -> Any:
+        """
+        Create a Steel session without blocking the event loop
+
+        Failed attempts are retried with jittered backoff while the breaker
+        stays closed. The creation is shielded from the caller: if the caller
+        is cancelled or times out meanwhile, the session Steel goes on to
+        create is released instead of left running.
+
+        Raises:
+            CircuitOpenError: If Steel's circuit is open
+        """
+        async def attempt():
+            with STEEL_SESSION_CREATE.time():
+                return await self._call(self.steel_client.sessions.create)
+
+        creation = asyncio.ensure_future(retry_with_jitter(
+            attempt,
+            attempts=self.create_attempts,
+            base_delay=self.retry_base_delay,
+            breaker=self.breaker
+        ))
+        try:
+            session = await asyncio.shield(creation)
+        except asyncio.CancelledError:
+            creation.add_done_callback(self._release_abandoned)
+            raise
+        self.created_total += 1
+        return session
+
+    def _release_abandoned(self, creation: asyncio.Future):
+        """Release the session of a creation whose caller went away"""
+        if creation.cancelled() or creation.exception() is not None:
+            return
+        session = creation.result()
+        self.created_total += 1
+        logger.info(f"Releasing Steel session {session.id} created after its caller went away")
+        self.release_later(session.id)
+
+    async def retrieve(self, session_id: str) -> Any:
+        """Fetch current session details without blocking the event loop"""
+        return await self._call(self.steel_client.sessions.retrieve, session_id)
+
+    async def release(self, session_id: str):
+        """Release a Steel session and wait for Steel to confirm"""
+        try:
+            with STEEL_SESSION_RELEASE.time():
+                await self._call(self.steel_client.sessions.release, session_id)
+            self.released_total += 1
+            logger.info(f"Steel session released: {session_id}")
+        except Exception as e:
+            logger.warning(f"Failed to release Steel session {session_id}: {e}")
+
+    def release_later(self, session_id: str):
+        """Queue a session for release by the background worker"""
+        if self._release_queue is None:
+            self._release_queue = asyncio.Queue()
+        if self._release_worker is None or self._release_worker.done():
+            self._release_worker = asyncio.create_task(self._drain_releases())
+        self._release_queue.put_nowait(session_id)
+
+    @property
+    def pending_releases(self) -> int:
+        """Number of sessions waiting in the release queue"""
+        return self._release_queue.qsize() if self._release_queue else 0
+
+    async def drain(self):
+        """Wait until every queued release has been sent to Steel"""
+        if self._release_queue is not None:
+            await self._release_queue.join()
+
+    async def close(self, timeout: float = 10.0):
+        """Flush pending releases and stop the worker pool"""
+        try:
+            await asyncio.wait_for(self.drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.pending_releases} Steel sessions not released before shutdown")
+
+        if self._release_worker:
+            self._release_worker.cancel()
+            try:
+                await self._release_worker
+            except asyncio.CancelledError:
+                pass
+            self._release_worker = None
+
+        self._executor.shutdown(wait=False)
+
+    async def _call(self, fn: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    async def _drain_releases(self):
+        while True:
+            session_id = await self._release_queue.get()
+            try:
+                await self.release(session_id)
+            finally:
+                self._release_queue.task_done()
+
+
+class PooledSession:
+    """A Steel session owned by the pool"""
+
+    def __init__(self, session: Any):
+        self.session = session
+        self.id: str = session.id
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.uses = 0
+
+
+class SteelSessionPool:
+    """Pool of Steel sessions with min/max size, idle eviction and recycling"""
+
+    def __init__(
+        self,
+        lifecycle: SteelSessionLifecycle,
+        min_size: int = 0,
+        max_size: int = 5,
+        idle_timeout: float = 300.0,
+        max_uses: int = 10,
+        health_check_after: float = 30.0,
+        reap_interval: float = 30.0
+    ):
+        """
+        Initialize session pool
+
+        Args:
+            lifecycle: Session lifecycle used to create and release sessions
+            min_size: Number of sessions kept warm at all times
+            max_size: Maximum number of sessions (idle + leased)
+            idle_timeout: Seconds an idle session is kept before eviction
+            max_uses: Leases per session before it is recycled
+            health_check_after: Idle seconds after which a session is
+                re-checked with Steel before being leased
+            reap_interval: Seconds between idle eviction passes
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self.lifecycle = lifecycle
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.health_check_after = health_check_after
+        self.reap_interval = reap_interval
+
+        self._idle: List[PooledSession] = []
+        self._leased: Dict[str, PooledSession] = {}
+        self._creating = 0
+        self._condition = asyncio.Condition()
+        self._reaper: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self._leases_total = 0
+
+    @property
+    def size(self) -> int:
+        """Number of sessions owned by the pool, including ones being created"""
+        return len(self._idle) + len(self._leased) + self._creating
+
+    async def start(self):
+        """Fill the pool up to min_size and start idle eviction"""
+        await self._fill()
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_loop())
+        logger.info(f"Steel session pool started with {len(self._idle)} warm sessions")
+
+    async def close(self):
+        """Release every session owned by the pool"""
+        self._closed = True
+
+        if self._reaper:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+
+        async with self._condition:
+            sessions = self._idle + list(self._leased.values())
+            self._idle = []
+            self._leased = {}
+            self._condition.notify_all()
+
+        for pooled in sessions:
+            self._release_session(pooled)
+        await self.lifecycle.drain()
+
+        logger.info(f"Steel session pool closed, released {len(sessions)} sessions")
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[PooledSession]:
+        """
+        Lease a session for the duration of the block.
+
+        The session goes back to the pool on success and is discarded if the
+        block raises, since the browser may be left in an unknown state. On
+        cancellation the replacement is left to the reaper so the caller is
+        not held up creating a new session.
+        """
+        pooled = await self.acquire()
+        try:
+            yield pooled
+        except asyncio.CancelledError:
+            await self.discard(pooled, refill=False)
+            raise
+        except BaseException:
+            await self.discard(pooled)
+            raise
+        else:
+            await self.give_back(pooled)
+
+    async def acquire(self) -> PooledSession:
+        """
+        Take a healthy session from the pool, creating one if needed
+
+        Returns:
+            PooledSession leased to the caller
+        """
+        while True:
+            async with self._condition:
+                if self._closed:
+                    raise RuntimeError("Steel session pool is closed")
+
+                if self._idle:
+                    pooled = self._idle.pop()
+                    self._checkout(pooled)
+                elif self.size < self.max_size:
+                    pooled = None
+                    self._creating += 1
+                else:
+                    await self._condition.wait()
+                    continue
+
+            if pooled is not None:
+                if await self._is_usable(pooled):
+                    return pooled
+                await self.discard(pooled, refill=False)
+                continue
+
+            try:
+                pooled = await self._create_session()
+            except BaseException:
+                async with self._condition:
+                    self._creating -= 1
+                    self._condition.notify()
+                raise
+
+            async with self._condition:
+                self._creating -= 1
+                self._checkout(pooled)
+            return pooled
+
+    async def give_back(self, pooled: PooledSession):
+        """Return a leased session to the pool, recycling it if worn out"""
+        async with self._condition:
+            self._leased.pop(pooled.id, None)
+            pooled.last_used_at = time.monotonic()
+            keep = not self._closed and pooled.uses < self.max_uses
+            if keep:
+                self._idle.append(pooled)
+            self._condition.notify()
+
+        if not keep:
+            logger.info(f"Recycling Steel session {pooled.id} after {pooled.uses} uses")
+            self._release_session(pooled)
+            await self._fill()
+
+    async def discard(self, pooled: PooledSession, refill: bool = True):
+        """Drop a leased session without returning it to the pool"""
+        async with self._condition:
+            self._leased.pop(pooled.id, None)
+            self._condition.notify()
+        self._release_session(pooled)
+        if refill:
+            await self._fill()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get pool statistics
+
+        Returns:
+            Dictionary with pool sizes and lifetime counters
+        """
+        return {
+            "idle": len(self._idle),
+            "leased": len(self._leased),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "created_total": self.lifecycle.created_total,
+            "released_total": self.lifecycle.released_total,
+            "pending_releases": self.lifecycle.pending_releases,
+            "leases_total": self._leases_total
+        }
+
+    def _checkout(self, pooled: PooledSession):
+        """Mark a session as leased; caller must hold the condition lock"""
+        pooled.uses += 1
+        self._leases_total += 1
+        self._leased[pooled.id] = pooled
+
+    async def _is_usable(self, pooled: PooledSession) -> bool:
+        """Check that an idle session can still be leased"""
+        idle_for = time.monotonic() - pooled.last_used_at
+        if idle_for > self.idle_timeout:
+            return False
+        if idle_for < self.health_check_after:
+            return True
+
+        try:
+            session = await self.lifecycle.retrieve(pooled.id)
+        except Exception as e:
+            logger.warning(f"Health check failed for Steel session {pooled.id}: {e}")
+            return False
+
+        status = getattr(session, "status", "live")
+        if status != "live":
+            logger.info(f"Steel session {pooled.id} is no longer live (status={status})")
+            return False
+        return True
+
+    async def _create_session(self) -> PooledSession:
+        session = await self.lifecycle.create()
+        logger.info(f"Steel session created for pool: {session.id}")
+        return PooledSession(session)
+
+    def _release_session(self, pooled: PooledSession):
+        """Hand a session to the background release queue"""
+        self.lifecycle.release_later(pooled.id)
+
+    async def _fill(self):
+        """Create sessions until the pool holds at least min_size"""
+        while not self._closed:
+            async with self._condition:
+                if self.size >= self.min_size:
+                    return
+                self._creating += 1
+
+            # A cancelled fill (the reaper on close) has the session Steel
+            # goes on to create released by the lifecycle
+            try:
+                pooled = await self._create_session()
+            except BaseException as e:
+                async with self._condition:
+                    self._creating -= 1
+                if not isinstance(e, Exception):
+                    raise
+                logger.warning(f"Failed to pre-create Steel session: {e}")
+                return
+
+            async with self._condition:
+                self._creating -= 1
+                closed = self._closed
+                if not closed:
+                    self._idle.append(pooled)
+                    self._condition.notify()
+
+            # Created after close() emptied the pool; nobody else will release it
+            if closed:
+                self._release_session(pooled)
+                return
+
+    async def _evict_idle(self):
+        """Release sessions idle for longer than idle_timeout"""
+        now = time.monotonic()
+        async with self._condition:
+            expired = [p for p in self._idle if now - p.last_used_at > self.idle_timeout]
+            self._idle = [p for p in self._idle if p not in expired]
+
+        for pooled in expired:
+            logger.info(f"Evicting idle Steel session {pooled.id}")
+            self._release_session(pooled)
+
+        await self._fill()
+
+    async def _reap_loop(self):
+        while not self._closed:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self._evict_idle()
+            except Exception as e:
+                logger.warning(f"Steel session pool eviction failed: {e}")
@@ -0,0 +1,73 @@
+"""
+Single-flight coalescing of concurrent identical work.
+Callers asking for the same key while a run is in progress share its
+result instead of starting their own.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """A shared run and the number of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+
+    def in_flight(self, key: str) -> bool:
+        """Check whether a run for the key is in progress"""
+        return key in self._flights
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn for the key, or join the run already in progress.
+
+        Every caller receives the shared result or exception. A caller that
+        is cancelled only detaches itself; the shared run is cancelled once
+        no callers are left waiting on it. fn is called when the run starts,
+        so a run cancelled before it starts never calls it.
+
+        Args:
+            key: Deduplication key
+            fn: Coroutine factory producing the result
+
+        Returns:
+            Result of the shared run
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(self._run(fn)))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self._flights[key] = flight
+        else:
+            logger.info(f"Joining in-flight run for key: {key}")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def _run(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await fn()
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,71 @@
+"""
+In-process publish/subscribe of task updates.
+Lets streaming endpoints push task changes to clients as they happen
+instead of clients polling the task status endpoint.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class TaskEventBus:
+    """Fans out task updates to per-task subscriber queues"""
+
+    def __init__(self, max_queued: int = 100):
+        """
+        Initialize event bus
+
+        Args:
+            max_queued: Updates buffered per subscriber; the oldest are
+                dropped when a slow subscriber falls further behind
+        """
+        self.max_queued = max_queued
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, task_id: str, max_queued: Optional[int] = None) -> asyncio.Queue:
+        """
+        Subscribe to updates of a task
+
+        Args:
+            task_id: Task ID
+            max_queued: Buffer size overriding the bus default
+
+        Returns:
+            Queue receiving every update published for the task
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued or self.max_queued)
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        """Stop delivering updates to a queue"""
+        queues = self._subscribers.get(task_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[task_id]
+
+    def has_subscribers(self, task_id: str) -> bool:
+        """Check whether anyone is listening to a task"""
+        return task_id in self._subscribers
+
+    def publish(self, task_id: str, event: Any):
+        """
+        Deliver an update to every subscriber of a task
+
+        Args:
+            task_id: Task ID
+            event: Update to deliver
+        """
+        for queue in self._subscribers.get(task_id, ()):
+            if queue.full():
+                # Keep the newest updates; the final one must not be lost
+                queue.get_nowait()
+                logger.debug(f"Dropped oldest update for slow subscriber of task {task_id}")
+            queue.put_nowait(event)
+
+    def __len__(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
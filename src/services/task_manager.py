@@ -4,43 +4,238 @@ Provides task queuing, status tracking, and result storage.
 """
 import asyncio
 import logging
+import os
+import time
 import uuid
-from datetime import datetime
-from typing import Dict, Optional
-from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Set
 
-from src.models import TaskInfo, TaskStatus, ExtractionResult
-from src.services.extraction_service import ExtractionService
+from src.models import (
+    ExtractionResult,
+    TaskGroupInfo,
+    TaskGroupStatusResponse,
+    TaskInfo,
+    TaskPriority,
+    TaskStatus,
+    TaskStatusResponse
+)
+from src.services.circuit_breaker import CircuitOpenError
+from src.services.concurrency import AdaptiveLimiter
+from src.services.extraction_service import ExtractionService, ExtractionTimeoutError
+from src.services.metrics import (
+    CONCURRENCY_LIMIT,
+    EXTRACTIONS_IN_FLIGHT,
+    LLM_COST,
+    LLM_TOKENS,
+    TASK_QUEUE_WAIT,
+    TASKS_FINISHED,
+    TASKS_REJECTED,
+    TASKS_SUBMITTED
+)
+from src.services.json_response import ResultJSONCache, embed_json, json_array, make_etag
+from src.services.result_cache import ResultCache, create_result_cache, normalize_question
+from src.services.scheduler import QueueFullError, TaskScheduler
+from src.services.single_flight import SingleFlight
+from src.services.task_events import TaskEventBus
+from src.services.result_spill import ResultSpill, create_result_spill
+from src.services.task_store import ACTIVE_STATUSES, SQLiteTaskStore, TaskStore, create_task_store
+from src.services.token_usage import TokenUsage
+from src.services.work_queue import SQLiteWorkQueue
 
 logger = logging.getLogger(__name__)
 
 
+def _group_channel(group_id: str) -> str:
+    """Event bus channel carrying the finished tasks of a group"""
+    return f"group:{group_id}"
+
+
 class TaskManager:
     """Manages async extraction tasks with status tracking"""
     
-    def __init__(self, max_concurrent_tasks: int = 5):
+    def __init__(
+        self,
+        max_concurrent_tasks: int = 5,
+        store: Optional[TaskStore] = None,
+        work_queue: Optional[SQLiteWorkQueue] = None
+    ):
         """
         Initialize task manager
         
         Args:
-            max_concurrent_tasks: Maximum number of concurrent extraction tasks
+            max_concurrent_tasks: Maximum number of concurrent extraction tasks;
+                with ADAPTIVE_CONCURRENCY the limit moves between
+                MIN_CONCURRENT_TASKS and this value
+            store: Task storage backend (defaults to the TASK_STORE setting)
+            work_queue: Shared queue drained by worker processes; when set,
+                submitted tasks run on the workers instead of in-process
+                
+        Raises:
+            ValueError: If a work queue is given without a shared SQLite store
         """
-        self.tasks: Dict[str, TaskInfo] = {}
+        self.store = store or create_task_store()
+        if work_queue is not None and not isinstance(self.store, SQLiteTaskStore):
+            raise ValueError("Queue execution mode needs the shared SQLite task store (TASK_STORE=sqlite)")
         self.max_concurrent_tasks = max_concurrent_tasks
-        self.semaphore = asyncio.Semaphore(max_concurrent_tasks)
-        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_tasks)
+        adaptive = os.getenv("ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+        self.semaphore = AdaptiveLimiter(
+            max_concurrent_tasks,
+            min_limit=int(os.getenv("MIN_CONCURRENT_TASKS", "1")) if adaptive else None,
+            backoff=float(os.getenv("ADAPTIVE_CONCURRENCY_BACKOFF", "0.75")),
+            latency_tolerance=float(os.getenv("ADAPTIVE_CONCURRENCY_LATENCY_TOLERANCE", "2.0"))
+        )
+        CONCURRENCY_LIMIT.set(self.semaphore.limit)
+        
+        # Priority queue in front of the concurrency slots
+        self.scheduler = TaskScheduler(max_queue_depth=int(os.getenv("MAX_QUEUE_DEPTH", "1000")))
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+        
+        # Queue execution mode: workers write results to the shared store
+        # and the change feed brings them back here
+        self.work_queue = work_queue
+        self.sync_interval = float(os.getenv("TASK_SYNC_INTERVAL", "0.5"))
+        self._change_seq = 0
+        self._syncer: Optional[asyncio.Task] = None
+        
+        # Push notifications of task updates for streaming clients, and
+        # completion events for long-polling ones
+        self.events = TaskEventBus()
+        self._completions: Dict[str, asyncio.Event] = {}
+        
+        # Task groups created by batch submissions, or read back from the store
+        self.groups: Dict[str, TaskGroupInfo] = {}
+        self.batch_max_questions = int(os.getenv("BATCH_MAX_QUESTIONS", "1000"))
         
         # Service instances
         self.extraction_service = ExtractionService()
+        self.result_cache: Optional[ResultCache] = create_result_cache()
+        
+        # LLM tokens used by all extraction runs of this process
+        self.token_usage: TokenUsage = self.extraction_service.create_usage()
+        
+        # In-flight deduplication of identical questions
+        self.single_flight = SingleFlight()
+        self._flight_waiters: Dict[str, Set[str]] = {}
+        self._flight_tasks: Dict[str, Set[str]] = {}
+        self._running_flights: Set[str] = set()
+        
+        # Retention of finished tasks and spill of large results
+        self.result_spill: Optional[ResultSpill] = create_result_spill()
+        self.retention_seconds = float(os.getenv("TASK_RETENTION_SECONDS", "86400"))
+        self.retention_max_finished = int(os.getenv("TASK_RETENTION_MAX_FINISHED", "10000"))
+        self.compact_interval = float(os.getenv("TASK_COMPACT_INTERVAL", "60"))
+        self._compactor: Optional[asyncio.Task] = None
+        
+        # Finished results serialized once, for the task read endpoints
+        self.result_json = ResultJSONCache(
+            int(float(os.getenv("RESULT_JSON_CACHE_MB", "64")) * 1024 * 1024)
+        )
         
         logger.info(f"TaskManager initialized with max {max_concurrent_tasks} concurrent tasks")
     
-    def create_task(self, question: str) -> str:
+    async def start(self, worker: bool = False):
+        """
+        Warm up service resources and resume unfinished tasks
+        
+        Args:
+            worker: Start as an extraction worker, which only executes tasks
+                it is handed and leaves recovery and compaction to the API
+        """
+        await self.store.start()
+        await self.extraction_service.start()
+        if worker:
+            return
+        
+        if self.work_queue is not None:
+            self._change_seq = self.store.latest_change()
+            self._syncer = asyncio.create_task(self._sync_loop())
+        self.recover_tasks()
+        if self.work_queue is None:
+            self._ensure_dispatcher()
+        self._compactor = asyncio.create_task(self._compact_loop())
+    
+    async def close(self):
+        """Release service resources"""
+        for background in (self._compactor, self._dispatcher, self._syncer):
+            if background:
+                background.cancel()
+                try:
+                    await background
+                except asyncio.CancelledError:
+                    pass
+        self._compactor = None
+        self._dispatcher = None
+        self._syncer = None
+        
+        # Interrupted tasks stay unfinished and are re-queued on next start
+        runners = list(self._running.values())
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+        
+        await self.extraction_service.close()
+        await self.store.close()
+    
+    def recover_tasks(self) -> int:
+        """
+        Re-queue tasks that were PENDING or RUNNING when the process stopped
+        
+        Returns:
+            Number of re-queued tasks
+        """
+        tasks = self.store.unfinished()
+        
+        if self.work_queue is not None:
+            # Entries survive in the shared queue; a claim held by a worker
+            # that died expires and the task is claimed again
+            self.store.flush()
+            self.work_queue.enqueue_many(
+                (
+                    (
+                        task.task_id,
+                        TaskPriority(task.metadata.get("priority", TaskPriority.NORMAL)),
+                        task.metadata.get("group_id")
+                    )
+                    for task in tasks
+                ),
+                force=True
+            )
+            return len(tasks)
+        
+        for task in tasks:
+            self.update_task_status(
+                task.task_id,
+                TaskStatus.PENDING,
+                progress="Re-queued after restart"
+            )
+            self.submit_task(task.task_id, force=True)
+        
+        if tasks:
+            logger.info(f"Re-queued {len(tasks)} unfinished tasks")
+        return len(tasks)
+    
+    def create_task(
+        self,
+        question: str,
+        max_age: Optional[int] = None,
+        no_cache: bool = False,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        timeout_seconds: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        group_id: Optional[str] = None
+    ) -> str:
         """
         Create a new extraction task
         
         Args:
             question: Question to extract answers for
+            max_age: Maximum age in seconds of an acceptable cached result
+            no_cache: Skip the result cache lookup
+            priority: Scheduling priority
+            timeout_seconds: Time budget for the extraction
+            max_steps: Agent step budget for the extraction
+            group_id: Task group the task belongs to
             
         Returns:
             Task ID
@@ -52,25 +247,46 @@ class TaskManager:
             status=TaskStatus.PENDING,
             question=question,
             created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            updated_at=datetime.utcnow(),
+            metadata={"priority": TaskPriority(priority).value}
         )
+        if max_age is not None:
+            task_info.metadata["max_age"] = max_age
+        if no_cache:
+            task_info.metadata["no_cache"] = True
+        if timeout_seconds is not None:
+            task_info.metadata["timeout_seconds"] = timeout_seconds
+        if max_steps is not None:
+            task_info.metadata["max_steps"] = max_steps
+        if group_id is not None:
+            task_info.metadata["group_id"] = group_id
         
-        self.tasks[task_id] = task_info
+        self.store.add(task_info)
         logger.info(f"Created task {task_id} for question: {question}")
         
         return task_id
     
-    def get_task(self, task_id: str) -> Optional[TaskInfo]:
+    def get_task(self, task_id: str, load_result: bool = True) -> Optional[TaskInfo]:
         """
         Get task information
         
         Args:
             task_id: Task ID
+            load_result: Load a spilled result back from disk
             
         Returns:
             TaskInfo or None if not found
         """
-        return self.tasks.get(task_id)
+        task = self.store.get(task_id)
+        return self._with_result(task) if load_result else task
+    
+    def _with_result(self, task: Optional[TaskInfo]) -> Optional[TaskInfo]:
+        """Return the task with its spilled result loaded back from disk"""
+        if task is None or task.result is not None or not task.metadata.get("result_spilled"):
+            return task
+        if not self.result_spill:
+            return task
+        return task.model_copy(update={"result": self.result_spill.load(task.task_id)})
     
     def update_task_status(
         self,
@@ -90,11 +306,17 @@ class TaskManager:
             error: Error message (if failed)
             progress: Progress message
         """
-        if task_id not in self.tasks:
+        task = self.store.get(task_id)
+        if not task:
             logger.warning(f"Task {task_id} not found")
             return
         
-        task = self.tasks[task_id]
+        # Work finishing after a cancellation must not revive the task
+        if task.status == TaskStatus.CANCELLED:
+            logger.info(f"Ignoring {status} update for cancelled task {task_id}")
+            return
+        
+        self._count_transition(task, status)
         task.status = status
         task.updated_at = datetime.utcnow()
         
@@ -105,32 +327,315 @@ class TaskManager:
         if progress:
             task.metadata["progress"] = progress
         
+        # Serialize the result once for spilling and for later reads
+        result_json = result.model_dump_json().encode("utf-8") if result else None
+        
+        # Keep large results out of the task table
+        if result and self.result_spill:
+            self.result_spill.spill(task, result_json)
+        
+        self.store.save(task)
+        if result_json is not None:
+            self.result_json.put(task_id, task.updated_at, result_json)
         logger.info(f"Task {task_id} updated to status: {status}")
+        
+        self._publish_update(task, result)
     
-    async def execute_task(self, task_id: str):
+    def _save_metadata(self, task: TaskInfo):
+        """
+        Persist a metadata change made on a task outside update_task_status
+        
+        Tasks read back from a shared store are copies, so the change is
+        saved through the store; the update time moves so ETags and cached
+        response bodies of the task change with it.
+        """
+        task.updated_at = datetime.utcnow()
+        self.store.save(task)
+    
+    def _count_transition(self, task: TaskInfo, status: TaskStatus):
+        """Update finish metrics and group counts for a status change"""
+        if task.status in ACTIVE_STATUSES and status not in ACTIVE_STATUSES:
+            TASKS_FINISHED.labels(status.value).inc()
+        
+        group_id = task.metadata.get("group_id")
+        group = self.groups.get(group_id) if group_id else None
+        if group and task.status != status:
+            group.counts[task.status] -= 1
+            group.counts[status] += 1
+    
+    def _publish_update(self, task: TaskInfo, result: Optional[ExtractionResult] = None):
+        """
+        Wake long-polling waiters and push a task update to subscribers
+        
+        Args:
+            task: Updated task
+            result: Result of the update, if the task's own was spilled
+        """
+        task_id = task.task_id
+        status = task.status
+        group_id = task.metadata.get("group_id")
+        
+        if status not in ACTIVE_STATUSES:
+            completion = self._completions.pop(task_id, None)
+            if completion:
+                completion.set()
+        
+        task_listeners = self.events.has_subscribers(task_id)
+        group_listeners = (
+            group_id is not None
+            and status not in ACTIVE_STATUSES
+            and self.events.has_subscribers(_group_channel(group_id))
+        )
+        if task_listeners or group_listeners:
+            if result and task.result is None:
+                task = task.model_copy(update={"result": result})
+            else:
+                task = self._with_result(task)
+            snapshot = self.task_snapshot(task)
+            if task_listeners:
+                self.events.publish(task_id, snapshot)
+            if group_listeners:
+                self.events.publish(_group_channel(group_id), snapshot)
+    
+    async def wait_for_task(
+        self,
+        task_id: str,
+        timeout: float,
+        load_result: bool = True
+    ) -> Optional[TaskInfo]:
+        """
+        Wait until a task reaches a final status
+        
+        Args:
+            task_id: Task ID
+            timeout: Maximum seconds to wait
+            load_result: Load a spilled result back from disk
+            
+        Returns:
+            TaskInfo, still active if the timeout passed, or None if not found
+        """
+        task = self.get_task(task_id, load_result=load_result)
+        if not task or task.status not in ACTIVE_STATUSES or timeout <= 0:
+            return task
+        
+        completion = self._completions.setdefault(task_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(completion.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.get_task(task_id, load_result=load_result)
+    
+    def task_snapshot(self, task: TaskInfo) -> TaskStatusResponse:
+        """
+        Build the client-facing view of a task
+        
+        Args:
+            task: Task with its result loaded
+            
+        Returns:
+            TaskStatusResponse
+        """
+        return TaskStatusResponse(
+            task_id=task.task_id,
+            status=task.status,
+            progress=task.metadata.get("progress"),
+            queue_position=self.get_queue_position(task.task_id),
+            result=task.result,
+            error=task.error,
+            created_at=task.created_at,
+            updated_at=task.updated_at
+        )
+    
+    def result_json_bytes(self, task: TaskInfo) -> Optional[bytes]:
+        """
+        Get a task's result serialized as JSON
+        
+        Finished results are serialized once and then served from the
+        result JSON cache; spilled results are read back as stored, without
+        being parsed.
+        
+        Args:
+            task: Task as read from the store, with or without its result
+            
+        Returns:
+            Serialized result, or None if the task has none
+        """
+        if task.result is None and not task.metadata.get("result_spilled"):
+            return None
+        
+        data = self.result_json.get(task.task_id, task.updated_at)
+        if data is not None:
+            return data
+        
+        if task.result is not None:
+            data = task.result.model_dump_json().encode("utf-8")
+        elif self.result_spill:
+            data = self.result_spill.load_bytes(task.task_id)
+        if data is not None:
+            self.result_json.put(task.task_id, task.updated_at, data)
+        return data
+    
+    def task_status_json(self, task: TaskInfo) -> bytes:
+        """
+        Serialize the client-facing view of a task
+        
+        Encodes the same document as task_snapshot, with the result taken
+        from result_json_bytes instead of being encoded again.
+        
+        Args:
+            task: Task as read from the store, with or without its result
+            
+        Returns:
+            TaskStatusResponse as JSON
+        """
+        envelope = self.task_snapshot(task).model_dump_json(exclude={"result"}).encode("utf-8")
+        return embed_json(envelope, "result", self.result_json_bytes(task))
+    
+    def task_list_json(self, tasks: List[TaskInfo]) -> bytes:
+        """
+        Serialize a task listing
+        
+        Args:
+            tasks: Tasks as read from the store, with or without their results
+            
+        Returns:
+            List of TaskInfo as JSON
+        """
+        return json_array(
+            embed_json(
+                task.model_dump_json(exclude={"result"}).encode("utf-8"),
+                "result",
+                self.result_json_bytes(task)
+            )
+            for task in tasks
+        )
+    
+    def task_status_etag(self, task: TaskInfo) -> str:
+        """
+        ETag of the client-facing view of a task
+        
+        Every update stamps updated_at; only the queue position of a
+        pending task moves without one.
+        
+        Args:
+            task: Task as read from the store
+            
+        Returns:
+            Weak entity tag
+        """
+        queue_position = self.get_queue_position(task.task_id) if task.status in ACTIVE_STATUSES else None
+        return make_etag(task.task_id, task.updated_at.isoformat(), queue_position)
+    
+    def task_list_etag(self, tasks: List[TaskInfo]) -> str:
+        """
+        ETag of a task listing
+        
+        Args:
+            tasks: Tasks of the listing, in order
+            
+        Returns:
+            Weak entity tag
+        """
+        return make_etag("list", *(f"{task.task_id}@{task.updated_at.isoformat()}" for task in tasks))
+    
+    async def watch_task(
+        self,
+        task_id: str,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[TaskStatusResponse]]:
+        """
+        Stream a task's state as it changes
+        
+        Yields the current state first, then every update until the task
+        reaches a final status.
+        
+        Args:
+            task_id: Task ID
+            heartbeat: Yield None after this many idle seconds so callers
+                can keep connections alive
+            
+        Yields:
+            TaskStatusResponse per update, or None as a heartbeat
+        """
+        # Subscribe before reading the task so no update is missed
+        queue = self.events.subscribe(task_id)
+        try:
+            task = self.get_task(task_id)
+            if not task:
+                return
+            
+            snapshot = self.task_snapshot(task)
+            yield snapshot
+            
+            while snapshot.status in ACTIVE_STATUSES:
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield snapshot
+        finally:
+            self.events.unsubscribe(task_id, queue)
+    
+    async def execute_task(self, task_id: str, slot_held: bool = False):
         """
         Execute an extraction task
         
         Args:
             task_id: Task ID to execute
+            slot_held: The caller already acquired a concurrency slot for the
+                task; it is handed to the extraction run or released
         """
-        async with self.semaphore:  # Limit concurrent tasks
+        try:
             task = self.get_task(task_id)
             if not task:
                 logger.error(f"Task {task_id} not found")
                 return
             
-            try:
-                # Update status to running
-                self.update_task_status(
-                    task_id,
-                    TaskStatus.RUNNING,
-                    progress="Starting extraction..."
+            if task.status != TaskStatus.PENDING:
+                logger.info(f"Skipping task {task_id} with status {task.status}")
+                return
+            
+            # Serve cached results without running an extraction
+            if self._complete_from_cache(task):
+                return
+            
+            # Identical questions share one extraction run
+            key = normalize_question(task.question)
+            if self.single_flight.in_flight(key):
+                # Joining a run in progress does not need a slot of its own
+                if slot_held:
+                    self.semaphore.release()
+                    slot_held = False
+                task.metadata["coalesced"] = True
+                self._save_metadata(task)
+                if key in self._running_flights:
+                    self.update_task_status(
+                        task_id,
+                        TaskStatus.RUNNING,
+                        progress="Joined in-flight extraction..."
+                    )
+            
+            waiting = self._flight_waiters.setdefault(key, set())
+            waiting.add(task_id)
+            if key in self._flight_tasks:
+                self._flight_tasks[key].add(task_id)
+            
+            def start_flight():
+                # A new run takes over the slot unless it was released already
+                nonlocal slot_held
+                handed_off, slot_held = slot_held, False
+                return self._run_flight(
+                    key,
+                    task.question,
+                    slot_held=handed_off,
+                    timeout=task.metadata.get("timeout_seconds"),
+                    max_steps=task.metadata.get("max_steps")
                 )
-                
-                # Execute extraction
+            
+            try:
                 logger.info(f"Executing task {task_id}")
-                result = await self.extraction_service.extract_reddit_answers(task.question)
+                result = await self.single_flight.do(key, start_flight)
                 
                 # Update with result
                 self.update_task_status(
@@ -141,6 +646,16 @@ class TaskManager:
                 
                 logger.info(f"Task {task_id} completed successfully")
                 
+            except ExtractionTimeoutError as e:
+                logger.warning(f"Task {task_id} timed out: {e}")
+                
+                self.update_task_status(
+                    task_id,
+                    TaskStatus.TIMED_OUT,
+                    result=e.partial,
+                    error=str(e)
+                )
+                
             except Exception as e:
                 error_msg = f"Extraction failed: {str(e)}"
                 logger.error(f"Task {task_id} failed: {error_msg}", exc_info=True)
@@ -150,22 +665,566 @@ class TaskManager:
                     TaskStatus.FAILED,
                     error=error_msg
                 )
+            
+            finally:
+                waiting.discard(task_id)
+                if not waiting and self._flight_waiters.get(key) is waiting:
+                    del self._flight_waiters[key]
+        
+        finally:
+            if slot_held:
+                slot_held = False
+                self.semaphore.release()
+    
+    def _complete_from_cache(self, task: TaskInfo) -> bool:
+        """
+        Complete a task from the result cache
+        
+        Args:
+            task: Pending task
+            
+        Returns:
+            True if the task was completed
+        """
+        cached = self.get_cached_result(
+            task.question,
+            max_age=task.metadata.get("max_age"),
+            no_cache=task.metadata.get("no_cache", False)
+        )
+        if not cached:
+            return False
+        
+        task.metadata["cache_hit"] = True
+        self._save_metadata(task)
+        self.update_task_status(task.task_id, TaskStatus.COMPLETED, result=cached)
+        logger.info(f"Task {task.task_id} completed from result cache")
+        return True
     
-    def submit_task(self, task_id: str):
+    async def _run_flight(
+        self,
+        key: str,
+        question: str,
+        slot_held: bool = False,
+        timeout: Optional[float] = None,
+        max_steps: Optional[int] = None
+    ) -> ExtractionResult:
+        """
+        Run the shared extraction for every task waiting on a question
+        
+        The run uses the budgets of the task that started it.
+        
+        Args:
+            key: Normalized question
+            question: Question as submitted by the first task
+            slot_held: A concurrency slot was already acquired for the run
+            timeout: Time budget in seconds
+            max_steps: Agent step budget
+            
+        Returns:
+            Extraction result
+        """
+        if not slot_held:
+            await self.semaphore.acquire()  # Limit concurrent tasks
+        
+        self._running_flights.add(key)
+        EXTRACTIONS_IN_FLIGHT.inc()
+        # Every task served by the run, including ones cancelled before it ends
+        flight_tasks = self._flight_tasks[key] = set(self._flight_waiters.get(key, ()))
+        usage: Optional[TokenUsage] = None
+        cancelled = False
+        try:
+            # Update status to running for every attached task
+            now = datetime.utcnow()
+            for waiting_id in list(flight_tasks):
+                waiting_task = self.store.get(waiting_id)
+                if waiting_task and waiting_task.status == TaskStatus.PENDING:
+                    TASK_QUEUE_WAIT.observe((now - waiting_task.created_at).total_seconds())
+                self.update_task_status(
+                    waiting_id,
+                    TaskStatus.RUNNING,
+                    progress="Starting extraction..."
+                )
+            
+            started = time.monotonic()
+            usage = self.extraction_service.create_usage()
+            try:
+                result = await self.run_extraction(question, timeout=timeout, max_steps=max_steps, usage=usage)
+            except ExtractionTimeoutError:
+                # A spent budget shows up as latency, not as a failure
+                self._record_run(started, ok=True)
+                raise
+            except CircuitOpenError:
+                # Refused without loading the dependency
+                raise
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            except Exception:
+                self._record_run(started, ok=False)
+                raise
+            self._record_run(started, ok=True)
+            return result
+        finally:
+            if self._flight_tasks.get(key) is flight_tasks:
+                del self._flight_tasks[key]
+            if usage is not None:
+                self._record_usage(flight_tasks, usage, cancelled=cancelled)
+            self._running_flights.discard(key)
+            EXTRACTIONS_IN_FLIGHT.dec()
+            self.semaphore.release()
+    
+    def _record_usage(self, task_ids: Set[str], usage: TokenUsage, cancelled: bool = False):
+        """
+        Report the LLM tokens of a run on its tasks and in the totals
+        
+        Args:
+            task_ids: Tasks the run served, cancelled ones included
+            usage: Tokens the run used
+            cancelled: The run was cancelled; its tokens were still paid
+                for but it does not count as a run in the per-run averages
+        """
+        self.token_usage.merge(usage, count_run=not cancelled)
+        LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens)
+        LLM_TOKENS.labels("completion").inc(usage.completion_tokens)
+        LLM_COST.inc(usage.cost)
+        
+        tokens = usage.to_dict()
+        for task_id in task_ids:
+            task = self.store.get(task_id)
+            if task:
+                task.metadata["tokens"] = tokens
+                self._save_metadata(task)
+    
+    def get_token_statistics(self) -> Dict[str, float]:
+        """
+        Get LLM token statistics
+        
+        Returns:
+            Dictionary with token totals, cost and averages per extraction run
+        """
+        stats = self.token_usage.to_dict()
+        stats["runs"] = self.token_usage.runs
+        runs = self.token_usage.runs or 1
+        stats["avg_tokens_per_run"] = round(self.token_usage.total_tokens / runs, 1)
+        stats["avg_cost_usd_per_run"] = round(self.token_usage.cost / runs, 6)
+        return stats
+    
+    def _record_run(self, started: float, ok: bool):
+        """Feed the outcome of an extraction run to the concurrency limit"""
+        self.semaphore.record(time.monotonic() - started, ok=ok, started=started)
+        CONCURRENCY_LIMIT.set(self.semaphore.limit)
+    
+    async def extract(
+        self,
+        question: str,
+        max_age: Optional[int] = None,
+        no_cache: bool = False,
+        timeout_seconds: Optional[float] = None,
+        max_steps: Optional[int] = None
+    ) -> ExtractionResult:
+        """
+        Extract answers without creating a task
+        
+        Uses the result cache and joins an identical extraction already in
+        progress instead of starting a new one.
+        
+        Args:
+            question: Question to extract answers for
+            max_age: Maximum age in seconds of an acceptable cached result
+            no_cache: Skip the result cache lookup
+            timeout_seconds: Time budget for the extraction
+            max_steps: Agent step budget for the extraction
+            
+        Returns:
+            Extraction result
+            
+        Raises:
+            ExtractionTimeoutError: If the extraction runs out of budget
+        """
+        cached = self.get_cached_result(question, max_age=max_age, no_cache=no_cache)
+        if cached:
+            return cached
+        
+        key = normalize_question(question)
+        return await self.single_flight.do(
+            key,
+            lambda: self._run_flight(key, question, timeout=timeout_seconds, max_steps=max_steps)
+        )
+    
+    def get_cached_result(
+        self,
+        question: str,
+        max_age: Optional[int] = None,
+        no_cache: bool = False
+    ) -> Optional[ExtractionResult]:
+        """
+        Look up a cached extraction result
+        
+        Args:
+            question: Question to look up
+            max_age: Maximum age in seconds of an acceptable result
+            no_cache: Skip the lookup entirely
+            
+        Returns:
+            Cached ExtractionResult or None
+        """
+        if not self.result_cache or no_cache:
+            return None
+        return self.result_cache.get(question, max_age=max_age)
+    
+    async def run_extraction(
+        self,
+        question: str,
+        timeout: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        usage: Optional[TokenUsage] = None
+    ) -> ExtractionResult:
+        """
+        Run a fresh extraction and store the result in the cache
+        
+        Args:
+            question: Question to extract answers for
+            timeout: Time budget in seconds (service default if None)
+            max_steps: Agent step budget (service default if None)
+            usage: Accumulates the LLM tokens of the run
+            
+        Returns:
+            Extraction result
+        """
+        result = await self.extraction_service.extract_reddit_answers(
+            question,
+            timeout=timeout,
+            max_steps=max_steps,
+            usage=usage
+        )
+        
+        # Empty results usually mean the agent failed to read the page
+        if self.result_cache and (result.sections or result.relatedPosts):
+            self.result_cache.set(question, result)
+        
+        return result
+    
+    def submit_task(self, task_id: str, force: bool = False) -> Optional[int]:
         """
         Submit task for async execution
         
+        Tasks answered from the cache or joining an identical extraction in
+        progress start right away; all others wait in the priority queue for
+        a concurrency slot.
+        
         Args:
             task_id: Task ID to submit
+            force: Queue the task even if the queue is full
+            
+        Returns:
+            Queue position, or None if the task did not need to queue
+            
+        Raises:
+            QueueFullError: If the queue is full; the task is cancelled
+            CircuitOpenError: If a dependency is down; the task fails
+        """
+        task = self.store.get(task_id)
+        if not task:
+            raise ValueError(f"Task {task_id} not found")
+        
+        if self._complete_from_cache(task):
+            TASKS_SUBMITTED.inc()
+            return None
+        
+        # Do not queue work that is bound to fail while a dependency is down
+        try:
+            self.extraction_service.check_available()
+        except CircuitOpenError as e:
+            self.update_task_status(task_id, TaskStatus.FAILED, error=f"Rejected: {e}")
+            raise
+        
+        if self.work_queue is None and self.single_flight.in_flight(normalize_question(task.question)):
+            TASKS_SUBMITTED.inc()
+            self._spawn(task_id, self.execute_task(task_id))
+            logger.info(f"Task {task_id} submitted to join an in-flight extraction")
+            return None
+        
+        priority = TaskPriority(task.metadata.get("priority", TaskPriority.NORMAL))
+        group_id = task.metadata.get("group_id")
+        try:
+            if self.work_queue is not None:
+                # Workers read the task from the store once they claim it
+                self.store.flush()
+                position = self.work_queue.enqueue(task_id, priority, group=group_id, force=force) or None
+            else:
+                position = self.scheduler.submit(task_id, priority, force=force, group=group_id)
+        except QueueFullError:
+            TASKS_REJECTED.inc()
+            self.update_task_status(task_id, TaskStatus.CANCELLED, error="Rejected: task queue is full")
+            raise
+        
+        TASKS_SUBMITTED.inc()
+        if self.work_queue is None:
+            self._ensure_dispatcher()
+        logger.info(f"Task {task_id} queued at position {position} with {priority.value} priority")
+        return position
+    
+    def create_group(
+        self,
+        questions: List[str],
+        max_age: Optional[int] = None,
+        no_cache: bool = False,
+        priority: TaskPriority = TaskPriority.LOW,
+        timeout_seconds: Optional[float] = None,
+        max_steps: Optional[int] = None
+    ) -> TaskGroupInfo:
+        """
+        Create and submit one task per question as a task group
+        
+        The whole batch is admitted or rejected at once. Its tasks share one
+        scheduler flow, which takes turns with other traffic of the same
+        priority instead of running ahead of it.
+        
+        Args:
+            questions: Questions to extract answers for
+            max_age: Maximum age in seconds of an acceptable cached result
+            no_cache: Skip the result cache lookup
+            priority: Scheduling priority of every task
+            timeout_seconds: Time budget per extraction
+            max_steps: Agent step budget per extraction
+            
+        Returns:
+            TaskGroupInfo
+            
+        Raises:
+            ValueError: If the batch is empty or too large
+            QueueFullError: If the queue cannot hold the batch
+            CircuitOpenError: If a dependency is down
+        """
+        if not questions:
+            raise ValueError("A batch needs at least one question")
+        if len(questions) > self.batch_max_questions:
+            raise ValueError(f"A batch holds at most {self.batch_max_questions} questions")
+        self.extraction_service.check_available()
+        free_slots = self._free_queue_slots()
+        if len(questions) > free_slots:
+            TASKS_REJECTED.inc(len(questions))
+            raise QueueFullError(
+                f"Task queue cannot hold a batch of {len(questions)} ({free_slots} free)"
+            )
+        
+        group = TaskGroupInfo(
+            group_id=str(uuid.uuid4()),
+            created_at=datetime.utcnow(),
+            counts={status: 0 for status in TaskStatus}
+        )
+        self.groups[group.group_id] = group
+        
+        for question in questions:
+            task_id = self.create_task(
+                question,
+                max_age=max_age,
+                no_cache=no_cache,
+                priority=priority,
+                timeout_seconds=timeout_seconds,
+                max_steps=max_steps,
+                group_id=group.group_id
+            )
+            group.task_ids.append(task_id)
+            group.counts[TaskStatus.PENDING] += 1
+        self.store.add_group(group)
+        
+        # Submit once every task is counted, as cached ones finish right away
+        for task_id in group.task_ids:
+            self.submit_task(task_id, force=True)
+        
+        logger.info(f"Created task group {group.group_id} with {len(questions)} tasks")
+        return group
+    
+    def get_group(self, group_id: str) -> Optional[TaskGroupInfo]:
+        """
+        Get a task group, reading it back from the store if not known here
+        
+        Groups created before a restart, or by another process sharing the
+        store, are loaded once and then kept current by status updates.
+        
+        Args:
+            group_id: Group ID
+            
+        Returns:
+            TaskGroupInfo or None if not found
+        """
+        group = self.groups.get(group_id)
+        if group is None:
+            group = self.store.get_group(group_id)
+            if group is not None:
+                self.groups[group_id] = group
+        return group
+    
+    def get_group_status(self, group_id: str) -> Optional[TaskGroupStatusResponse]:
+        """
+        Get aggregate progress of a task group
+        
+        Args:
+            group_id: Group ID
+            
+        Returns:
+            TaskGroupStatusResponse or None if not found
+        """
+        group = self.get_group(group_id)
+        if not group:
+            return None
+        
+        finished = sum(
+            count for status, count in group.counts.items()
+            if status not in ACTIVE_STATUSES
+        )
+        return TaskGroupStatusResponse(
+            group_id=group.group_id,
+            total=len(group.task_ids),
+            finished=finished,
+            done=finished == len(group.task_ids),
+            counts=dict(group.counts),
+            task_ids=list(group.task_ids),
+            created_at=group.created_at
+        )
+    
+    async def watch_group(
+        self,
+        group_id: str,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[TaskStatusResponse]]:
+        """
+        Stream the tasks of a group as they finish
+        
+        Yields tasks that already finished first, then each remaining task
+        when it reaches a final status, and stops once all have finished.
+        Evicted tasks are skipped.
+        
+        Args:
+            group_id: Group ID
+            heartbeat: Yield None after this many idle seconds
+            
+        Yields:
+            TaskStatusResponse per finished task, or None as a heartbeat
+        """
+        group = self.get_group(group_id)
+        if not group:
+            return
+        
+        # Room for every task so no result is dropped
+        channel = _group_channel(group_id)
+        queue = self.events.subscribe(channel, max_queued=len(group.task_ids))
+        try:
+            seen: Set[str] = set()
+            for task_id in list(group.task_ids):
+                task = self.get_task(task_id)
+                if task is None:
+                    seen.add(task_id)
+                elif task.status not in ACTIVE_STATUSES and task_id not in seen:
+                    seen.add(task_id)
+                    yield self.task_snapshot(task)
+            
+            while len(seen) < len(group.task_ids):
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if snapshot.task_id not in seen:
+                    seen.add(snapshot.task_id)
+                    yield snapshot
+        finally:
+            self.events.unsubscribe(channel, queue)
+    
+    def get_queue_position(self, task_id: str) -> Optional[int]:
+        """
+        Get the 1-based position of a queued task
+        
+        Args:
+            task_id: Task ID
+            
+        Returns:
+            Queue position, or None if the task is not queued
+        """
+        if self.work_queue is not None:
+            return self.work_queue.position(task_id)
+        return self.scheduler.position(task_id)
+    
+    def get_queue_statistics(self) -> Dict[str, int]:
+        """
+        Get statistics of the queue tasks wait in
+        
+        Returns:
+            Shared work queue statistics in queue execution mode, otherwise
+            those of the in-process scheduler
+        """
+        if self.work_queue is not None:
+            return self.work_queue.get_statistics()
+        return self.scheduler.get_statistics()
+    
+    def _free_queue_slots(self) -> int:
+        if self.work_queue is not None:
+            return max(0, self.work_queue.max_depth - len(self.work_queue))
+        return self.scheduler.free_slots
+    
+    def sync_shared_updates(self) -> int:
+        """
+        Apply task updates written by worker processes
+        
+        Refreshes cached tasks from the shared store's change feed and
+        notifies waiters, streams and task groups as if the updates had
+        been made here.
+        
+        Returns:
+            Number of tasks that changed
         """
-        # Create task in event loop
-        asyncio.create_task(self.execute_task(task_id))
-        logger.info(f"Task {task_id} submitted for execution")
+        self._change_seq, tasks = self.store.changes_since(self._change_seq)
+        for remote in tasks:
+            previous = self.store.refresh(remote)
+            if previous is not None:
+                self._count_transition(previous, remote.status)
+            self._publish_update(remote)
+        return len(tasks)
+    
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                self.sync_shared_updates()
+            except Exception as e:
+                logger.error(f"Failed to sync task updates from workers: {e}", exc_info=True)
+    
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+    
+    async def _dispatch_loop(self):
+        """Start queued tasks in priority order as concurrency slots free up"""
+        while True:
+            # Wait for work before taking a slot so an idle dispatcher holds none
+            await self.scheduler.wait()
+            await self.semaphore.acquire()
+            
+            # Pick the task only now, in case higher priorities arrived meanwhile
+            task_id = self.scheduler.pop()
+            if task_id is None:
+                self.semaphore.release()
+                continue
+            self._spawn(task_id, self.execute_task(task_id, slot_held=True))
+    
+    def _spawn(self, task_id: str, coro):
+        """Run a task's coroutine, keeping a reference until it finishes"""
+        runner = asyncio.create_task(coro)
+        self._running[task_id] = runner
+        runner.add_done_callback(lambda _: self._forget_runner(task_id, runner))
+    
+    def _forget_runner(self, task_id: str, runner: asyncio.Task):
+        if self._running.get(task_id) is runner:
+            del self._running[task_id]
     
     def list_tasks(
         self,
         status: Optional[TaskStatus] = None,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        load_results: bool = True
     ) -> list[TaskInfo]:
         """
         List tasks with optional filtering
@@ -173,24 +1232,28 @@ class TaskManager:
         Args:
             status: Filter by status (optional)
             limit: Maximum number of tasks to return
+            after: Cursor task ID; return the page of older tasks after it
+            before: Cursor task ID; return the page of newer tasks before it
+            load_results: Load spilled results back from disk
             
         Returns:
-            List of TaskInfo objects
+            List of TaskInfo objects, newest first
+            
+        Raises:
+            ValueError: If a cursor task does not exist
         """
-        tasks = list(self.tasks.values())
-        
-        # Filter by status if provided
-        if status:
-            tasks = [t for t in tasks if t.status == status]
-        
-        # Sort by creation time (newest first)
-        tasks.sort(key=lambda t: t.created_at, reverse=True)
-        
-        return tasks[:limit]
+        tasks = self.store.list(status=status, limit=limit, after=after, before=before)
+        if not load_results:
+            return tasks
+        return [self._with_result(t) for t in tasks]
     
     def cancel_task(self, task_id: str) -> bool:
         """
-        Cancel a pending task
+        Cancel a pending or running task
+        
+        A queued task leaves the queue. A running task is interrupted, which
+        stops the agent, releases its Steel session and frees the concurrency
+        slot, unless other tasks are still waiting on the same shared run.
         
         Args:
             task_id: Task ID to cancel
@@ -198,17 +1261,27 @@ class TaskManager:
         Returns:
             True if cancelled, False otherwise
         """
-        task = self.get_task(task_id)
+        task = self.store.get(task_id)
         if not task:
             return False
         
-        if task.status == TaskStatus.PENDING:
-            self.update_task_status(task_id, TaskStatus.CANCELLED)
-            logger.info(f"Task {task_id} cancelled")
-            return True
+        if task.status not in ACTIVE_STATUSES:
+            logger.warning(f"Cannot cancel task {task_id} with status {task.status}")
+            return False
+        
+        # A worker running the task notices its queue entry is gone
+        if self.work_queue is not None:
+            self.work_queue.remove(task_id)
+        else:
+            self.scheduler.remove(task_id)
+        self.update_task_status(task_id, TaskStatus.CANCELLED, progress="Cancelled")
         
-        logger.warning(f"Cannot cancel task {task_id} with status {task.status}")
-        return False
+        runner = self._running.get(task_id)
+        if runner:
+            runner.cancel()
+        
+        logger.info(f"Task {task_id} cancelled")
+        return True
     
     def get_statistics(self) -> Dict[str, int]:
         """
@@ -217,25 +1290,54 @@ class TaskManager:
         Returns:
             Dictionary with task counts by status
         """
-        stats = {
-            "total": len(self.tasks),
-            "pending": 0,
-            "running": 0,
-            "completed": 0,
-            "failed": 0,
-            "cancelled": 0
-        }
-        
-        for task in self.tasks.values():
-            if task.status == TaskStatus.PENDING:
-                stats["pending"] += 1
-            elif task.status == TaskStatus.RUNNING:
-                stats["running"] += 1
-            elif task.status == TaskStatus.COMPLETED:
-                stats["completed"] += 1
-            elif task.status == TaskStatus.FAILED:
-                stats["failed"] += 1
-            elif task.status == TaskStatus.CANCELLED:
-                stats["cancelled"] += 1
+        counts = self.store.count_by_status()
+        
+        # Evicted tasks still count towards their final status
+        evicted = self.store.evicted_counts()
+        for status, count in evicted.items():
+            counts[status] += count
+        
+        stats = {"total": sum(counts.values())}
+        for status in TaskStatus:
+            stats[status.value] = counts[status]
+        stats["evicted"] = sum(evicted.values())
         
         return stats
+    
+    def compact(self) -> int:
+        """
+        Evict finished tasks past the retention limits
+        
+        Returns:
+            Number of evicted tasks
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        evicted = self.store.evict_finished(cutoff, keep=self.retention_max_finished)
+        
+        for task_id in evicted:
+            self.result_json.discard(task_id)
+            if self.result_spill:
+                self.result_spill.delete(task_id)
+        
+        # The change feed is read within seconds; keep a generous margin
+        if self.work_queue is not None:
+            self.store.prune_changes(datetime.utcnow() - timedelta(seconds=10 * self.compact_interval))
+        
+        # Groups go once all their tasks finished and the group aged out
+        for group_id, group in list(self.groups.items()):
+            active = sum(group.counts[status] for status in ACTIVE_STATUSES)
+            if not active and group.created_at < cutoff:
+                del self.groups[group_id]
+        self.store.evict_groups(cutoff)
+        
+        if evicted:
+            logger.info(f"Compacted {len(evicted)} finished tasks")
+        return len(evicted)
+    
+    async def _compact_loop(self):
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Task compaction failed: {e}", exc_info=True)
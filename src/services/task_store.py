@@ -0,0 +1,792 @@
+"""
+Task storage backends for the task manager.
+Provides an in-memory store and a durable SQLite store that survives
+restarts and can be shared between processes.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.models import TaskGroupInfo, TaskInfo, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (TaskStatus.PENDING, TaskStatus.RUNNING)
+
+
+class TaskStore:
+    """Storage interface behind TaskManager"""
+
+    async def start(self):
+        """Start background work such as write flushing"""
+
+    async def close(self):
+        """Persist pending writes and release resources"""
+
+    def add(self, task: TaskInfo):
+        """Store a new task"""
+        raise NotImplementedError
+
+    def get(self, task_id: str) -> Optional[TaskInfo]:
+        """Get a task by ID"""
+        raise NotImplementedError
+
+    def save(self, task: TaskInfo):
+        """Persist changes made to a stored task"""
+        raise NotImplementedError
+
+    def list(
+        self,
+        status: Optional[TaskStatus] = None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None
+    ) -> List[TaskInfo]:
+        """
+        List tasks, newest first
+
+        Args:
+            status: Only include tasks with this status
+            limit: Maximum number of tasks
+            after: Cursor task ID; return tasks created before it
+            before: Cursor task ID; return tasks created after it
+
+        Raises:
+            ValueError: If a cursor task does not exist
+        """
+        raise NotImplementedError
+
+    def count_by_status(self) -> Dict[TaskStatus, int]:
+        """Count tasks per status"""
+        raise NotImplementedError
+
+    def unfinished(self) -> List[TaskInfo]:
+        """Tasks left PENDING or RUNNING, oldest first"""
+        raise NotImplementedError
+
+    def evict_finished(self, older_than: datetime, keep: int) -> Dict[str, TaskStatus]:
+        """
+        Delete finished tasks past retention, folding them into counters
+
+        Args:
+            older_than: Evict finished tasks last updated before this time
+            keep: Evict all but the most recently updated finished tasks
+
+        Returns:
+            Mapping of evicted task IDs to their final status
+        """
+        raise NotImplementedError
+
+    def evicted_counts(self) -> Dict[TaskStatus, int]:
+        """Count evicted tasks per final status"""
+        raise NotImplementedError
+
+    def add_group(self, group: TaskGroupInfo):
+        """
+        Store the membership of a new task group
+
+        Process-local stores leave groups to the task manager; durable ones
+        keep them so a group can be read back after a restart.
+        """
+
+    def get_group(self, group_id: str) -> Optional[TaskGroupInfo]:
+        """
+        Read back a stored task group, with counts of its tasks' statuses
+
+        Returns:
+            TaskGroupInfo, or None if the store does not have the group
+        """
+        return None
+
+    def evict_groups(self, older_than: datetime) -> int:
+        """
+        Delete stored groups created before a time whose tasks all finished
+
+        Returns:
+            Number of deleted groups
+        """
+        return 0
+
+
+class MemoryTaskStore(TaskStore):
+    """
+    Process-local task registry.
+
+    Keeps creation-ordered indexes, overall and per status, plus the order
+    in which tasks finished. They are updated incrementally on every save,
+    so listing, counting and eviction never scan or sort the whole table.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, TaskInfo] = {}
+        self.evicted: Dict[TaskStatus, int] = {s: 0 for s in TaskStatus}
+
+        self._status_of: Dict[str, TaskStatus] = {}
+        self._order: List[Tuple[datetime, str]] = []
+        self._order_by_status: Dict[TaskStatus, List[Tuple[datetime, str]]] = {
+            s: [] for s in TaskStatus
+        }
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+
+    def add(self, task: TaskInfo):
+        if task.task_id in self.tasks:
+            self.save(task)
+            return
+
+        key = _order_key(task)
+        self.tasks[task.task_id] = task
+        self._status_of[task.task_id] = task.status
+        insort(self._order, key)
+        insort(self._order_by_status[task.status], key)
+        if task.status not in ACTIVE_STATUSES:
+            self._finished[task.task_id] = None
+
+    def get(self, task_id: str) -> Optional[TaskInfo]:
+        return self.tasks.get(task_id)
+
+    def save(self, task: TaskInfo):
+        old_status = self._status_of.get(task.task_id)
+        if old_status is None:
+            self.add(task)
+            return
+
+        self.tasks[task.task_id] = task
+        if old_status == task.status:
+            return
+
+        key = _order_key(task)
+        _remove_key(self._order_by_status[old_status], key)
+        insort(self._order_by_status[task.status], key)
+        self._status_of[task.task_id] = task.status
+
+        if task.status in ACTIVE_STATUSES:
+            self._finished.pop(task.task_id, None)
+        else:
+            self._finished[task.task_id] = None
+            self._finished.move_to_end(task.task_id)
+
+    def list(
+        self,
+        status: Optional[TaskStatus] = None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None
+    ) -> List[TaskInfo]:
+        order = self._order_by_status[status] if status else self._order
+
+        # Keyset pagination over the creation-ordered index
+        if after:
+            end = bisect_left(order, self._cursor_key(after))
+            keys = order[max(0, end - limit):end]
+        elif before:
+            start = bisect_right(order, self._cursor_key(before))
+            keys = order[start:start + limit]
+        else:
+            keys = order[-limit:]
+
+        # Newest first
+        return [self.tasks[task_id] for _, task_id in reversed(keys)]
+
+    def count_by_status(self) -> Dict[TaskStatus, int]:
+        return {s: len(keys) for s, keys in self._order_by_status.items()}
+
+    def unfinished(self) -> List[TaskInfo]:
+        keys = sorted(
+            key for s in ACTIVE_STATUSES for key in self._order_by_status[s]
+        )
+        return [self.tasks[task_id] for _, task_id in keys]
+
+    def evict_finished(self, older_than: datetime, keep: int) -> Dict[str, TaskStatus]:
+        evicted: Dict[str, TaskStatus] = {}
+
+        # Finished tasks are ordered oldest first by completion
+        while self._finished:
+            task_id = next(iter(self._finished))
+            task = self.tasks[task_id]
+            if len(self._finished) <= keep and task.updated_at >= older_than:
+                break
+
+            self._finished.popitem(last=False)
+            key = _order_key(task)
+            _remove_key(self._order, key)
+            _remove_key(self._order_by_status[task.status], key)
+            del self.tasks[task_id]
+            del self._status_of[task_id]
+
+            self.evicted[task.status] += 1
+            evicted[task_id] = task.status
+
+        return evicted
+
+    def evicted_counts(self) -> Dict[TaskStatus, int]:
+        return dict(self.evicted)
+
+    def _cursor_key(self, task_id: str) -> Tuple[datetime, str]:
+        task = self.tasks.get(task_id)
+        if task is None:
+            raise ValueError(f"Unknown cursor: {task_id}")
+        return _order_key(task)
+
+
+def _order_key(task: TaskInfo) -> Tuple[datetime, str]:
+    """Sort key giving a total creation order over tasks"""
+    return (task.created_at, task.task_id)
+
+
+def _remove_key(keys: List[Tuple[datetime, str]], key: Tuple[datetime, str]):
+    """Remove a key from a sorted index"""
+    i = bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    Durable task store on SQLite in WAL mode.
+
+    Writes are buffered and flushed in batches. Active tasks stay cached
+    in memory so in-place updates from the task manager are cheap; finished
+    tasks are read back from the database. Per-status counts are kept by
+    triggers in the writing transaction, so they are right for every
+    process sharing the file and counting never scans the table. Task
+    groups are stored with their members, so their progress can still be
+    read after a restart.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        DROP INDEX IF EXISTS idx_tasks_status;
+        DROP INDEX IF EXISTS idx_tasks_created_at;
+        CREATE INDEX IF NOT EXISTS idx_tasks_status_order ON tasks (status, created_at, task_id);
+        CREATE INDEX IF NOT EXISTS idx_tasks_order ON tasks (created_at, task_id);
+        CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks (updated_at);
+        CREATE TABLE IF NOT EXISTS evicted_counts (
+            status TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS task_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id TEXT NOT NULL,
+            origin TEXT NOT NULL,
+            changed_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS task_groups (
+            group_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            task_ids TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS task_group_evicted (
+            group_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (group_id, status)
+        );
+    """
+
+    # Statements, not a script: they run in one transaction with the backfill
+    _COUNTS_SCHEMA = (
+        """
+        CREATE TABLE task_status_counts (
+            status TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        )
+        """,
+        """
+        INSERT INTO task_status_counts (status, count)
+            SELECT status, COUNT(*) FROM tasks GROUP BY status
+        """,
+        """
+        CREATE TRIGGER tasks_count_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_status_counts (status, count) VALUES (NEW.status, 1)
+            ON CONFLICT(status) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER tasks_count_update AFTER UPDATE OF status ON tasks
+        WHEN OLD.status != NEW.status BEGIN
+            UPDATE task_status_counts SET count = count - 1 WHERE status = OLD.status;
+            INSERT INTO task_status_counts (status, count) VALUES (NEW.status, 1)
+            ON CONFLICT(status) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER tasks_count_delete AFTER DELETE ON tasks BEGIN
+            UPDATE task_status_counts SET count = count - 1 WHERE status = OLD.status;
+        END
+        """
+    )
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+        track_changes: bool = False
+    ):
+        """
+        Initialize SQLite task store
+
+        Args:
+            path: Database file path
+            batch_size: Buffered writes that trigger an immediate flush
+            flush_interval: Seconds between background flushes
+            track_changes: Record every write in a change feed so other
+                processes sharing the database can follow task updates
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.track_changes = track_changes
+        # Identifies this store's own writes in the change feed
+        self.origin = uuid.uuid4().hex
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self._create_counts()
+        self._lock = threading.Lock()
+
+        self._active: Dict[str, TaskInfo] = {}
+        self._dirty: Dict[str, TaskInfo] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+        logger.info(f"SQLite task store opened at {path}")
+
+    def _create_counts(self):
+        """Add the status counts, counting existing tasks once, unless present"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            exists = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_status_counts'"
+            ).fetchone()
+            if not exists:
+                for statement in self._COUNTS_SCHEMA:
+                    self._conn.execute(statement)
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    async def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        self.flush()
+        with self._lock:
+            self._conn.close()
+        logger.info("SQLite task store closed")
+
+    def add(self, task: TaskInfo):
+        self._active[task.task_id] = task
+        self._mark_dirty(task)
+
+    def get(self, task_id: str) -> Optional[TaskInfo]:
+        task = self._active.get(task_id) or self._dirty.get(task_id)
+        if task is not None:
+            return task
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return TaskInfo.model_validate_json(row[0]) if row else None
+
+    def save(self, task: TaskInfo):
+        if task.status in ACTIVE_STATUSES:
+            self._active[task.task_id] = task
+        self._mark_dirty(task)
+
+    def list(
+        self,
+        status: Optional[TaskStatus] = None,
+        limit: int = 100,
+        after: Optional[str] = None,
+        before: Optional[str] = None
+    ) -> List[TaskInfo]:
+        self.flush()
+
+        conditions = []
+        params: list = []
+        if status:
+            conditions.append("status = ?")
+            params.append(status.value)
+
+        # Keyset pagination on (created_at, task_id)
+        order = "DESC"
+        if after:
+            conditions.append("(created_at, task_id) < (?, ?)")
+            params.extend(self._cursor_key(after))
+        elif before:
+            conditions.append("(created_at, task_id) > (?, ?)")
+            params.extend(self._cursor_key(before))
+            order = "ASC"
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        query = (
+            f"SELECT task_id, data FROM tasks {where}"
+            f"ORDER BY created_at {order}, task_id {order} LIMIT ?"
+        )
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        if order == "ASC":
+            rows.reverse()
+        return [self._load(task_id, data) for task_id, data in rows]
+
+    def _cursor_key(self, task_id: str) -> Tuple[str, str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"Unknown cursor: {task_id}")
+        return (row[0], task_id)
+
+    def count_by_status(self) -> Dict[TaskStatus, int]:
+        self.flush()
+
+        counts = {s: 0 for s in TaskStatus}
+        with self._lock:
+            rows = self._conn.execute("SELECT status, count FROM task_status_counts").fetchall()
+        for status, count in rows:
+            counts[TaskStatus(status)] = count
+        return counts
+
+    def unfinished(self) -> List[TaskInfo]:
+        self.flush()
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, data FROM tasks WHERE status IN (?, ?) ORDER BY created_at",
+                tuple(s.value for s in ACTIVE_STATUSES)
+            ).fetchall()
+
+        tasks = [self._load(task_id, data) for task_id, data in rows]
+        for task in tasks:
+            self._active[task.task_id] = task
+        return tasks
+
+    def evict_finished(self, older_than: datetime, keep: int) -> Dict[str, TaskStatus]:
+        self.flush()
+
+        active = tuple(s.value for s in ACTIVE_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, status, json_extract(data, '$.metadata.group_id') FROM tasks "
+                "WHERE status NOT IN (?, ?) AND (updated_at < ? OR task_id IN ("
+                "    SELECT task_id FROM tasks WHERE status NOT IN (?, ?) "
+                "    ORDER BY updated_at DESC LIMIT -1 OFFSET ?"
+                "))",
+                active + (older_than.isoformat(timespec="microseconds"),) + active + (keep,)
+            ).fetchall()
+            if not rows:
+                return {}
+
+            counts: Dict[str, int] = {}
+            group_counts: Dict[Tuple[str, str], int] = {}
+            for _, status, group_id in rows:
+                counts[status] = counts.get(status, 0) + 1
+                if group_id is not None:
+                    group_counts[(group_id, status)] = group_counts.get((group_id, status), 0) + 1
+
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM tasks WHERE task_id = ?",
+                    [(task_id,) for task_id, _, _ in rows]
+                )
+                self._conn.executemany(
+                    "INSERT INTO evicted_counts (status, count) VALUES (?, ?) "
+                    "ON CONFLICT(status) DO UPDATE SET count = count + excluded.count",
+                    list(counts.items())
+                )
+                # Groups keep counting their evicted tasks by final status
+                self._conn.executemany(
+                    "INSERT INTO task_group_evicted (group_id, status, count) VALUES (?, ?, ?) "
+                    "ON CONFLICT(group_id, status) DO UPDATE SET count = count + excluded.count",
+                    [(group_id, status, count) for (group_id, status), count in group_counts.items()]
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+        return {task_id: TaskStatus(status) for task_id, status, _ in rows}
+
+    def evicted_counts(self) -> Dict[TaskStatus, int]:
+        counts = {s: 0 for s in TaskStatus}
+        with self._lock:
+            rows = self._conn.execute("SELECT status, count FROM evicted_counts").fetchall()
+        for status, count in rows:
+            counts[TaskStatus(status)] = count
+        return counts
+
+    def add_group(self, group: TaskGroupInfo):
+        # Members are written first so a stored group never misses them
+        self.flush()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_groups (group_id, created_at, task_ids) VALUES (?, ?, ?)",
+                (
+                    group.group_id,
+                    group.created_at.isoformat(timespec="microseconds"),
+                    json.dumps(group.task_ids)
+                )
+            )
+
+    def get_group(self, group_id: str) -> Optional[TaskGroupInfo]:
+        self.flush()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, task_ids FROM task_groups WHERE group_id = ?", (group_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT t.status, COUNT(*) FROM json_each(?) m "
+                "JOIN tasks t ON t.task_id = m.value GROUP BY t.status",
+                (row[1],)
+            ).fetchall()
+            rows += self._conn.execute(
+                "SELECT status, count FROM task_group_evicted WHERE group_id = ?", (group_id,)
+            ).fetchall()
+
+        counts = {s: 0 for s in TaskStatus}
+        for status, count in rows:
+            counts[TaskStatus(status)] += count
+        return TaskGroupInfo(
+            group_id=group_id,
+            created_at=datetime.fromisoformat(row[0]),
+            task_ids=json.loads(row[1]),
+            counts=counts
+        )
+
+    def evict_groups(self, older_than: datetime) -> int:
+        self.flush()
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                deleted = self._conn.execute(
+                    "DELETE FROM task_groups WHERE created_at < ? AND NOT EXISTS ("
+                    "    SELECT 1 FROM json_each(task_groups.task_ids) m "
+                    "    JOIN tasks t ON t.task_id = m.value WHERE t.status IN (?, ?)"
+                    ")",
+                    (older_than.isoformat(timespec="microseconds"),)
+                    + tuple(s.value for s in ACTIVE_STATUSES)
+                ).rowcount
+                self._conn.execute(
+                    "DELETE FROM task_group_evicted "
+                    "WHERE group_id NOT IN (SELECT group_id FROM task_groups)"
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return deleted
+
+    def latest_change(self) -> int:
+        """Sequence number of the newest entry in the change feed"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(seq) FROM task_changes").fetchone()
+        return row[0] or 0
+
+    def changes_since(self, seq: int) -> Tuple[int, List[TaskInfo]]:
+        """
+        Read tasks written by other processes since a change feed position
+
+        Returns the stored rows, not the cached objects, so the caller sees
+        what the other processes wrote.
+
+        Args:
+            seq: Sequence number already seen
+
+        Returns:
+            Tuple of the new position and the changed tasks
+        """
+        self.flush()
+
+        with self._lock:
+            (latest,) = self._conn.execute("SELECT MAX(seq) FROM task_changes").fetchone()
+            if not latest or latest <= seq:
+                return seq, []
+            rows = self._conn.execute(
+                "SELECT t.data FROM task_changes c "
+                "JOIN tasks t ON t.task_id = c.task_id "
+                "WHERE c.seq > ? AND c.seq <= ? AND c.origin != ? ORDER BY c.seq",
+                (seq, latest, self.origin)
+            ).fetchall()
+
+        # A task changed several times since `seq` is reported once
+        changed: Dict[str, TaskInfo] = {}
+        for (data,) in rows:
+            task = TaskInfo.model_validate_json(data)
+            changed.pop(task.task_id, None)
+            changed[task.task_id] = task
+        return latest, list(changed.values())
+
+    def refresh(self, task: TaskInfo) -> Optional[TaskInfo]:
+        """
+        Replace the cached copy of a task with a version written elsewhere
+
+        Args:
+            task: Task as read from the change feed
+
+        Returns:
+            The previously cached copy, or None if the task was not cached
+        """
+        previous = self._active.pop(task.task_id, None)
+        if task.status in ACTIVE_STATUSES:
+            self._active[task.task_id] = task
+        return previous
+
+    def reload(self, task_id: str) -> Optional[TaskInfo]:
+        """
+        Discard cached and unwritten state of a task and read it back
+
+        Used when another process took over the task.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            Task as stored, or None if not found
+        """
+        self._dirty.pop(task_id, None)
+        self._active.pop(task_id, None)
+        task = self.get(task_id)
+        if task is not None and task.status in ACTIVE_STATUSES:
+            self._active[task_id] = task
+        return task
+
+    def prune_changes(self, older_than: datetime):
+        """Drop change feed entries recorded before a time"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM task_changes WHERE changed_at < ?",
+                (older_than.isoformat(timespec="microseconds"),)
+            )
+
+    def flush(self):
+        """Write all buffered task changes in one transaction"""
+        if not self._dirty:
+            return
+
+        batch = list(self._dirty.values())
+        self._dirty = {}
+        self._write(batch)
+
+        # Finished tasks are served from the database from now on
+        for task in batch:
+            if task.status not in ACTIVE_STATUSES:
+                self._active.pop(task.task_id, None)
+
+    def _mark_dirty(self, task: TaskInfo):
+        self._dirty[task.task_id] = task
+        if len(self._dirty) >= self.batch_size:
+            self.flush()
+
+    def _write(self, tasks: Iterable[TaskInfo]):
+        rows = [
+            (
+                task.task_id,
+                task.status.value,
+                task.created_at.isoformat(timespec="microseconds"),
+                task.updated_at.isoformat(timespec="microseconds"),
+                task.model_dump_json()
+            )
+            for task in tasks
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # A cancellation is final: another process finishing the
+                # task after it was cancelled must not bring it back, but
+                # the cancelled task itself can still be updated
+                self._conn.executemany(
+                    "INSERT INTO tasks (task_id, status, created_at, updated_at, data) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(task_id) DO UPDATE SET status = excluded.status, "
+                    "updated_at = excluded.updated_at, data = excluded.data "
+                    "WHERE tasks.status != 'cancelled' OR excluded.status = 'cancelled'",
+                    rows
+                )
+                if self.track_changes:
+                    changed_at = datetime.utcnow().isoformat(timespec="microseconds")
+                    self._conn.executemany(
+                        "INSERT INTO task_changes (task_id, origin, changed_at) VALUES (?, ?, ?)",
+                        [(row[0], self.origin, changed_at) for row in rows]
+                    )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _load(self, task_id: str, data: str) -> TaskInfo:
+        # Prefer the live object so callers see in-place updates
+        task = self._active.get(task_id)
+        if task is not None:
+            return task
+        return TaskInfo.model_validate_json(data)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush task store: {e}", exc_info=True)
+
+
+def create_task_store() -> TaskStore:
+    """
+    Create the task store configured by environment variables
+
+    Returns:
+        TaskStore selected by TASK_STORE ("memory" or "sqlite")
+    """
+    backend = os.getenv("TASK_STORE", "memory").lower()
+
+    if backend == "memory":
+        return MemoryTaskStore()
+    if backend == "sqlite":
+        return SQLiteTaskStore(
+            os.getenv("TASK_STORE_PATH", "data/tasks.db"),
+            batch_size=int(os.getenv("TASK_STORE_BATCH_SIZE", "100")),
+            flush_interval=float(os.getenv("TASK_STORE_FLUSH_INTERVAL", "0.2")),
+            # Workers and the API follow each other through the change feed
+            track_changes=os.getenv("TASK_EXECUTION_MODE", "local").lower() == "queue"
+        )
+
+    raise ValueError(f"Unknown TASK_STORE: {backend}")
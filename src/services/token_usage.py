@@ -0,0 +1,90 @@
+"""
+LLM token accounting.
+Counts the prompt and completion tokens of an extraction run, prices them
+with configured per-token rates and checks them against a budget.
+"""
+from typing import Any, Dict, Optional
+
+
+class TokenUsage:
+    """Token counts and cost of one or more extraction runs"""
+
+    def __init__(self, prompt_price: float = 0.0, completion_price: float = 0.0):
+        """
+        Initialize token usage
+
+        Args:
+            prompt_price: USD per million prompt tokens
+            completion_price: USD per million completion tokens
+        """
+        self.prompt_price = prompt_price
+        self.completion_price = completion_price
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+        self.runs = 0
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt and completion tokens together"""
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cost(self) -> float:
+        """Cost in USD at the configured prices"""
+        return (
+            self.prompt_tokens * self.prompt_price
+            + self.completion_tokens * self.completion_price
+        ) / 1_000_000
+
+    def add(self, prompt_tokens: int, completion_tokens: int):
+        """Count one LLM call"""
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.calls += 1
+
+    def merge(self, other: "TokenUsage", count_run: bool = True):
+        """
+        Add the usage of a finished run
+
+        Args:
+            other: Usage of the run
+            count_run: Count it as a run (False for cancelled runs)
+        """
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.calls += other.calls
+        if count_run:
+            self.runs += 1
+
+    def exceeded(self, max_tokens: int = 0, max_cost: float = 0.0) -> Optional[str]:
+        """
+        Check the usage against a budget
+
+        Args:
+            max_tokens: Token budget (0 for none)
+            max_cost: Cost budget in USD (0 for none)
+
+        Returns:
+            Description of the exhausted budget, or None if within budget
+        """
+        if max_tokens and self.total_tokens >= max_tokens:
+            return f"Token budget of {max_tokens} tokens exhausted"
+        if max_cost and self.cost >= max_cost:
+            return f"Cost budget of ${max_cost:g} exhausted"
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize usage
+
+        Returns:
+            Dictionary with token counts, LLM calls and cost
+        """
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "llm_calls": self.calls,
+            "cost_usd": round(self.cost, 6)
+        }
@@ -0,0 +1,226 @@
+"""
+Recorded agent trajectories.
+The navigation an agent performs for a Reddit Answers question is the same
+for every question: open the answers page, search, scroll, click "View all".
+The steps of a successful run up to its first extraction are stored with the
+question text replaced by a placeholder, so later runs can replay them
+without asking the LLM to plan each step.
+"""
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote, quote_plus
+
+logger = logging.getLogger(__name__)
+
+QUESTION_PLACEHOLDER = "{{question}}"
+# Placeholders for the question as typed and as encoded in URLs
+_PLACEHOLDERS = {
+    QUESTION_PLACEHOLDER: lambda q: q,
+    "{{question_plus}}": quote_plus,
+    "{{question_quoted}}": quote
+}
+# Steps from the first one using these actions on depend on the page content
+_CONTENT_ACTIONS = {"extract", "done", "write_file", "replace_file", "read_file"}
+
+
+def _action_names(step: Dict[str, Any]) -> List[str]:
+    model_output = step.get("model_output") or {}
+    return [name for action in model_output.get("action") or [] for name in action]
+
+
+def _step_failed(step: Dict[str, Any]) -> bool:
+    return any(result.get("error") for result in step.get("result") or [])
+
+
+def _template(value: Any, question: str) -> Any:
+    # Only whole values and URL query values are replaced, so a short
+    # question cannot match inside unrelated text
+    if isinstance(value, str):
+        if value == question:
+            return QUESTION_PLACEHOLDER
+        for placeholder, encode in _PLACEHOLDERS.items():
+            pattern = re.compile(r"([?&][^=&#]+=)" + re.escape(encode(question)) + r"(?=[&#]|$)")
+            value = pattern.sub(lambda m: m.group(1) + placeholder, value)
+        return value
+    if isinstance(value, list):
+        return [_template(item, question) for item in value]
+    if isinstance(value, dict):
+        return {key: _template(item, question) for key, item in value.items()}
+    return value
+
+
+def _substitute(value: Any, replacements: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        for old, new in replacements.items():
+            value = value.replace(old, new)
+        return value
+    if isinstance(value, list):
+        return [_substitute(item, replacements) for item in value]
+    if isinstance(value, dict):
+        return {key: _substitute(item, replacements) for key, item in value.items()}
+    return value
+
+
+def navigation_steps(history: Dict[str, Any], question: str) -> List[Dict[str, Any]]:
+    """
+    Take the replayable navigation steps from a dumped agent history
+
+    Args:
+        history: AgentHistoryList.model_dump() of a successful run
+        question: Question of the run, replaced by a placeholder
+
+    Returns:
+        Steps before the first content-dependent action, without failed steps
+    """
+    steps = []
+    for step in history.get("history", []):
+        names = _action_names(step)
+        if not names or _step_failed(step):
+            continue
+        if _CONTENT_ACTIONS.intersection(names):
+            break
+        model_output = dict(step["model_output"])
+        model_output["action"] = _template(model_output["action"], question)
+        steps.append({
+            "model_output": model_output,
+            "result": [],
+            "state": {
+                "url": _template(step.get("state", {}).get("url"), question),
+                "title": step.get("state", {}).get("title"),
+                "tabs": [],
+                "interacted_element": step.get("state", {}).get("interacted_element"),
+                "screenshot_path": None
+            },
+            "metadata": step.get("metadata")
+        })
+    return steps
+
+
+class TrajectoryStore:
+    """JSON file holding the latest recorded navigation trajectory"""
+
+    def __init__(self, path: str, max_failures: int = 3):
+        """
+        Initialize trajectory store
+
+        Args:
+            path: JSON file the trajectory is kept in
+            max_failures: Consecutive failed replays after which the
+                trajectory is discarded
+        """
+        self.path = Path(path)
+        self.max_failures = max(1, max_failures)
+        self._trajectory: Optional[Dict[str, Any]] = None
+        self._loaded = False
+        self._consecutive_failures = 0
+
+        self.recorded_total = 0
+        self.replays_total = 0
+        self.replay_failures_total = 0
+
+    def load(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the trajectory for a question
+
+        Args:
+            question: Question substituted for the placeholder
+
+        Returns:
+            History dict loadable by AgentHistoryList.load_from_dict, or
+            None if nothing was recorded yet
+        """
+        if not self._loaded:
+            self._loaded = True
+            try:
+                self._trajectory = json.loads(self.path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                self._trajectory = None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable trajectory {self.path}: {e}")
+                self._trajectory = None
+
+        if not self._trajectory or not self._trajectory.get("steps"):
+            return None
+        replacements = {placeholder: encode(question) for placeholder, encode in _PLACEHOLDERS.items()}
+        steps = _substitute(self._trajectory["steps"], replacements)
+        return {"history": steps}
+
+    def record(self, history: Dict[str, Any], question: str) -> bool:
+        """
+        Store the navigation of a successful run, replacing the previous one
+
+        Args:
+            history: AgentHistoryList.model_dump() of the run
+            question: Question of the run
+
+        Returns:
+            True if a trajectory was stored
+        """
+        steps = navigation_steps(history, question)
+        if not steps:
+            return False
+
+        self._trajectory = {"recorded_at": time.time(), "steps": steps}
+        self._loaded = True
+        self._consecutive_failures = 0
+        self.recorded_total += 1
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._trajectory), encoding="utf-8")
+        os.replace(tmp, self.path)
+        logger.info(f"Recorded {len(steps)} navigation steps to {self.path}")
+        return True
+
+    def mark_replayed(self):
+        """Count a replay that went through"""
+        self.replays_total += 1
+        self._consecutive_failures = 0
+
+    def mark_failed(self) -> bool:
+        """
+        Count a failed replay
+
+        A single failure can be a slow page or a flaky element match, so
+        the trajectory is only discarded after max_failures in a row.
+
+        Returns:
+            True if the trajectory was discarded
+        """
+        self.replay_failures_total += 1
+        self._consecutive_failures += 1
+        if self._consecutive_failures < self.max_failures:
+            return False
+        self.discard()
+        return True
+
+    def discard(self):
+        """Drop the trajectory until the next recording"""
+        self._consecutive_failures = 0
+        self._trajectory = None
+        self._loaded = True
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get trajectory statistics
+
+        Returns:
+            Dictionary with the recorded step count and replay counters
+        """
+        steps = self._trajectory.get("steps", []) if self._trajectory else []
+        return {
+            "steps": len(steps),
+            "recorded_total": self.recorded_total,
+            "replays_total": self.replays_total,
+            "replay_failures_total": self.replay_failures_total,
+            "consecutive_failures": self._consecutive_failures
+        }
@@ -0,0 +1,340 @@
+"""
+Shared work queue between the API and extraction workers.
+A SQLite file that several processes (or hosts, on a shared volume) open
+at once: the API enqueues task IDs and workers claim them under a lease,
+renew the lease while running and delete the entry when done.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from src.models import TaskPriority
+from src.services.scheduler import INTERACTIVE_FLOW, PRIORITY_ORDER, QueueFullError
+
+logger = logging.getLogger(__name__)
+
+_PRIORITY_RANK = {priority: rank for rank, priority in enumerate(PRIORITY_ORDER)}
+
+
+class SQLiteWorkQueue:
+    """
+    Durable multi-process task queue on SQLite.
+
+    Entries are ordered by priority, then by a fair-queuing tag: every
+    flow (a task group, or all ungrouped tasks) gets tags one apart
+    starting from the tag last dequeued, so flows take turns like the
+    in-process scheduler.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS work_queue (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id TEXT NOT NULL UNIQUE,
+            priority INTEGER NOT NULL,
+            flow TEXT NOT NULL,
+            tag INTEGER NOT NULL,
+            enqueued_at REAL NOT NULL,
+            claimed_by TEXT,
+            lease_expires REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_work_queue_order ON work_queue (priority, tag, seq);
+        CREATE TABLE IF NOT EXISTS work_flows (
+            priority INTEGER NOT NULL,
+            flow TEXT NOT NULL,
+            last_tag INTEGER NOT NULL,
+            PRIMARY KEY (priority, flow)
+        );
+        CREATE TABLE IF NOT EXISTS work_clock (
+            priority INTEGER PRIMARY KEY,
+            vtime INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, max_depth: int = 1000):
+        """
+        Initialize work queue
+
+        Args:
+            path: Database file path shared by the API and workers
+            lease_seconds: Seconds a claim lasts unless renewed
+            max_depth: Maximum number of unclaimed entries
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_depth = max_depth
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+
+        logger.info(f"Work queue opened at {path}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(
+        self,
+        task_id: str,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        group: Optional[str] = None,
+        force: bool = False
+    ) -> int:
+        """
+        Add a task to the queue; a task already queued keeps its place
+
+        Args:
+            task_id: Task ID
+            priority: Task priority
+            group: Task group sharing one flow (None for interactive tasks)
+            force: Bypass the depth limit (used when resuming tasks)
+
+        Returns:
+            1-based queue position, or 0 if the task is claimed by a worker
+
+        Raises:
+            QueueFullError: If the queue is full
+        """
+        rank = _PRIORITY_RANK[priority]
+        flow = group or INTERACTIVE_FLOW
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not force and self._depth() >= self.max_depth:
+                    raise QueueFullError(f"Task queue is full ({self.max_depth} tasks)")
+                self._insert(task_id, rank, flow)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+        return self.position(task_id) or 0
+
+    def enqueue_many(self, entries, force: bool = False):
+        """
+        Add several tasks in one transaction, all or none
+
+        Args:
+            entries: Iterable of (task_id, priority, group)
+            force: Bypass the depth limit
+
+        Raises:
+            QueueFullError: If the queue cannot hold every entry
+        """
+        entries = list(entries)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not force and self._depth() + len(entries) > self.max_depth:
+                    raise QueueFullError(
+                        f"Task queue cannot hold {len(entries)} more tasks ({self.max_depth} max)"
+                    )
+                for task_id, priority, group in entries:
+                    self._insert(task_id, _PRIORITY_RANK[priority], group or INTERACTIVE_FLOW)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def claim(self, worker_id: str) -> Optional[str]:
+        """
+        Claim the next task, or one whose previous claim expired
+
+        Args:
+            worker_id: Identity of the claiming worker
+
+        Returns:
+            Task ID, or None if nothing is claimable
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT task_id, priority, tag FROM work_queue "
+                    "WHERE claimed_by IS NULL OR lease_expires < ? "
+                    "ORDER BY priority, tag, seq LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+
+                task_id, rank, tag = row
+                self._conn.execute(
+                    "UPDATE work_queue SET claimed_by = ?, lease_expires = ? WHERE task_id = ?",
+                    (worker_id, now + self.lease_seconds, task_id)
+                )
+                # Advance the fair-queuing clock of this priority
+                self._conn.execute(
+                    "INSERT INTO work_clock (priority, vtime) VALUES (?, ?) "
+                    "ON CONFLICT(priority) DO UPDATE SET vtime = MAX(vtime, excluded.vtime)",
+                    (rank, tag)
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+        return task_id
+
+    def renew(self, task_id: str, worker_id: str) -> bool:
+        """
+        Extend a claim
+
+        Returns:
+            False if the entry is gone (cancelled) or claimed by another worker
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE work_queue SET lease_expires = ? WHERE task_id = ? AND claimed_by = ?",
+                (time.time() + self.lease_seconds, task_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def held(self, worker_id: str) -> Set[str]:
+        """
+        Tasks a worker still holds a claim on, without extending the claims
+
+        Args:
+            worker_id: Identity of the worker
+
+        Returns:
+            IDs of the tasks claimed by the worker
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id FROM work_queue WHERE claimed_by = ?", (worker_id,)
+            ).fetchall()
+        return {task_id for (task_id,) in rows}
+
+    def release(self, task_id: str, worker_id: str):
+        """Give a claimed task back to the queue for another worker"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE work_queue SET claimed_by = NULL, lease_expires = NULL "
+                "WHERE task_id = ? AND claimed_by = ?",
+                (task_id, worker_id)
+            )
+
+    def complete(self, task_id: str, worker_id: str):
+        """Remove a task finished by the worker holding its claim"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM work_queue WHERE task_id = ? AND claimed_by = ?",
+                (task_id, worker_id)
+            )
+
+    def remove(self, task_id: str) -> bool:
+        """
+        Remove a task whether or not it is claimed
+
+        Returns:
+            True if the task was queued
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM work_queue WHERE task_id = ?", (task_id,))
+        return cursor.rowcount == 1
+
+    def position(self, task_id: str) -> Optional[int]:
+        """
+        Get the 1-based position of an unclaimed task
+
+        Returns:
+            Position, or None if the task is not waiting in the queue
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT priority, tag, seq FROM work_queue "
+                "WHERE task_id = ? AND claimed_by IS NULL",
+                (task_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            (ahead,) = self._conn.execute(
+                "SELECT COUNT(*) FROM work_queue "
+                "WHERE claimed_by IS NULL AND (priority, tag, seq) < (?, ?, ?)",
+                row
+            ).fetchone()
+        return ahead + 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._depth()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with waiting tasks per priority, claimed tasks and
+            the depth limit
+        """
+        stats = {p.value: 0 for p in PRIORITY_ORDER}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT priority, COUNT(*) FROM work_queue WHERE claimed_by IS NULL GROUP BY priority"
+            ).fetchall()
+            (claimed,) = self._conn.execute(
+                "SELECT COUNT(*) FROM work_queue WHERE claimed_by IS NOT NULL"
+            ).fetchone()
+        for rank, count in rows:
+            stats[PRIORITY_ORDER[rank].value] = count
+        stats["depth"] = sum(stats[p.value] for p in PRIORITY_ORDER)
+        stats["claimed"] = claimed
+        stats["max_depth"] = self.max_depth
+        return stats
+
+    def _depth(self) -> int:
+        (count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM work_queue WHERE claimed_by IS NULL"
+        ).fetchone()
+        return count
+
+    def _insert(self, task_id: str, rank: int, flow: str):
+        # Caller holds the lock inside a transaction
+        vtime_row = self._conn.execute(
+            "SELECT vtime FROM work_clock WHERE priority = ?", (rank,)
+        ).fetchone()
+        flow_row = self._conn.execute(
+            "SELECT last_tag FROM work_flows WHERE priority = ? AND flow = ?", (rank, flow)
+        ).fetchone()
+        tag = max(vtime_row[0] if vtime_row else 0, flow_row[0] if flow_row else 0) + 1
+
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO work_queue (task_id, priority, flow, tag, enqueued_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (task_id, rank, flow, tag, time.time())
+        )
+        if cursor.rowcount == 0:
+            # Already queued; it keeps its place
+            return
+        self._conn.execute(
+            "INSERT INTO work_flows (priority, flow, last_tag) VALUES (?, ?, ?) "
+            "ON CONFLICT(priority, flow) DO UPDATE SET last_tag = excluded.last_tag",
+            (rank, flow, tag)
+        )
+
+
+def create_work_queue() -> SQLiteWorkQueue:
+    """
+    Create the shared work queue configured by environment variables
+
+    Returns:
+        SQLiteWorkQueue at TASK_QUEUE_PATH
+    """
+    return SQLiteWorkQueue(
+        os.getenv("TASK_QUEUE_PATH", "data/queue.db"),
+        lease_seconds=float(os.getenv("TASK_QUEUE_LEASE_SECONDS", "60")),
+        max_depth=int(os.getenv("MAX_QUEUE_DEPTH", "1000"))
+    )
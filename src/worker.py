@@ -0,0 +1,213 @@
+"""
+Extraction worker process.
+Claims tasks from the shared work queue, runs them and writes the results
+to the shared task store, where the API process picks them up. Start as
+many workers as needed on the API's host, sharing its database files and
+result spill directory:
+
+    python -m src.worker
+
+Workers cannot run on other hosts: SQLite's WAL locking does not work
+over network filesystems, and large results are spilled to the worker's
+local RESULT_SPILL_DIR, where an API on another host cannot load them.
+"""
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from src.models import TaskStatus
+from src.services.task_manager import TaskManager
+from src.services.task_store import SQLiteTaskStore
+from src.services.work_queue import SQLiteWorkQueue, create_work_queue
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionWorker:
+    """Runs tasks claimed from the shared work queue"""
+
+    def __init__(
+        self,
+        task_manager: TaskManager,
+        work_queue: SQLiteWorkQueue,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 1.0,
+        cancel_check_interval: float = 1.0
+    ):
+        """
+        Initialize worker
+
+        Args:
+            task_manager: Task manager executing the claimed tasks; its
+                concurrency limit bounds the tasks this worker runs at once
+            work_queue: Shared work queue
+            worker_id: Identity recorded on claims (defaults to host and PID)
+            poll_interval: Seconds to wait before polling an empty queue again
+            cancel_check_interval: Seconds between checks for tasks cancelled
+                through the API, independent of the claim renewals
+
+        Raises:
+            ValueError: If the task manager does not use the shared SQLite store
+        """
+        # Results only reach the API through the shared store's change feed
+        if not isinstance(task_manager.store, SQLiteTaskStore):
+            raise ValueError("Workers need the shared SQLite task store (TASK_STORE=sqlite)")
+        task_manager.store.track_changes = True
+
+        self.task_manager = task_manager
+        self.work_queue = work_queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.poll_interval = poll_interval
+        self.cancel_check_interval = cancel_check_interval
+
+        self._runners: Dict[str, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Stop claiming tasks; running ones are handed back to the queue"""
+        self._stopping.set()
+
+    async def run(self):
+        """Claim and run tasks until stopped"""
+        await self.task_manager.start(worker=True)
+        renewer = asyncio.create_task(self._renew_loop())
+        logger.info(f"Worker {self.worker_id} started")
+
+        try:
+            while not self._stopping.is_set():
+                task_id = await self.claim_next()
+                if task_id is None:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            renewer.cancel()
+            runners = list(self._runners.values())
+            for runner in runners:
+                runner.cancel()
+            await asyncio.gather(renewer, *runners, return_exceptions=True)
+            await self.task_manager.close()
+            logger.info(f"Worker {self.worker_id} stopped")
+
+    async def claim_next(self) -> Optional[str]:
+        """
+        Wait for a free concurrency slot, then claim and start a task
+
+        Returns:
+            Claimed task ID, or None if the queue is empty
+        """
+        await self.task_manager.semaphore.acquire()
+        try:
+            task_id = self.work_queue.claim(self.worker_id)
+        except BaseException:
+            self.task_manager.semaphore.release()
+            raise
+        if task_id is None:
+            self.task_manager.semaphore.release()
+            return None
+
+        runner = asyncio.create_task(self._process(task_id))
+        self._runners[task_id] = runner
+        runner.add_done_callback(lambda _: self._runners.pop(task_id, None))
+        return task_id
+
+    async def _process(self, task_id: str):
+        """Run a claimed task, holding the slot acquired by claim_next"""
+        finished = False
+        try:
+            task = self.task_manager.store.get(task_id)
+            if task and task.status == TaskStatus.RUNNING:
+                # The worker that claimed it before stopped without finishing
+                self.task_manager.update_task_status(
+                    task_id,
+                    TaskStatus.PENDING,
+                    progress="Re-queued after worker loss"
+                )
+
+            logger.info(f"Worker {self.worker_id} running task {task_id}")
+            await self.task_manager.execute_task(task_id, slot_held=True)
+            finished = True
+        finally:
+            if finished:
+                # Write the result before the queue entry disappears
+                self.task_manager.store.flush()
+                self.work_queue.complete(task_id, self.worker_id)
+            else:
+                self.work_queue.release(task_id, self.worker_id)
+
+    async def _renew_loop(self):
+        """
+        Keep claims alive and stop tasks whose queue entry was removed
+
+        Claims are renewed every third of the lease; in between, the claims
+        are only read back, so a cancellation stops the run within
+        cancel_check_interval seconds.
+        """
+        renew_interval = self.work_queue.lease_seconds / 3
+        renewed_at = time.monotonic()
+        while True:
+            await asyncio.sleep(min(self.cancel_check_interval, renew_interval))
+            renew = time.monotonic() - renewed_at >= renew_interval
+            if renew:
+                renewed_at = time.monotonic()
+            else:
+                try:
+                    held = self.work_queue.held(self.worker_id)
+                except Exception as e:
+                    logger.error(f"Failed to check claims of worker {self.worker_id}: {e}", exc_info=True)
+                    continue
+
+            for task_id, runner in list(self._runners.items()):
+                try:
+                    if renew and self.work_queue.renew(task_id, self.worker_id):
+                        continue
+                    if not renew and task_id in held:
+                        continue
+                except Exception as e:
+                    logger.error(f"Failed to renew claim on task {task_id}: {e}", exc_info=True)
+                    continue
+
+                # Cancelled through the API, or claimed elsewhere after
+                # the lease lapsed; the stored state is no longer ours
+                logger.info(f"Lost claim on task {task_id}, stopping it")
+                runner.cancel()
+                self.task_manager.store.reload(task_id)
+
+
+async def main():
+    """Run a worker configured by environment variables"""
+    work_queue = create_work_queue()
+    try:
+        task_manager = TaskManager(max_concurrent_tasks=int(os.getenv("MAX_CONCURRENT_TASKS", "5")))
+        worker = ExtractionWorker(
+            task_manager,
+            work_queue,
+            worker_id=os.getenv("WORKER_ID") or None,
+            poll_interval=float(os.getenv("WORKER_POLL_INTERVAL", "1.0")),
+            cancel_check_interval=float(os.getenv("WORKER_CANCEL_CHECK_INTERVAL", "1.0"))
+        )
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+
+        await worker.run()
+    finally:
+        work_queue.close()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main())
@@ -0,0 +1,227 @@
+"""
+Tests for the HTTP API.
+"""
+import asyncio
+import json
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from src import main
+from src.models import ContentSection, ExtractionResult
+from src.services.task_manager import TaskManager
+
+
+@pytest.fixture
+def api(tmp_path):
+    """Test client serving a task manager whose extractions wait for a release"""
+    env = {
+        'OPENAI_API_KEY': 'test_key',
+        'TASK_STORE': 'memory',
+        'TASK_EXECUTION_MODE': 'local',
+        'RESULT_CACHE_BACKEND': 'memory',
+        'RESULT_SPILL_DIR': str(tmp_path / 'results'),
+        'STEEL_POOL_ENABLED': 'false'
+    }
+    with patch.dict('os.environ', env):
+        manager = TaskManager(max_concurrent_tasks=5)
+    release = asyncio.Event()
+
+    async def extract(question, **kwargs):
+        await release.wait()
+        return ExtractionResult(
+            url="https://www.reddit.com/answers/abc",
+            question=question,
+            sections=[ContentSection(heading="Answer", content=["text"])]
+        )
+
+    async def release_after(delay):
+        await asyncio.sleep(delay)
+        release.set()
+
+    manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=extract)
+
+    with patch.dict('os.environ', env), patch('src.main.TaskManager', return_value=manager):
+        with TestClient(main.app) as client:
+            client.release = lambda delay=0: client.portal.start_task_soon(release_after, delay)
+            yield client
+            client.portal.call(release.set)
+
+
+def submit(client, question):
+    """Create an extraction task and return its ID"""
+    response = client.post("/api/v1/extract", json={"question": question})
+    assert response.status_code == 202
+    return response.json()["task_id"]
+
+
+def test_list_tasks_pages_with_cursors(api):
+    """Test after/before page through tasks newest first"""
+    task_ids = [submit(api, f"question {i}") for i in range(3)]
+
+    first = api.get("/api/v1/tasks", params={"limit": 2})
+    assert first.status_code == 200
+    assert [t["task_id"] for t in first.json()] == task_ids[:0:-1]
+
+    older = api.get("/api/v1/tasks", params={"limit": 2, "after": task_ids[1]})
+    assert [t["task_id"] for t in older.json()] == [task_ids[0]]
+
+    newer = api.get("/api/v1/tasks", params={"before": task_ids[0]})
+    assert [t["task_id"] for t in newer.json()] == task_ids[:0:-1]
+
+
+def test_list_tasks_rejects_bad_cursors(api):
+    """Test both cursors together or an unknown cursor is a 400"""
+    task_id = submit(api, "question")
+
+    both = api.get("/api/v1/tasks", params={"after": task_id, "before": task_id})
+    unknown = api.get("/api/v1/tasks", params={"after": "missing"})
+
+    assert both.status_code == 400
+    assert unknown.status_code == 400
+
+
+def test_metrics_exposes_prometheus_text(api):
+    """Test /metrics renders task gauges in the text exposition format"""
+    submit(api, "question")
+
+    response = api.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE extraction_tasks_submitted_total counter" in response.text
+    assert 'extraction_tasks{status="completed"} 0' in response.text
+    assert "# TYPE extraction_duration_seconds histogram" in response.text
+    assert 'extraction_task_queue_wait_seconds_bucket{le="+Inf"}' in response.text
+
+
+def test_task_events_stream_until_result(api):
+    """Test the SSE stream sends status updates and ends with the result"""
+    task_id = submit(api, "question")
+    api.release(0.1)
+
+    response = api.get(f"/api/v1/tasks/{task_id}/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert events[0][0] == "event: status"
+    assert events[-1][0] == "event: result"
+    result = json.loads(events[-1][1][len("data: "):])
+    assert result["task_id"] == task_id
+    assert result["status"] == "completed"
+    assert result["result"]["question"] == "question"
+
+
+def test_task_events_unknown_task(api):
+    """Test the SSE stream is a 404 for unknown tasks"""
+    assert api.get("/api/v1/tasks/missing/events").status_code == 404
+
+
+def test_task_events_websocket(api):
+    """Test the WebSocket delivers the same events as JSON messages"""
+    task_id = submit(api, "question")
+
+    with api.websocket_connect(f"/api/v1/tasks/{task_id}/events") as websocket:
+        first = websocket.receive_json()
+        api.release()
+        message = websocket.receive_json()
+        while message["event"] != "result":
+            message = websocket.receive_json()
+
+    assert first["event"] == "status"
+    assert first["data"]["task_id"] == task_id
+    assert message["data"]["status"] == "completed"
+
+
+def test_task_events_websocket_unknown_task(api):
+    """Test the WebSocket closes with 4404 for unknown tasks"""
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with api.websocket_connect("/api/v1/tasks/missing/events") as websocket:
+            websocket.receive_json()
+
+    assert closed.value.code == 4404
+
+
+def test_wait_times_out_with_active_task(api):
+    """Test a long-poll on an unfinished task returns it when the wait expires"""
+    task_id = submit(api, "question")
+
+    started = time.monotonic()
+    response = api.get(f"/api/v1/tasks/{task_id}", params={"wait": 0.3})
+
+    assert time.monotonic() - started >= 0.3
+    assert response.status_code == 200
+    assert response.json()["status"] in ("pending", "running")
+    assert response.json()["result"] is None
+
+
+def test_wait_returns_early_when_task_finishes(api):
+    """Test a long-poll returns as soon as the task finishes"""
+    task_id = submit(api, "question")
+    api.release(0.1)
+
+    started = time.monotonic()
+    response = api.get(f"/api/v1/tasks/{task_id}", params={"wait": 30})
+
+    assert time.monotonic() - started < 5
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    assert response.json()["result"]["question"] == "question"
+
+
+def test_wait_rejects_out_of_range_values(api):
+    """Test wait is validated against MAX_WAIT_SECONDS"""
+    task_id = submit(api, "question")
+
+    assert api.get(f"/api/v1/tasks/{task_id}", params={"wait": -1}).status_code == 422
+    assert api.get(f"/api/v1/tasks/{task_id}", params={"wait": 10000}).status_code == 422
+    assert api.get("/api/v1/tasks/missing", params={"wait": 1}).status_code == 404
+
+
+def test_batch_creates_task_group(api):
+    """Test a batch creates one task per question under a group"""
+    response = api.post("/api/v1/extract/batch", json={"questions": ["first", "second"]})
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["total"] == 2
+    assert len(body["task_ids"]) == 2
+
+    group = api.get(f"/api/v1/groups/{body['group_id']}")
+    assert group.status_code == 200
+    assert group.json()["group_id"] == body["group_id"]
+    assert group.json()["task_ids"] == body["task_ids"]
+    assert group.json()["total"] == 2
+    assert group.json()["finished"] == 0
+    assert group.json()["done"] is False
+
+
+def test_batch_rejects_empty_questions(api):
+    """Test a batch needs at least one question"""
+    assert api.post("/api/v1/extract/batch", json={"questions": []}).status_code == 422
+
+
+def test_group_results_stream_ndjson(api):
+    """Test group results stream one JSON line per finished task"""
+    body = api.post("/api/v1/extract/batch", json={"questions": ["first", "second"]}).json()
+    api.release(0.1)
+
+    response = api.get(f"/api/v1/groups/{body['group_id']}/results")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines() if line]
+    assert sorted(r["task_id"] for r in results) == sorted(body["task_ids"])
+    assert all(r["status"] == "completed" for r in results)
+
+    group = api.get(f"/api/v1/groups/{body['group_id']}").json()
+    assert group["done"] is True
+    assert group["counts"]["completed"] == 2
+
+
+def test_unknown_group(api):
+    """Test group routes are a 404 for unknown groups"""
+    assert api.get("/api/v1/groups/missing").status_code == 404
+    assert api.get("/api/v1/groups/missing/results").status_code == 404
@@ -0,0 +1,85 @@
+"""
+Tests for circuit breakers and jittered retry.
+"""
+import pytest
+from unittest.mock import AsyncMock
+from src.services.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    retry_with_jitter
+)
+
+
+def fail(breaker: CircuitBreaker, times: int = 1):
+    for _ in range(times):
+        with pytest.raises(RuntimeError):
+            with breaker.guard():
+                raise RuntimeError("down")
+
+
+def test_opens_after_consecutive_failures():
+    """Test the circuit opens at the threshold and then refuses calls"""
+    breaker = CircuitBreaker("steel", failure_threshold=3, recovery_timeout=60)
+    fail(breaker, 2)
+    with breaker.guard():
+        pass
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+    fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.check()
+    assert exc_info.value.dependency == "steel"
+    assert 0 < exc_info.value.retry_after <= 60
+    assert breaker.get_statistics()["rejected_total"] == 1
+
+
+def test_half_open_lets_one_probe_through():
+    """Test a single probe after the recovery timeout decides the state"""
+    breaker = CircuitBreaker("llm", failure_threshold=1, recovery_timeout=0)
+    fail(breaker)
+    assert breaker.state == HALF_OPEN
+    breaker.check()
+
+    breaker.acquire()
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    # A failed probe re-opens the circuit, a successful one closes it
+    breaker.record_failure()
+    assert breaker.get_statistics()["opened_total"] == 1
+    breaker.acquire()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_errors_not_caused_by_the_dependency_count_as_success():
+    """Test the failure predicate keeps request errors from opening the circuit"""
+    breaker = CircuitBreaker("llm", failure_threshold=1)
+    with pytest.raises(ValueError):
+        with breaker.guard(is_failure=lambda e: not isinstance(e, ValueError)):
+            raise ValueError("bad request")
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_retry_with_jitter_recovers_from_transient_failure():
+    """Test a failed attempt is retried"""
+    fn = AsyncMock(side_effect=[RuntimeError("blip"), "session"])
+    assert await retry_with_jitter(fn, attempts=3, base_delay=0) == "session"
+    assert fn.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_stops_once_the_circuit_opens():
+    """Test retries end with CircuitOpenError instead of hammering a dead dependency"""
+    breaker = CircuitBreaker("steel", failure_threshold=2, recovery_timeout=60)
+    fn = AsyncMock(side_effect=RuntimeError("down"))
+
+    with pytest.raises(CircuitOpenError):
+        await retry_with_jitter(fn, attempts=5, base_delay=0, breaker=breaker)
+    assert fn.await_count == 2
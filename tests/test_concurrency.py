@@ -0,0 +1,85 @@
+"""
+Tests for the adaptive concurrency limiter.
+"""
+import asyncio
+import time
+import pytest
+from src.services.concurrency import AdaptiveLimiter
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_release():
+    """Test permits are limited and handed to waiters in order"""
+    limiter = AdaptiveLimiter(2)
+    await limiter.acquire()
+    await limiter.acquire()
+    assert limiter.locked()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    limiter.release()
+    await asyncio.wait_for(waiter, 1)
+    assert limiter.in_use == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_permit():
+    """Test a waiter cancelled while queued neither holds nor blocks a permit"""
+    limiter = AdaptiveLimiter(1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    limiter.release()
+    assert limiter.in_use == 0
+    assert not limiter.locked()
+
+
+def test_failures_cut_limit_and_successes_grow_it_back():
+    """Test multiplicative decrease on failure and additive increase after"""
+    limiter = AdaptiveLimiter(8, min_limit=2, backoff=0.5)
+    limiter.record(1.0, ok=False)
+    assert limiter.limit == 4
+    limiter.record(1.0, ok=False)
+    limiter.record(1.0, ok=False)
+    assert limiter.limit == 2
+
+    for _ in range(20):
+        limiter.record(1.0)
+    assert 2 < limiter.limit < 8
+    for _ in range(200):
+        limiter.record(1.0)
+    assert limiter.limit == 8
+
+
+def test_latency_spike_counts_as_overload():
+    """Test recent latency far above the baseline lowers the limit"""
+    limiter = AdaptiveLimiter(10, min_limit=1, latency_tolerance=2.0)
+    for _ in range(20):
+        limiter.record(1.0)
+    assert limiter.limit == 10
+
+    for _ in range(10):
+        limiter.record(20.0)
+    assert limiter.limit < 10
+    assert limiter.get_statistics()["decreases"] > 0
+
+
+def test_runs_started_before_a_decrease_do_not_repeat_it():
+    """Test one burst of failures from the same runs cuts the limit once"""
+    limiter = AdaptiveLimiter(8, min_limit=1, backoff=0.5)
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.record(1.0, ok=False, started=started)
+    assert limiter.limit == 4
+
+
+def test_fixed_limit_without_min():
+    """Test the limit stays put when no lower bound is configured"""
+    limiter = AdaptiveLimiter(3)
+    limiter.record(1.0, ok=False)
+    assert limiter.limit == 3
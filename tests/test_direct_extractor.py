@@ -0,0 +1,164 @@
+"""
+Tests for the deterministic Reddit Answers extractor.
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.services.direct_extractor import (
+    DirectExtractionError,
+    RedditAnswersExtractor,
+    parse_answers_page,
+    validate_result
+)
+
+ANSWER_URL = "https://www.reddit.com/answers/abc123/?q=best+budget+headphones"
+
+ANSWER_PAGE = """
+<html>
+<head><title>Reddit Answers</title><script>var state = {"h2": "not content"};</script></head>
+<body>
+  <header><nav><a href="/r/popular/">Popular</a><h2>Menu</h2></nav></header>
+  <main>
+    <h1>best budget headphones</h1>
+    <h2>Top picks</h2>
+    <p>Redditors in <a href="/r/headphones/">r/headphones</a> recommend the
+       Koss KSC75 &amp; the Sony MDR-7506.</p>
+    <ul>
+      <li>Koss KSC75 for value</li>
+      <li>Sony MDR-7506 for durability</li>
+    </ul>
+    <h2>Things to avoid</h2>
+    <p>Cheap wireless earbuds, according to <a href="https://www.reddit.com/r/audiophile">r/audiophile</a>.</p>
+    <h3>Empty heading</h3>
+    <section>
+      <a href="/r/headphones/comments/1abcd/budget_picks/"><img src="thumb.png"></a>
+      <a href="/r/headphones/comments/1abcd/budget_picks/">What are the best budget headphones?</a>
+      <a href="https://www.reddit.com/r/audiophile/comments/2efgh/">Under $50 recommendations</a>
+      <a href="https://example.com/r/fake/comments/3xyz/">Not reddit</a>
+    </section>
+    <a href="/answers/?q=best+budget+earbuds">best budget earbuds</a>
+    <a href="/answers/?q=best+budget+headphones">best budget headphones</a>
+  </main>
+  <footer><a href="/r/reddit/">About</a></footer>
+</body>
+</html>
+"""
+
+
+def test_parse_answers_page():
+    """Test sections, sources, related posts and topics are read from the page"""
+    result = parse_answers_page(ANSWER_PAGE, ANSWER_URL, "best budget headphones")
+
+    assert [s.heading for s in result.sections] == ["Top picks", "Things to avoid"]
+    assert result.sections[0].content == [
+        "Redditors in r/headphones recommend the Koss KSC75 & the Sony MDR-7506.",
+        "Koss KSC75 for value",
+        "Sony MDR-7506 for durability"
+    ]
+    assert result.sources == [
+        "https://www.reddit.com/r/headphones",
+        "https://www.reddit.com/r/audiophile"
+    ]
+
+    assert [(p.rank, p.subreddit, p.title) for p in result.relatedPosts] == [
+        ("1", "headphones", "What are the best budget headphones?"),
+        ("2", "audiophile", "Under $50 recommendations")
+    ]
+    assert result.relatedPosts[0].url == "https://www.reddit.com/r/headphones/comments/1abcd/budget_picks/"
+    # Nothing on the page says how popular a thread is
+    post = result.relatedPosts[0]
+    assert (post.upvotes, post.comments, post.score, post.domain) == (0, 0, 0, "")
+    assert result.relatedTopics == ["best budget earbuds"]
+    validate_result(result)
+
+
+def test_validation_rejects_page_without_answer():
+    """Test a page without answer content fails validation"""
+    result = parse_answers_page("<html><body><h1>Sign in</h1></body></html>", ANSWER_URL, "q")
+    with pytest.raises(DirectExtractionError, match="No answer sections"):
+        validate_result(result)
+
+    result = parse_answers_page(ANSWER_PAGE, "https://www.reddit.com/answers/", "q")
+    with pytest.raises(DirectExtractionError, match="Not an answers page"):
+        validate_result(result)
+
+
+def test_validation_rejects_interstitial_pages():
+    """Test error pages with a heading, a sentence and community links do not pass"""
+    error_page = """
+    <html><body><main>
+      <h1>best budget headphones</h1>
+      <h2>Something went wrong</h2>
+      <p>Please try again later.</p>
+      <a href="/r/help/">r/help</a>
+    </main></body></html>
+    """
+    result = parse_answers_page(error_page, ANSWER_URL, "best budget headphones")
+    with pytest.raises(DirectExtractionError, match="too short"):
+        validate_result(result)
+
+    # A full answer that links no threads is not trusted either
+    no_threads = ANSWER_PAGE.replace("/comments/", "/wiki/")
+    result = parse_answers_page(no_threads, ANSWER_URL, "best budget headphones")
+    with pytest.raises(DirectExtractionError, match="no Reddit threads"):
+        validate_result(result)
+
+
+def make_browser(url: str = ANSWER_URL, html: str = ANSWER_PAGE, evaluate=None):
+    """Mock browser session whose current page renders the given document"""
+    page = Mock()
+    page.evaluate = evaluate or AsyncMock(return_value=json.dumps({"url": url, "html": html}))
+    browser = Mock()
+    browser.start = AsyncMock()
+    browser.navigate_to = AsyncMock()
+    browser.must_get_current_page = AsyncMock(return_value=page)
+    return browser, page
+
+
+@pytest.mark.asyncio
+async def test_extract_loads_answer_page_in_browser():
+    """Test the search page is opened in the browser and its rendered document parsed"""
+    browser, page = make_browser()
+
+    result = await RedditAnswersExtractor(load_timeout=5).extract(browser, "best budget headphones")
+
+    browser.navigate_to.assert_awaited_once_with(
+        "https://www.reddit.com/answers/?q=best+budget+headphones"
+    )
+    script, timeout_ms, settle_ms = page.evaluate.await_args.args
+    assert "view all" in script
+    assert 0 < timeout_ms <= 5000
+    assert settle_ms == 1000
+    assert result.url == ANSWER_URL
+    assert result.question == "best budget headphones"
+    assert len(result.sections) == 2
+
+
+@pytest.mark.asyncio
+async def test_extract_retries_evaluation_across_redirect():
+    """Test an evaluation lost to a redirect is retried on the new document"""
+    rendered = json.dumps({"url": ANSWER_URL, "html": ANSWER_PAGE})
+    evaluate = AsyncMock(side_effect=[RuntimeError("Execution context was destroyed"), rendered])
+    browser, _ = make_browser(evaluate=evaluate)
+
+    result = await RedditAnswersExtractor().extract(browser, "best budget headphones")
+
+    assert evaluate.await_count == 2
+    assert len(result.relatedPosts) == 2
+
+
+@pytest.mark.asyncio
+async def test_extract_rejects_unusable_pages():
+    """Test load failures and pages without an answer raise DirectExtractionError"""
+    browser, _ = make_browser()
+    browser.navigate_to.side_effect = ConnectionError("browser gone")
+    with pytest.raises(DirectExtractionError, match="Failed to load"):
+        await RedditAnswersExtractor().extract(browser, "q")
+
+    browser, _ = make_browser(html="<html><body><h1>Sign in</h1></body></html>")
+    with pytest.raises(DirectExtractionError, match="No answer sections"):
+        await RedditAnswersExtractor().extract(browser, "q")
+
+    browser, _ = make_browser(evaluate=AsyncMock(side_effect=RuntimeError("context destroyed")))
+    with pytest.raises(DirectExtractionError, match="did not finish loading"):
+        await RedditAnswersExtractor(load_timeout=0).extract(browser, "q")
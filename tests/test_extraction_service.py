@@ -1,9 +1,16 @@
 """
 Tests for the extraction service.
 """
+import asyncio
+import httpx
+import openai
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
-from src.services.extraction_service import ExtractionService, replace_protocol_mapping
+from browser_use.llm.exceptions import ModelProviderError
+from browser_use.llm.openai.chat import ChatOpenAI
+from src.services.circuit_breaker import CLOSED, OPEN
+from src.services.extraction_service import ExtractionService, ExtractionTimeoutError, _AgentRun, replace_protocol_mapping
+from src.services.direct_extractor import DirectExtractionError
 from src.models import ExtractionResult
 
 
@@ -51,7 +58,9 @@ async def test_extract_reddit_answers_success():
     with patch.dict('os.environ', {
         'STEEL_API_KEY': 'test_key',
         'OPENAI_API_KEY': 'test_key',
-        'DOMAIN': 'http://localhost:3000'
+        'DIRECT_EXTRACTION_ENABLED': 'false',
+        'DOMAIN': 'http://localhost:3000',
+        'STEEL_POOL_ENABLED': 'false'
     }):
         service = ExtractionService()
         
@@ -77,6 +86,7 @@ async def test_extract_reddit_answers_success():
                 assert result.question == "test question"
                 
                 # Verify Steel session was released
+                await service.session_lifecycle.drain()
                 mock_steel_client.sessions.release.assert_called_once_with("session-123")
 
 
@@ -85,7 +95,9 @@ async def test_extract_reddit_answers_cleanup_on_error():
     """Test Steel session cleanup on extraction error"""
     with patch.dict('os.environ', {
         'STEEL_API_KEY': 'test_key',
-        'OPENAI_API_KEY': 'test_key'
+        'OPENAI_API_KEY': 'test_key',
+        'DIRECT_EXTRACTION_ENABLED': 'false',
+        'STEEL_POOL_ENABLED': 'false'
     }):
         service = ExtractionService()
         
@@ -103,9 +115,61 @@ async def test_extract_reddit_answers_cleanup_on_error():
                     await service.extract_reddit_answers("test question")
                 
                 # Verify cleanup was called
+                await service.session_lifecycle.drain()
                 mock_steel_client.sessions.release.assert_called_once_with("session-123")
 
 
+@pytest.mark.asyncio
+async def test_extract_reddit_answers_reuses_pooled_session():
+    """Test pooled Steel sessions are returned to the pool and reused"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'DIRECT_EXTRACTION_ENABLED': 'false',
+        'STEEL_POOL_MIN_SIZE': '0'
+    }):
+        service = ExtractionService()
+        
+        mock_session = Mock()
+        mock_session.id = "session-123"
+        mock_steel_client = Mock()
+        mock_steel_client.sessions.create.return_value = mock_session
+        
+        with patch.object(service, '_create_steel_client', return_value=mock_steel_client):
+            with patch('src.services.extraction_service.Agent') as MockAgent:
+                MockAgent.return_value.run = AsyncMock(return_value=Mock())
+                
+                await service.extract_reddit_answers("first question")
+                await service.extract_reddit_answers("second question")
+                
+                mock_steel_client.sessions.create.assert_called_once()
+                mock_steel_client.sessions.release.assert_not_called()
+                
+                await service.close()
+                mock_steel_client.sessions.release.assert_called_once_with("session-123")
+
+
+@pytest.mark.asyncio
+async def test_shared_clients_created_once():
+    """Test Steel and LLM clients are reused across calls and closed on shutdown"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'HTTP_MAX_CONNECTIONS': '7'
+    }):
+        service = ExtractionService()
+        
+        llm = service.get_llm()
+        steel_client = service.get_steel_client()
+        assert service.get_llm() is llm
+        assert service.get_steel_client() is steel_client
+        assert service._http_limits().max_connections == 7
+        
+        await service.close()
+        assert service._llm is None
+        assert service._steel_client is None
+
+
 def test_parse_agent_result_basic():
     """Test basic agent result parsing"""
     with patch.dict('os.environ', {
@@ -121,3 +185,379 @@ def test_parse_agent_result_basic():
         assert result.question == "test question"
         assert isinstance(result.sources, list)
         assert isinstance(result.sections, list)
+
+
+@pytest.mark.asyncio
+async def test_extract_reddit_answers_timeout_returns_partial():
+    """Test a stuck agent is interrupted with its partial result at the deadline"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'DIRECT_EXTRACTION_ENABLED': 'false',
+        'STEEL_POOL_ENABLED': 'false'
+    }):
+        service = ExtractionService()
+        
+        mock_session = Mock()
+        mock_session.id = "session-123"
+        mock_steel_client = Mock()
+        mock_steel_client.sessions.create.return_value = mock_session
+        
+        async def stuck_run(max_steps):
+            await asyncio.sleep(60)
+        
+        with patch.object(service, '_create_steel_client', return_value=mock_steel_client):
+            with patch('src.services.extraction_service.Agent') as MockAgent:
+                mock_agent = MockAgent.return_value
+                mock_agent.run = AsyncMock(side_effect=stuck_run)
+                mock_agent.history.extracted_content.return_value = [
+                    'Extracted: {"url": "https://www.reddit.com/answers/abc", "sources": ["r/plumbing"]}',
+                    'Scrolled down'
+                ]
+                
+                with pytest.raises(ExtractionTimeoutError) as exc_info:
+                    await service.extract_reddit_answers("test question", timeout=0.05)
+                
+                partial = exc_info.value.partial
+                assert partial.url == "https://www.reddit.com/answers/abc"
+                assert partial.question == "test question"
+                mock_agent.stop.assert_called_once()
+                
+                await service.session_lifecycle.drain()
+                mock_steel_client.sessions.release.assert_called_once_with("session-123")
+
+
+@pytest.mark.asyncio
+async def test_extract_reddit_answers_step_budget_exhausted():
+    """Test an agent that uses all its steps without finishing times out"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'DIRECT_EXTRACTION_ENABLED': 'false',
+        'STEEL_POOL_ENABLED': 'false'
+    }):
+        service = ExtractionService()
+        
+        mock_steel_client = Mock()
+        mock_steel_client.sessions.create.return_value = Mock(id="session-123")
+        
+        history = Mock()
+        history.is_done.return_value = False
+        history.number_of_steps.return_value = 3
+        history.extracted_content.return_value = []
+        
+        with patch.object(service, '_create_steel_client', return_value=mock_steel_client):
+            with patch('src.services.extraction_service.Agent') as MockAgent:
+                MockAgent.return_value.run = AsyncMock(return_value=history)
+                
+                with pytest.raises(ExtractionTimeoutError, match="step budget of 3"):
+                    await service.extract_reddit_answers("test question", max_steps=3)
+                
+                MockAgent.return_value.run.assert_awaited_once_with(max_steps=3)
+
+
+def make_browser_session(keep_alive: bool = False):
+    """Mock browser session for runs that never reach a real browser"""
+    browser_session = Mock()
+    browser_session.start = AsyncMock()
+    browser_session.stop = AsyncMock()
+    browser_session.kill = AsyncMock()
+    browser_session.browser_profile.keep_alive = keep_alive
+    return browser_session
+
+
+@pytest.mark.asyncio
+async def test_direct_extraction_skips_agent():
+    """Test a valid scripted page load is returned without running the agent"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'TRAJECTORY_REPLAY_ENABLED': 'false'
+    }):
+        service = ExtractionService()
+        direct_result = ExtractionResult(url="https://www.reddit.com/answers/abc", question="test question")
+        browser_session = make_browser_session()
+        
+        extract = AsyncMock(return_value=direct_result)
+        with patch.object(service.get_direct_extractor(), 'extract', extract):
+            with patch('src.services.extraction_service.Agent') as MockAgent:
+                result = await service._run_agent("test question", browser_session)
+                
+                assert result is direct_result
+                extract.assert_awaited_once_with(browser_session, "test question")
+                MockAgent.assert_not_called()
+        
+        # The run owns the browser, so it is shut down
+        browser_session.kill.assert_awaited_once()
+        
+        pooled = make_browser_session(keep_alive=True)
+        with patch.object(service.get_direct_extractor(), 'extract', AsyncMock(return_value=direct_result)):
+            await service._run_agent("test question", pooled)
+        pooled.stop.assert_awaited_once()
+        pooled.kill.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_direct_extraction_falls_back_to_agent():
+    """Test the agent runs in the same browser when the loaded page fails validation"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'TRAJECTORY_REPLAY_ENABLED': 'false'
+    }):
+        service = ExtractionService()
+        browser_session = make_browser_session()
+        
+        failing = AsyncMock(side_effect=DirectExtractionError("No answer sections found"))
+        with patch.object(service.get_direct_extractor(), 'extract', failing):
+            with patch('src.services.extraction_service.Agent') as MockAgent:
+                MockAgent.return_value.run = AsyncMock(return_value=Mock())
+                
+                result = await service._run_agent("test question", browser_session)
+                
+                assert result.question == "test question"
+                failing.assert_awaited_once_with(browser_session, "test question")
+                MockAgent.return_value.run.assert_awaited_once()
+                assert MockAgent.call_args.kwargs["browser_session"] is browser_session
+        browser_session.kill.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_recorded_trajectory_replaces_llm_navigation(tmp_path):
+    """Test recorded navigation is replayed and the agent only extracts"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'DIRECT_EXTRACTION_ENABLED': 'false',
+        'TRAJECTORY_PATH': str(tmp_path / 'trajectory.json'),
+        'TRAJECTORY_STEP_DELAY': '0'
+    }):
+        service = ExtractionService()
+        navigate = {"navigate": {"url": "https://www.reddit.com/answers/?q=first+question"}}
+        service.trajectory_store.record({"history": [
+            {"model_output": {"action": [navigate]}, "result": [], "state": {}},
+            {"model_output": {"action": [{"done": {"text": "{}"}}]}, "result": [], "state": {}}
+        ]}, "first question")
+        
+        browser_session = Mock()
+        browser_session.start = AsyncMock()
+        browser_session.browser_profile.keep_alive = False
+        
+        kept_alive = []
+        
+        async def rerun_history(history, **kwargs):
+            kept_alive.append(browser_session.browser_profile.keep_alive)
+        
+        with patch('src.services.extraction_service.AgentHistoryList') as MockHistoryList:
+            history = Mock(history=["step"])
+            MockHistoryList.load_from_dict.return_value = history
+            with patch('src.services.extraction_service.Agent') as MockAgent:
+                replayer = Mock()
+                replayer.rerun_history = AsyncMock(side_effect=rerun_history)
+                agent = Mock()
+                agent.run = AsyncMock(return_value=Mock())
+                MockAgent.side_effect = [replayer, agent]
+                
+                await service._run_agent("second question", browser_session)
+                
+                trajectory = MockHistoryList.load_from_dict.call_args.args[0]
+                assert trajectory["history"][0]["model_output"]["action"][0]["navigate"]["url"].endswith("?q=second+question")
+                replayer.rerun_history.assert_awaited_once()
+                assert replayer.rerun_history.call_args.args[0] is history
+                assert replayer.rerun_history.call_args.kwargs["delay_between_actions"] == 0.0
+                assert replayer.rerun_history.call_args.kwargs["max_retries"] == 1
+                
+                # The replay's close must not kill the browser the agent reuses
+                assert kept_alive == [True]
+                assert browser_session.browser_profile.keep_alive is False
+                
+                agent_kwargs = MockAgent.call_args.kwargs
+                assert agent_kwargs["directly_open_url"] is False
+                assert "already open" in agent_kwargs["task"]
+        
+        assert service.get_trajectory_statistics()["replays_total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_replay_falls_back_to_agent_navigation(tmp_path):
+    """Test failed replays fall back to the agent and discard the trajectory when repeated"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'DIRECT_EXTRACTION_ENABLED': 'false',
+        'TRAJECTORY_PATH': str(tmp_path / 'trajectory.json'),
+        'TRAJECTORY_STEP_DELAY': '0',
+        'TRAJECTORY_MAX_FAILURES': '2'
+    }):
+        service = ExtractionService()
+        service.trajectory_store.record({"history": [
+            {"model_output": {"action": [{"click": {"index": 3}}]}, "result": [], "state": {}}
+        ]}, "first question")
+        
+        browser_session = Mock()
+        browser_session.start = AsyncMock()
+        browser_session.browser_profile.keep_alive = False
+        
+        with patch('src.services.extraction_service.AgentHistoryList') as MockHistoryList:
+            MockHistoryList.load_from_dict.return_value = Mock(history=["step"])
+            with patch('src.services.extraction_service.Agent') as MockAgent:
+                replayer = Mock()
+                replayer.rerun_history = AsyncMock(side_effect=RuntimeError("Could not find matching element"))
+                agent = Mock()
+                agent.run = AsyncMock(return_value=Mock())
+                MockAgent.side_effect = [replayer, agent, replayer, agent]
+                
+                await service._run_agent("second question", browser_session)
+                
+                agent_kwargs = MockAgent.call_args.kwargs
+                assert "directly_open_url" not in agent_kwargs
+                assert "Go to https://www.reddit.com/answers/" in agent_kwargs["task"]
+                assert (tmp_path / 'trajectory.json').exists()
+                assert browser_session.browser_profile.keep_alive is False
+                
+                await service._run_agent("third question", browser_session)
+        
+        assert not (tmp_path / 'trajectory.json').exists()
+        assert service.get_trajectory_statistics()["replay_failures_total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_token_budget_stops_agent():
+    """Test an agent stopped by the token budget times out with its usage counted"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'LLM_TOKEN_BUDGET': '1000',
+        'AGENT_COMPACT_MODE': 'true',
+        'DIRECT_EXTRACTION_ENABLED': 'false',
+        'TRAJECTORY_REPLAY_ENABLED': 'false'
+    }):
+        service = ExtractionService()
+        usage = service.create_usage()
+        run = _AgentRun(usage)
+        
+        browser_session = Mock()
+        browser_session.browser_profile.keep_alive = False
+        
+        history = Mock()
+        history.is_done.return_value = False
+        history.number_of_steps.return_value = 2
+        history.extracted_content.return_value = []
+        
+        with patch('src.services.extraction_service.Agent') as MockAgent:
+            async def run_agent(max_steps):
+                llm = MockAgent.call_args.kwargs["llm"]
+                llm.usage.add(900, 200)
+                assert await MockAgent.call_args.kwargs["register_should_stop_callback"]()
+                return history
+            MockAgent.return_value.run = AsyncMock(side_effect=run_agent)
+            
+            with pytest.raises(ExtractionTimeoutError, match="Token budget of 1000"):
+                await service._run_agent("test question", browser_session, max_steps=10, run=run)
+            
+            agent_kwargs = MockAgent.call_args.kwargs
+            assert agent_kwargs["llm"] is not service.get_llm()
+            assert agent_kwargs["use_vision"] is False
+            assert agent_kwargs["max_clickable_elements_length"] == service.compact_dom_chars
+            assert len(agent_kwargs["task"]) < len(service._build_task("test question"))
+        
+        assert usage.total_tokens == 1100
+        assert service.get_llm().usage is None
+
+
+def test_parse_agent_result_picks_answer_from_history():
+    """Test the structured answer is found among other JSON in the step results"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key'
+    }):
+        service = ExtractionService()
+        
+        history = Mock(spec=['history'])
+        history.history = [
+            Mock(result=[Mock(extracted_content='Clicked {"index": 4}')]),
+            Mock(result=[Mock(extracted_content=(
+                'Final answer: {"url": "https://www.reddit.com/answers/abc", "question": "test question", '
+                '"sections": [{"heading": "Fix", "content": ["Check the {valve}"]}]} - done'
+            ))]),
+            Mock(result=[Mock(extracted_content=None)])
+        ]
+        
+        result = service._parse_agent_result(history, "test question")
+        
+        assert result.url == "https://www.reddit.com/answers/abc"
+        assert result.sections[0].content == ["Check the {valve}"]
+
+
+def test_parse_agent_result_truncated_answer_falls_back_to_default():
+    """Test a cut-off final answer yields the default result, not a nested post"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key'
+    }):
+        service = ExtractionService()
+        final = (
+            '{"url": "https://www.reddit.com/answers/abc", "question": "test question", "relatedPosts": ['
+            '{"rank": "1", "title": "Low pressure", "url": "https://www.reddit.com/r/plumbing/comments/a/"}, '
+            '{"rank": "2", "title": "Valve'
+        )
+        
+        result = service._parse_agent_result(Mock(final_result=Mock(return_value=final)), "test question")
+        assert result.url == "https://www.reddit.com/answers/"
+        assert result.relatedPosts == []
+        
+        # Data that parses but does not validate also falls back
+        invalid = {"url": "https://www.reddit.com/answers/abc", "question": "test question", "sections": "text"}
+        result = service._parse_agent_result(Mock(final_result=Mock(return_value=invalid)), "test question")
+        assert result.sections == []
+
+
+def test_parse_agent_result_coerces_without_mutating():
+    """Test integer ranks and null post fields are coerced declaratively"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key'
+    }):
+        service = ExtractionService()
+        post = {"rank": 1, "title": None, "subreddit": "plumbing", "url": "https://www.reddit.com/r/plumbing/comments/a/",
+                "upvotes": None, "comments": 4, "domain": None, "score": None}
+        data = {"url": "https://www.reddit.com/answers/abc", "question": "test question", "relatedPosts": [post]}
+        
+        result = service._parse_agent_result(Mock(final_result=Mock(return_value=data)), "test question")
+        
+        parsed = result.relatedPosts[0]
+        assert (parsed.rank, parsed.title, parsed.upvotes, parsed.domain, parsed.score) == ("1", "", 0, "", 0)
+        assert post["rank"] == 1 and post["upvotes"] is None
+
+
+@pytest.mark.asyncio
+async def test_llm_breaker_ignores_bad_model_output():
+    """Test unparseable output trips nothing while connection failures open the breaker"""
+    with patch.dict('os.environ', {
+        'STEEL_API_KEY': 'test_key',
+        'OPENAI_API_KEY': 'test_key',
+        'CIRCUIT_FAILURE_THRESHOLD': '2'
+    }):
+        service = ExtractionService()
+    llm = service.get_llm()
+    
+    def bad_output(*args, **kwargs):
+        # How browser-use reports a response it cannot parse
+        raise ModelProviderError("Failed to parse model output", status_code=500) from ValueError("bad json")
+    
+    def unreachable(*args, **kwargs):
+        cause = openai.APIConnectionError(request=httpx.Request("POST", "https://llm.test/v1/chat/completions"))
+        raise ModelProviderError(str(cause)) from cause
+    
+    with patch.object(ChatOpenAI, 'ainvoke', side_effect=bad_output):
+        for _ in range(3):
+            with pytest.raises(ModelProviderError):
+                await llm.ainvoke([])
+    assert service.llm_breaker.state == CLOSED
+    
+    with patch.object(ChatOpenAI, 'ainvoke', side_effect=unreachable):
+        for _ in range(2):
+            with pytest.raises(ModelProviderError):
+                await llm.ainvoke([])
+    assert service.llm_breaker.state == OPEN
+    await service.close()
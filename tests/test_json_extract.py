@@ -0,0 +1,49 @@
+"""
+Tests for JSON object extraction from agent output.
+"""
+import json
+from src.services.json_extract import find_json_object, iter_json_objects
+
+KEYS = ("url", "question", "sources", "sections", "relatedPosts", "relatedTopics")
+
+
+def test_objects_between_prose_are_found_separately():
+    """Test a greedy first-to-last brace span would have broken this text"""
+    text = (
+        'Scrolled to {"x": 10}. The page says "use {braces} carefully". '
+        'Result: {"url": "https://www.reddit.com/answers/abc", "sections": [{"heading": "A {b}", "content": ["c \\" }"]}]} done.'
+    )
+    objects = list(iter_json_objects(text))
+
+    assert objects[0] == {"x": 10}
+    assert objects[1]["sections"][0] == {"heading": "A {b}", "content": ['c " }']}
+    assert len(objects) == 2
+
+
+def test_best_schema_match_wins():
+    """Test the object sharing most keys with the result schema is chosen"""
+    answer = {"url": "https://www.reddit.com/answers/abc", "question": "q", "sections": []}
+    texts = [
+        json.dumps(answer),
+        'Extracted: {"url": "https://www.reddit.com/answers/abc", "status": "loaded"}',
+        "no json here"
+    ]
+
+    assert find_json_object(texts, KEYS) == answer
+    assert find_json_object(['{"status": "ok"}', "{not json}"], KEYS) is None
+
+
+def test_nested_object_found_inside_invalid_outer_braces():
+    """Test JSON wrapped in non-JSON braces is still found"""
+    text = "{python repr: {'a': 1}, data: {\"url\": \"u\", \"question\": \"q\"}}"
+    assert find_json_object([text], KEYS) == {"url": "u", "question": "q"}
+
+
+def test_nested_fragment_of_truncated_answer_is_not_taken():
+    """Test a complete related post inside a cut-off answer is not returned"""
+    text = (
+        '{"url": "https://www.reddit.com/answers/abc", "question": "q", "relatedPosts": ['
+        '{"rank": "1", "title": "t", "url": "https://www.reddit.com/r/a/comments/x/"}, {"rank": "2", "ti'
+    )
+    assert find_json_object([text], KEYS) is None
+    assert find_json_object([text], KEYS, min_keys=1)["rank"] == "1"
@@ -0,0 +1,114 @@
+"""
+Tests for the fast JSON response helpers.
+"""
+import gzip
+import json
+from datetime import datetime
+
+from starlette.requests import Request
+
+from src.services.json_response import (
+    FastJSONResponse,
+    ResponseEncoder,
+    ResultJSONCache,
+    dumps,
+    embed_json,
+    etag_matches,
+    json_array,
+    make_etag
+)
+
+
+def request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/tasks",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    })
+
+
+def test_embed_json_appends_raw_member():
+    """Test a pre-serialized value is spliced into an object"""
+    assert json.loads(embed_json(b'{"a":1}', "result", b'{"b":[2]}')) == {"a": 1, "result": {"b": [2]}}
+    assert json.loads(embed_json(b"{}", "result", None)) == {"result": None}
+    assert json.loads(json_array([b'{"a":1}', b"[]"])) == [{"a": 1}, []]
+    assert json_array([]) == b"[]"
+
+
+def test_response_passes_bytes_through():
+    """Test pre-serialized content is sent unchanged and other content encoded"""
+    assert FastJSONResponse(b'{"x": 1}').body == b'{"x": 1}'
+    assert json.loads(FastJSONResponse({"x": "é", 1: [True]}).body) == {"x": "é", "1": [True]}
+    assert json.loads(dumps({"when": datetime(2024, 1, 2)})) == {"when": "2024-01-02T00:00:00"}
+
+
+def test_cache_is_keyed_on_update_time_and_bounded():
+    """Test entries miss after the task changed and old entries are evicted"""
+    first = datetime(2024, 1, 1)
+    cache = ResultJSONCache(max_bytes=10)
+    cache.put("a", first, b"12345")
+    assert cache.get("a", first) == b"12345"
+    assert cache.get("a", datetime(2024, 1, 2)) is None
+
+    cache.put("b", first, b"123456")
+    assert cache.get("a", first) is None
+    assert cache.get("b", first) == b"123456"
+
+    # Results larger than the whole cache are not kept
+    cache.put("c", first, b"x" * 11)
+    assert cache.get("c", first) is None
+    assert cache.get_statistics()["size_bytes"] == 6
+
+
+def test_etag_comparison_is_weak():
+    """Test If-None-Match matches listed, weak and wildcard tags"""
+    etag = make_etag("task", "2024-01-01T00:00:00")
+    assert etag.startswith('W/"') and etag != make_etag("task", "2024-01-01T00:00:01")
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_encoding_negotiation():
+    """Test gzip is picked when accepted and refused codings are honoured"""
+    encoder = ResponseEncoder()
+    assert encoder.negotiate("gzip, deflate") == "gzip"
+    assert encoder.negotiate("*") == "gzip"
+    assert encoder.negotiate("gzip;q=0, identity") is None
+    assert encoder.negotiate(None) is None
+    assert ResponseEncoder(min_bytes=0).negotiate("gzip") is None
+
+
+def test_respond_compresses_and_answers_not_modified():
+    """Test large bodies are compressed once and current clients get a 304"""
+    encoder = ResponseEncoder(min_bytes=100)
+    body = json.dumps({"items": ["x" * 50] * 20}).encode()
+    renders = []
+
+    def render():
+        renders.append(1)
+        return body
+
+    etag = make_etag("task", 1)
+    for _ in range(2):
+        response = encoder.respond(request(accept_encoding="gzip"), etag, render, final=True)
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == etag
+        assert gzip.decompress(response.body) == body
+    assert len(renders) == 1
+
+    plain = encoder.respond(request(), etag, render)
+    assert "content-encoding" not in plain.headers
+    assert plain.body == body
+
+    small = encoder.respond(request(accept_encoding="gzip"), etag, lambda: b"{}")
+    assert "content-encoding" not in small.headers
+
+    response = encoder.respond(request(if_none_match=etag), etag, render)
+    assert response.status_code == 304
+    assert response.body == b""
+    assert len(renders) == 2
+    assert encoder.get_statistics()["not_modified"] == 1
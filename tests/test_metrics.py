@@ -0,0 +1,44 @@
+"""
+Tests for Prometheus metrics rendering.
+"""
+from src.services.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge_render():
+    """Test counters and labelled gauges render in text format"""
+    registry = MetricsRegistry()
+    counter = registry.counter("tasks_total", "Tasks")
+    gauge = registry.gauge("tasks", "Tasks by status", ["status"])
+    
+    counter.inc()
+    counter.inc(2)
+    gauge.labels("pending").set(4)
+    
+    text = registry.render()
+    assert "# TYPE tasks_total counter" in text
+    assert "tasks_total 3" in text
+    assert 'tasks{status="pending"} 4' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram buckets, sum and count"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(1, 5))
+    
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    
+    text = registry.render()
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="5"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_sum 14.5" in text
+    assert "latency_seconds_count 4" in text
+
+
+def test_label_values_are_escaped():
+    """Test quotes and backslashes in label values are escaped"""
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors", ["reason"]).labels('bad "x"\\').inc()
+    
+    assert 'errors_total{reason="bad \\"x\\"\\\\"} 1' in registry.render()
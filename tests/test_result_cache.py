@@ -0,0 +1,79 @@
+"""
+Tests for the extraction result cache.
+"""
+import time
+from unittest.mock import patch
+from src.models import ExtractionResult
+from src.services.result_cache import (
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    ResultCache,
+    normalize_question
+)
+
+
+def make_result(question: str) -> ExtractionResult:
+    return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+
+
+def test_normalize_question():
+    """Test case, whitespace and trailing punctuation are folded away"""
+    assert normalize_question("  How many   Planets? ") == "how many planets"
+    assert normalize_question("how many planets") == "how many planets"
+
+
+def test_memory_cache_hit_and_miss_counters():
+    """Test lookups are counted and keyed by normalized question"""
+    cache = ResultCache(MemoryCacheBackend())
+    
+    assert cache.get("water pressure") is None
+    cache.set("water pressure", make_result("water pressure"))
+    
+    assert cache.get("Water Pressure?").question == "water pressure"
+    assert cache.get_statistics() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_memory_cache_lru_eviction():
+    """Test least recently used entries are evicted past max_entries"""
+    cache = ResultCache(MemoryCacheBackend(max_entries=2))
+    cache.set("a", make_result("a"))
+    cache.set("b", make_result("b"))
+    cache.get("a")
+    cache.set("c", make_result("c"))
+    
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_cache_ttl_expiry():
+    """Test entries expire after the TTL"""
+    cache = ResultCache(MemoryCacheBackend(), ttl=10)
+    cache.set("q", make_result("q"))
+    
+    with patch("src.services.result_cache.time.time", return_value=time.time() + 11):
+        assert cache.get("q") is None
+    assert len(cache.backend) == 0
+
+
+def test_cache_max_age():
+    """Test max_age rejects entries older than the caller accepts"""
+    cache = ResultCache(MemoryCacheBackend(), ttl=3600)
+    cache.set("q", make_result("q"))
+    
+    with patch("src.services.result_cache.time.time", return_value=time.time() + 60):
+        assert cache.get("q", max_age=30) is None
+        assert cache.get("q", max_age=120) is not None
+
+
+def test_disk_cache_persists_entries(tmp_path):
+    """Test the disk backend survives a restart and bounds its size"""
+    cache = ResultCache(DiskCacheBackend(str(tmp_path), max_entries=2))
+    cache.set("a", make_result("a"))
+    cache.set("b", make_result("b"))
+    cache.set("c", make_result("c"))
+    
+    reopened = ResultCache(DiskCacheBackend(str(tmp_path), max_entries=2))
+    assert len(reopened.backend) == 2
+    assert reopened.get("a") is None
+    assert reopened.get("c").question == "c"
@@ -0,0 +1,72 @@
+"""
+Tests for the priority task scheduler.
+"""
+import asyncio
+import pytest
+from src.models import TaskPriority
+from src.services.scheduler import QueueFullError, TaskScheduler
+
+
+@pytest.mark.asyncio
+async def test_dequeues_by_priority_then_fifo():
+    """Test higher priorities go first and ties keep submission order"""
+    scheduler = TaskScheduler()
+    scheduler.submit("low", TaskPriority.LOW)
+    scheduler.submit("normal-1")
+    scheduler.submit("high", TaskPriority.HIGH)
+    scheduler.submit("normal-2")
+    
+    assert scheduler.position("high") == 1
+    assert scheduler.position("normal-2") == 3
+    assert scheduler.position("low") == 4
+    
+    order = [await scheduler.get() for _ in range(4)]
+    assert order == ["high", "normal-1", "normal-2", "low"]
+    assert len(scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_waits_for_submission():
+    """Test get blocks until a task is queued"""
+    scheduler = TaskScheduler()
+    waiter = asyncio.create_task(scheduler.get())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    
+    scheduler.submit("task")
+    assert await asyncio.wait_for(waiter, 1) == "task"
+
+
+def test_bounded_depth_and_removal():
+    """Test a full queue rejects submissions until a task leaves"""
+    scheduler = TaskScheduler(max_queue_depth=2)
+    scheduler.submit("a")
+    scheduler.submit("b", TaskPriority.HIGH)
+    
+    with pytest.raises(QueueFullError):
+        scheduler.submit("c")
+    assert scheduler.submit("resumed", force=True) == 3
+    
+    assert scheduler.remove("a") is True
+    assert scheduler.remove("a") is False
+    assert scheduler.position("a") is None
+    assert scheduler.get_statistics() == {
+        "high": 1, "normal": 1, "low": 0, "depth": 2, "groups": 0, "max_depth": 2
+    }
+
+
+@pytest.mark.asyncio
+async def test_groups_take_turns_with_interactive_tasks():
+    """Test a large group alternates with other flows at the same priority"""
+    scheduler = TaskScheduler()
+    for i in range(3):
+        scheduler.submit(f"batch-{i}", TaskPriority.NORMAL, group="batch")
+    scheduler.submit("user-0")
+    scheduler.submit("user-1")
+    
+    assert scheduler.position("user-1") == 4
+    assert scheduler.position("batch-2") == 5
+    assert scheduler.get_statistics()["groups"] == 1
+    
+    order = [await scheduler.get() for _ in range(5)]
+    assert order == ["batch-0", "user-0", "batch-1", "user-1", "batch-2"]
@@ -0,0 +1,303 @@
+"""
+Tests for the Steel session pool.
+"""
+import asyncio
+import itertools
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.services.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpenError
+from src.services.session_pool import SteelSessionLifecycle, SteelSessionPool
+
+
+def make_steel_client():
+    """Create a mock Steel client that hands out numbered sessions"""
+    counter = itertools.count(1)
+    client = Mock()
+    
+    def create():
+        session = Mock()
+        session.id = f"session-{next(counter)}"
+        return session
+    
+    client.sessions.create.side_effect = create
+    client.sessions.retrieve.return_value = Mock(status="live")
+    return client
+
+
+@pytest.mark.asyncio
+async def test_start_fills_min_size():
+    """Test the pool pre-creates min_size sessions on start"""
+    client = make_steel_client()
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=2, max_size=4)
+    
+    await pool.start()
+    
+    assert client.sessions.create.call_count == 2
+    assert pool.get_statistics()["idle"] == 2
+    
+    await pool.close()
+    assert client.sessions.release.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_lease_discards_session_on_error():
+    """Test a session is released instead of reused when the lease fails"""
+    client = make_steel_client()
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=0, max_size=2)
+    
+    with pytest.raises(RuntimeError):
+        async with pool.lease() as pooled:
+            raise RuntimeError("agent crashed")
+    
+    await pool.lifecycle.drain()
+    client.sessions.release.assert_called_once_with(pooled.id)
+    assert pool.size == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_lease_releases_without_refill():
+    """Test a cancelled lease releases its session and leaves refill to the reaper"""
+    client = make_steel_client()
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=1, max_size=2)
+    await pool.start()
+    leased = asyncio.Event()
+    
+    async def use_session():
+        async with pool.lease():
+            leased.set()
+            await asyncio.sleep(60)
+    
+    user = asyncio.create_task(use_session())
+    await leased.wait()
+    user.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await user
+    
+    await pool.lifecycle.drain()
+    client.sessions.release.assert_called_once_with("session-1")
+    assert client.sessions.create.call_count == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_session_recycled_after_max_uses():
+    """Test sessions are released once they reach max_uses"""
+    client = make_steel_client()
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=0, max_size=1, max_uses=2)
+    
+    for _ in range(3):
+        async with pool.lease():
+            pass
+    
+    await pool.lifecycle.drain()
+    assert client.sessions.create.call_count == 2
+    client.sessions.release.assert_called_once_with("session-1")
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_evicted():
+    """Test idle sessions past idle_timeout are not leased again"""
+    client = make_steel_client()
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=0, max_size=2, idle_timeout=0)
+    
+    async with pool.lease():
+        pass
+    async with pool.lease() as pooled:
+        assert pooled.id == "session-2"
+    
+    await pool.lifecycle.drain()
+    client.sessions.release.assert_called_once_with("session-1")
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_session_replaced():
+    """Test sessions reported dead by Steel are replaced"""
+    client = make_steel_client()
+    client.sessions.retrieve.return_value = Mock(status="released")
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=0, max_size=2, health_check_after=0)
+    
+    async with pool.lease():
+        pass
+    async with pool.lease() as pooled:
+        assert pooled.id == "session-2"
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_when_pool_exhausted():
+    """Test leases beyond max_size wait for a session to be returned"""
+    client = make_steel_client()
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=0, max_size=1)
+    
+    first = await pool.acquire()
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    
+    await pool.give_back(first)
+    second = await asyncio.wait_for(waiter, timeout=1)
+    
+    assert second.id == first.id
+    assert client.sessions.create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_lifecycle_calls_do_not_block_event_loop():
+    """Test slow Steel calls run off the event loop"""
+    client = make_steel_client()
+    
+    def slow_create():
+        time.sleep(0.2)
+        return Mock(id="slow-session")
+    
+    client.sessions.create.side_effect = slow_create
+    lifecycle = SteelSessionLifecycle(client)
+    
+    ticks = 0
+    
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+    
+    ticking = asyncio.create_task(ticker())
+    session = await lifecycle.create()
+    ticking.cancel()
+    
+    assert session.id == "slow-session"
+    assert ticks >= 5
+    
+    lifecycle.release_later(session.id)
+    await lifecycle.close()
+    client.sessions.release.assert_called_once_with("slow-session")
+
+
+@pytest.mark.asyncio
+async def test_session_creation_retried_then_circuit_opens():
+    """Test Steel failures are retried and an open circuit makes leases fail fast"""
+    client = make_steel_client()
+    client.sessions.create.side_effect = [RuntimeError("502"), Mock(id="session-1")]
+    breaker = CircuitBreaker("steel", failure_threshold=3, recovery_timeout=60)
+    lifecycle = SteelSessionLifecycle(client, breaker=breaker, retry_base_delay=0)
+    
+    session = await lifecycle.create()
+    assert session.id == "session-1"
+    assert breaker.state == CLOSED
+    
+    client.sessions.create.side_effect = RuntimeError("502")
+    pool = SteelSessionPool(lifecycle, min_size=0, max_size=2)
+    with pytest.raises(RuntimeError):
+        await pool.acquire()
+    assert client.sessions.create.call_count == 5
+    assert breaker.state == OPEN
+    
+    # Refused without calling Steel, and without leaking pool capacity
+    with pytest.raises(CircuitOpenError):
+        await pool.acquire()
+    assert client.sessions.create.call_count == 5
+    assert pool.size == 0
+    await pool.close()
+
+
+def make_blocked_client():
+    """Create a mock Steel client whose session creation waits for an event"""
+    client = make_steel_client()
+    unblock = threading.Event()
+    
+    def create():
+        unblock.wait(5)
+        return Mock(id="late-session")
+    
+    client.sessions.create.side_effect = create
+    return client, unblock
+
+
+@pytest.mark.asyncio
+async def test_session_created_after_close_is_released():
+    """Test a fill still creating when the pool closes releases its session"""
+    client, unblock = make_blocked_client()
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=1, max_size=2)
+    
+    filling = asyncio.create_task(pool._fill())
+    await asyncio.sleep(0.05)
+    await pool.close()
+    
+    unblock.set()
+    await filling
+    await pool.lifecycle.drain()
+    
+    client.sessions.release.assert_called_once_with("late-session")
+    assert pool.get_statistics()["idle"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_fill_releases_created_session():
+    """Test cancelling a fill mid-create releases the session once Steel returns it"""
+    client, unblock = make_blocked_client()
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=1, max_size=2)
+    
+    filling = asyncio.create_task(pool._fill())
+    await asyncio.sleep(0.05)
+    filling.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await filling
+    assert pool.size == 0
+    
+    unblock.set()
+    for _ in range(100):
+        if client.sessions.release.called:
+            break
+        await asyncio.sleep(0.01)
+    await pool.lifecycle.drain()
+    
+    client.sessions.release.assert_called_once_with("late-session")
+    await pool.close()
+
+
+async def wait_released(client):
+    """Wait for the blocked creation to finish and its release to be sent"""
+    for _ in range(100):
+        if client.sessions.release.called:
+            break
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_acquire_releases_created_session():
+    """Test cancelling a lease while its session is created releases the session"""
+    client, unblock = make_blocked_client()
+    pool = SteelSessionPool(SteelSessionLifecycle(client), min_size=0, max_size=2)
+    
+    acquiring = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.05)
+    acquiring.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await acquiring
+    assert pool.size == 0
+    
+    unblock.set()
+    await wait_released(client)
+    await pool.lifecycle.drain()
+    
+    client.sessions.release.assert_called_once_with("late-session")
+    assert pool.get_statistics()["leased"] == 0
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_create_releases_session():
+    """Test a direct session creation abandoned at a deadline releases the session"""
+    client, unblock = make_blocked_client()
+    lifecycle = SteelSessionLifecycle(client)
+    
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(lifecycle.create(), 0.05)
+    
+    unblock.set()
+    await wait_released(client)
+    await lifecycle.drain()
+    
+    client.sessions.release.assert_called_once_with("late-session")
+    await lifecycle.close()
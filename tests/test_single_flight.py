@@ -0,0 +1,68 @@
+"""
+Tests for single-flight coalescing.
+"""
+import asyncio
+import pytest
+from src.services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_result():
+    """Test callers with the same key share one run"""
+    flight = SingleFlight()
+    calls = 0
+    
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+    
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+    
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert not flight.in_flight("key")
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_keeps_shared_run():
+    """Test a cancelled caller detaches without cancelling the others"""
+    flight = SingleFlight()
+    release = asyncio.Event()
+    
+    async def work():
+        await release.wait()
+        return "result"
+    
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    
+    assert await second == "result"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_shared_run_cancelled_when_all_callers_leave():
+    """Test the run stops once no caller is waiting for it"""
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+    
+    async def work():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    caller = asyncio.create_task(flight.do("key", work))
+    await started.wait()
+    caller.cancel()
+    
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
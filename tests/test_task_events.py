@@ -0,0 +1,37 @@
+"""
+Tests for the task event bus.
+"""
+import pytest
+from src.services.task_events import TaskEventBus
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_every_subscriber_of_the_task():
+    """Test updates go to the task's subscribers only"""
+    bus = TaskEventBus()
+    first = bus.subscribe("task-1")
+    second = bus.subscribe("task-1")
+    other = bus.subscribe("task-2")
+    
+    bus.publish("task-1", "running")
+    
+    assert first.get_nowait() == "running"
+    assert second.get_nowait() == "running"
+    assert other.empty()
+    
+    bus.unsubscribe("task-1", first)
+    bus.unsubscribe("task-1", second)
+    assert not bus.has_subscribers("task-1")
+    assert len(bus) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_keeps_newest_updates():
+    """Test a full queue drops its oldest update instead of the newest"""
+    bus = TaskEventBus(max_queued=2)
+    queue = bus.subscribe("task-1")
+    
+    for update in ["pending", "running", "completed"]:
+        bus.publish("task-1", update)
+    
+    assert [queue.get_nowait(), queue.get_nowait()] == ["running", "completed"]
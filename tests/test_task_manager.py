@@ -0,0 +1,608 @@
+"""
+Tests for the task manager.
+"""
+import asyncio
+import json
+import pytest
+from unittest.mock import ANY, AsyncMock, patch
+from src.models import ContentSection, ExtractionResult, TaskPriority, TaskStatus
+from src.services.circuit_breaker import CircuitOpenError
+from src.services.concurrency import AdaptiveLimiter
+from src.services.extraction_service import ExtractionTimeoutError
+from src.services.scheduler import QueueFullError
+from src.services.task_manager import TaskManager
+
+
+@pytest.fixture
+def task_manager(tmp_path):
+    """Task manager with a mocked extraction service"""
+    with patch.dict('os.environ', {
+        'OPENAI_API_KEY': 'test_key',
+        'RESULT_CACHE_BACKEND': 'memory',
+        'RESULT_SPILL_DIR': str(tmp_path / 'results'),
+        'RESULT_SPILL_THRESHOLD_BYTES': '1024'
+    }):
+        manager = TaskManager(max_concurrent_tasks=2)
+    manager.extraction_service.extract_reddit_answers = AsyncMock(
+        side_effect=lambda question, **kwargs: ExtractionResult(
+            url="https://www.reddit.com/answers/abc",
+            question=question,
+            sections=[ContentSection(heading="Answer", content=["text"])]
+        )
+    )
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_execute_task_uses_result_cache(task_manager):
+    """Test a repeated question is served from the cache"""
+    first = task_manager.create_task("water pressure")
+    await task_manager.execute_task(first)
+    second = task_manager.create_task("Water pressure?")
+    await task_manager.execute_task(second)
+    
+    assert task_manager.get_task(second).status == TaskStatus.COMPLETED
+    assert task_manager.get_task(second).metadata["cache_hit"] is True
+    task_manager.extraction_service.extract_reddit_answers.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_execute_task_no_cache_runs_fresh_extraction(task_manager):
+    """Test no_cache bypasses the cache lookup"""
+    await task_manager.execute_task(task_manager.create_task("water pressure"))
+    await task_manager.execute_task(task_manager.create_task("water pressure", no_cache=True))
+    
+    assert task_manager.extraction_service.extract_reddit_answers.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_tasks_share_one_extraction(task_manager):
+    """Test concurrent tasks for the same question coalesce into one run"""
+    release = asyncio.Event()
+    
+    async def slow_extract(question, **kwargs):
+        await release.wait()
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+    
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=slow_extract)
+    task_ids = [task_manager.create_task("popular question") for _ in range(3)]
+    runs = [asyncio.create_task(task_manager.execute_task(t)) for t in task_ids]
+    await asyncio.sleep(0.01)
+    
+    assert all(task_manager.get_task(t).status == TaskStatus.RUNNING for t in task_ids)
+    release.set()
+    await asyncio.gather(*runs)
+    
+    task_manager.extraction_service.extract_reddit_answers.assert_awaited_once()
+    assert all(task_manager.get_task(t).status == TaskStatus.COMPLETED for t in task_ids)
+    assert task_manager.get_task(task_ids[1]).metadata["coalesced"] is True
+
+
+@pytest.mark.asyncio
+async def test_coalesced_tasks_share_failure(task_manager):
+    """Test every attached task receives the shared error"""
+    release = asyncio.Event()
+    
+    async def failing_extract(question, **kwargs):
+        await release.wait()
+        raise RuntimeError("Steel unavailable")
+    
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=failing_extract)
+    task_ids = [task_manager.create_task("popular question") for _ in range(2)]
+    runs = [asyncio.create_task(task_manager.execute_task(t)) for t in task_ids]
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(*runs)
+    
+    for task_id in task_ids:
+        task = task_manager.get_task(task_id)
+        assert task.status == TaskStatus.FAILED
+        assert "Steel unavailable" in task.error
+
+
+@pytest.mark.asyncio
+async def test_large_results_spill_and_load_lazily(task_manager):
+    """Test large results leave the task table and load back on read"""
+    big = ExtractionResult(
+        url="https://www.reddit.com/answers/abc",
+        question="big question",
+        sections=[ContentSection(heading="Answer", content=["x" * 2000])]
+    )
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(return_value=big)
+    task_id = task_manager.create_task("big question")
+    await task_manager.execute_task(task_id)
+    
+    stored = task_manager.store.get(task_id)
+    assert stored.result is None
+    assert stored.metadata["result_spilled"] is True
+    assert task_manager.get_task(task_id).result == big
+
+
+@pytest.mark.asyncio
+async def test_compaction_keeps_statistics(task_manager):
+    """Test evicted tasks disappear but still count in statistics"""
+    task_manager.retention_max_finished = 1
+    for question in ["one", "two", "three"]:
+        await task_manager.execute_task(task_manager.create_task(question))
+    task_manager.create_task("still pending")
+    
+    assert task_manager.compact() == 2
+    assert len(task_manager.list_tasks()) == 2
+    
+    stats = task_manager.get_statistics()
+    assert stats["total"] == 4
+    assert stats["completed"] == 3
+    assert stats["pending"] == 1
+    assert stats["evicted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_queued_tasks_by_priority(task_manager):
+    """Test queued tasks start in priority order as slots free up"""
+    release = asyncio.Event()
+    started = []
+    
+    async def blocking_extract(question, **kwargs):
+        started.append(question)
+        await release.wait()
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+    
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=blocking_extract)
+    task_manager.max_concurrent_tasks = 1
+    task_manager.semaphore = AdaptiveLimiter(1)
+    
+    first = task_manager.create_task("first")
+    assert task_manager.submit_task(first) == 1
+    await asyncio.sleep(0.01)
+    
+    low = task_manager.create_task("low", priority=TaskPriority.LOW)
+    normal = task_manager.create_task("normal")
+    high = task_manager.create_task("high", priority=TaskPriority.HIGH)
+    positions = [task_manager.submit_task(t) for t in (low, normal, high)]
+    
+    assert positions == [1, 1, 1]
+    assert task_manager.get_queue_position(low) == 3
+    
+    release.set()
+    for _ in range(50):
+        if task_manager.get_task(low).status == TaskStatus.COMPLETED:
+            break
+        await asyncio.sleep(0.01)
+    
+    assert started == ["first", "high", "normal", "low"]
+    await task_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_task(task_manager):
+    """Test submissions beyond the queue depth are rejected and cancelled"""
+    task_manager.scheduler.max_queue_depth = 0
+    
+    task_id = task_manager.create_task("overflow")
+    with pytest.raises(QueueFullError):
+        task_manager.submit_task(task_id)
+    
+    task = task_manager.get_task(task_id)
+    assert task.status == TaskStatus.CANCELLED
+    assert "queue is full" in task.error
+
+
+@pytest.mark.asyncio
+async def test_cached_task_skips_queue(task_manager):
+    """Test a cached question completes at submission without queueing"""
+    await task_manager.execute_task(task_manager.create_task("water pressure"))
+    task_manager.scheduler.max_queue_depth = 0
+    
+    task_id = task_manager.create_task("water pressure")
+    assert task_manager.submit_task(task_id) is None
+    assert task_manager.get_task(task_id).status == TaskStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_task_stops_extraction(task_manager):
+    """Test cancelling a running task interrupts its run and frees the slot"""
+    started = asyncio.Event()
+    interrupted = asyncio.Event()
+    
+    async def hanging_extract(question, **kwargs):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            interrupted.set()
+            raise
+    
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=hanging_extract)
+    task_id = task_manager.create_task("slow question")
+    task_manager.submit_task(task_id)
+    await asyncio.wait_for(started.wait(), 1)
+    assert task_manager.get_task(task_id).status == TaskStatus.RUNNING
+    
+    assert task_manager.cancel_task(task_id) is True
+    await asyncio.wait_for(interrupted.wait(), 1)
+    await asyncio.sleep(0)
+    
+    assert task_manager.get_task(task_id).status == TaskStatus.CANCELLED
+    assert task_id not in task_manager._running
+    assert not task_manager._running_flights
+    assert task_manager.semaphore.in_use == 0
+    assert task_manager.cancel_task(task_id) is False
+    await task_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_cancel_coalesced_task_keeps_shared_run(task_manager):
+    """Test cancelling one of several tasks on a shared run only detaches it"""
+    release = asyncio.Event()
+    
+    async def slow_extract(question, **kwargs):
+        await release.wait()
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+    
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=slow_extract)
+    first, second = [task_manager.create_task("popular question") for _ in range(2)]
+    task_manager.submit_task(first)
+    await asyncio.sleep(0.01)
+    task_manager.submit_task(second)
+    await asyncio.sleep(0.01)
+    
+    assert task_manager.cancel_task(first) is True
+    release.set()
+    for _ in range(50):
+        if task_manager.get_task(second).status == TaskStatus.COMPLETED:
+            break
+        await asyncio.sleep(0.01)
+    
+    assert task_manager.get_task(first).status == TaskStatus.CANCELLED
+    assert task_manager.get_task(second).status == TaskStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_task_never_runs(task_manager):
+    """Test a cancelled queued task is removed from the queue"""
+    task_manager.scheduler.submit("other")
+    task_id = task_manager.create_task("queued question")
+    task_manager.scheduler.submit(task_id)
+    
+    assert task_manager.cancel_task(task_id) is True
+    assert task_manager.get_queue_position(task_id) is None
+    assert task_manager.get_task(task_id).status == TaskStatus.CANCELLED
+
+
+@pytest.mark.asyncio
+async def test_timed_out_task_keeps_partial_result(task_manager):
+    """Test an exhausted budget ends the task as TIMED_OUT with its partial result"""
+    partial = ExtractionResult(url="https://www.reddit.com/answers/abc", question="slow question")
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(
+        side_effect=ExtractionTimeoutError("Extraction timed out after 5s", partial=partial)
+    )
+    task_id = task_manager.create_task("slow question", timeout_seconds=5, max_steps=10)
+    await task_manager.execute_task(task_id)
+    
+    task = task_manager.get_task(task_id)
+    assert task.status == TaskStatus.TIMED_OUT
+    assert task.result == partial
+    assert "timed out" in task.error
+    task_manager.extraction_service.extract_reddit_answers.assert_awaited_once_with(
+        "slow question", timeout=5, max_steps=10, usage=ANY
+    )
+    assert task_manager.result_cache.get("slow question") is None
+
+
+@pytest.mark.asyncio
+async def test_watch_task_streams_updates_until_final(task_manager):
+    """Test watchers receive progress and the final result without polling"""
+    release = asyncio.Event()
+    
+    async def slow_extract(question, **kwargs):
+        await release.wait()
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+    
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=slow_extract)
+    task_id = task_manager.create_task("streamed question")
+    
+    async def collect():
+        return [s async for s in task_manager.watch_task(task_id)]
+    
+    watcher = asyncio.create_task(collect())
+    await asyncio.sleep(0)
+    runner = asyncio.create_task(task_manager.execute_task(task_id))
+    await asyncio.sleep(0.01)
+    release.set()
+    await runner
+    snapshots = await asyncio.wait_for(watcher, 1)
+    
+    assert [s.status for s in snapshots] == [
+        TaskStatus.PENDING,
+        TaskStatus.RUNNING,
+        TaskStatus.COMPLETED
+    ]
+    assert snapshots[1].progress == "Starting extraction..."
+    assert snapshots[-1].result.question == "streamed question"
+    assert not task_manager.events.has_subscribers(task_id)
+
+
+@pytest.mark.asyncio
+async def test_watch_task_heartbeat_and_finished_task(task_manager):
+    """Test idle watchers get heartbeats and finished tasks end immediately"""
+    task_id = task_manager.create_task("idle question")
+    stream = task_manager.watch_task(task_id, heartbeat=0.01)
+    
+    assert (await stream.__anext__()).status == TaskStatus.PENDING
+    assert await stream.__anext__() is None
+    await stream.aclose()
+    
+    await task_manager.execute_task(task_id)
+    snapshots = [s async for s in task_manager.watch_task(task_id)]
+    assert [s.status for s in snapshots] == [TaskStatus.COMPLETED]
+
+
+@pytest.mark.asyncio
+async def test_wait_for_task_returns_on_completion(task_manager):
+    """Test a long-poll returns as soon as the task finishes"""
+    release = asyncio.Event()
+    
+    async def slow_extract(question, **kwargs):
+        await release.wait()
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+    
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=slow_extract)
+    task_id = task_manager.create_task("polled question")
+    runner = asyncio.create_task(task_manager.execute_task(task_id))
+    
+    waiter = asyncio.create_task(task_manager.wait_for_task(task_id, 30))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    
+    release.set()
+    task = await asyncio.wait_for(waiter, 1)
+    await runner
+    
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result.question == "polled question"
+    assert not task_manager._completions
+
+
+@pytest.mark.asyncio
+async def test_wait_for_task_times_out_with_active_task(task_manager):
+    """Test a long-poll returns the unfinished task when the wait expires"""
+    task_id = task_manager.create_task("slow question")
+    
+    task = await task_manager.wait_for_task(task_id, 0.01)
+    
+    assert task.status == TaskStatus.PENDING
+    assert await task_manager.wait_for_task("missing", 0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_batch_group_counts_and_streamed_results(task_manager):
+    """Test a batch creates a group whose results stream as tasks finish"""
+    await task_manager.execute_task(task_manager.create_task("cached question"))
+    
+    group = task_manager.create_group(["cached question", "fresh one", "fresh two"])
+    status = task_manager.get_group_status(group.group_id)
+    assert status.total == 3
+    assert status.counts[TaskStatus.COMPLETED] == 1
+    assert status.counts[TaskStatus.PENDING] == 2
+    assert task_manager.get_task(group.task_ids[1]).metadata["priority"] == "low"
+    
+    results = [
+        s async for s in task_manager.watch_group(group.group_id, heartbeat=1)
+        if s is not None
+    ]
+    
+    assert sorted(r.result.question for r in results) == ["cached question", "fresh one", "fresh two"]
+    status = task_manager.get_group_status(group.group_id)
+    assert status.done is True
+    assert status.counts[TaskStatus.COMPLETED] == 3
+    assert not task_manager.events.has_subscribers(f"group:{group.group_id}")
+    await task_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_rejected_when_queue_cannot_hold_it(task_manager):
+    """Test an oversized batch is rejected without creating tasks"""
+    task_manager.scheduler.max_queue_depth = 2
+    
+    with pytest.raises(QueueFullError):
+        task_manager.create_group(["one", "two", "three"])
+    with pytest.raises(ValueError):
+        task_manager.create_group([])
+    
+    assert task_manager.get_statistics()["total"] == 0
+    assert not task_manager.groups
+
+
+@pytest.mark.asyncio
+async def test_failed_extractions_lower_concurrency_limit(task_manager):
+    """Test extraction failures feed the adaptive concurrency limit"""
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(
+        side_effect=RuntimeError("429 Too Many Requests")
+    )
+    
+    await task_manager.execute_task(task_manager.create_task("overloaded"))
+    
+    assert task_manager.semaphore.limit == 1
+    assert task_manager.semaphore.get_statistics()["decreases"] == 1
+    assert task_manager.semaphore.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_fails_fast_while_circuit_open(task_manager):
+    """Test tasks are not queued while a dependency's circuit is open"""
+    await task_manager.execute_task(task_manager.create_task("water pressure"))
+    breaker = task_manager.extraction_service.llm_breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    
+    task_id = task_manager.create_task("new question")
+    with pytest.raises(CircuitOpenError):
+        task_manager.submit_task(task_id)
+    
+    task = task_manager.get_task(task_id)
+    assert task.status == TaskStatus.FAILED
+    assert "llm is unavailable" in task.error
+    assert len(task_manager.scheduler) == 0
+    
+    # Cached answers are still served
+    cached = task_manager.create_task("water pressure")
+    assert task_manager.submit_task(cached) is None
+    assert task_manager.get_task(cached).status == TaskStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_token_usage_reported_on_task_and_stats(task_manager):
+    """Test the LLM tokens of a run land in task metadata and the totals"""
+    async def extract(question, usage=None, **kwargs):
+        usage.add(1200, 300)
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=extract)
+    task_manager.token_usage.prompt_price = 1.0
+    task_manager.token_usage.completion_price = 4.0
+    
+    task_id = task_manager.create_task("water pressure")
+    await task_manager.execute_task(task_id)
+    
+    tokens = task_manager.get_task(task_id).metadata["tokens"]
+    assert tokens["total_tokens"] == 1500
+    assert tokens["llm_calls"] == 1
+    
+    stats = task_manager.get_token_statistics()
+    assert stats["runs"] == 1
+    assert stats["prompt_tokens"] == 1200
+    assert stats["avg_tokens_per_run"] == 1500
+    assert stats["cost_usd"] == pytest.approx(0.0024)
+
+
+@pytest.mark.asyncio
+async def test_token_usage_saved_through_store(task_manager):
+    """Test token metadata is saved while the run's tasks are still running"""
+    async def extract(question, usage=None, **kwargs):
+        usage.add(800, 200)
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=extract)
+    saved = []
+    save = task_manager.store.save
+    
+    def record_save(task):
+        saved.append((task.status, task.metadata.get("tokens")))
+        save(task)
+    
+    task_id = task_manager.create_task("water pressure")
+    with patch.object(task_manager.store, "save", side_effect=record_save):
+        await task_manager.execute_task(task_id)
+    
+    assert any(
+        status == TaskStatus.RUNNING and tokens and tokens["total_tokens"] == 1000
+        for status, tokens in saved
+    )
+
+
+@pytest.mark.asyncio
+async def test_cancelled_run_tokens_counted_without_run(task_manager):
+    """Test a cancelled run adds its tokens to the totals but no run"""
+    started = asyncio.Event()
+    
+    async def hanging_extract(question, usage=None, **kwargs):
+        usage.add(800, 200)
+        started.set()
+        await asyncio.sleep(60)
+    
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=hanging_extract)
+    task_id = task_manager.create_task("slow question")
+    task_manager.submit_task(task_id)
+    await asyncio.wait_for(started.wait(), 1)
+    
+    assert task_manager.cancel_task(task_id) is True
+    cancelled_at = task_manager.get_task(task_id).updated_at
+    for _ in range(5):
+        await asyncio.sleep(0)
+    
+    stats = task_manager.get_token_statistics()
+    assert stats["total_tokens"] == 1000
+    assert stats["runs"] == 0
+    
+    task = task_manager.get_task(task_id)
+    assert task.status == TaskStatus.CANCELLED
+    assert task.metadata["tokens"]["total_tokens"] == 1000
+    assert task.updated_at > cancelled_at
+    await task_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_task_cancelled_during_shared_run_gets_tokens(task_manager):
+    """Test a task leaving a shared run still has the run's tokens recorded"""
+    release = asyncio.Event()
+    
+    async def slow_extract(question, usage=None, **kwargs):
+        await release.wait()
+        usage.add(800, 200)
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+    
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=slow_extract)
+    first = task_manager.create_task("popular question")
+    runs = [asyncio.create_task(task_manager.execute_task(first))]
+    await asyncio.sleep(0.01)
+    joiner = task_manager.create_task("popular question")
+    runs.append(asyncio.create_task(task_manager.execute_task(joiner)))
+    await asyncio.sleep(0.01)
+    
+    assert task_manager.cancel_task(joiner) is True
+    runs[1].cancel()
+    release.set()
+    await asyncio.gather(*runs, return_exceptions=True)
+    
+    assert task_manager.get_task(first).status == TaskStatus.COMPLETED
+    assert task_manager.get_task(joiner).status == TaskStatus.CANCELLED
+    for task_id in (first, joiner):
+        assert task_manager.get_task(task_id).metadata["tokens"]["total_tokens"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_task_json_serves_result_serialized_at_completion(task_manager):
+    """Test task reads reuse the result bytes serialized when the task finished"""
+    big = ExtractionResult(
+        url="https://www.reddit.com/answers/abc",
+        question="big question",
+        sections=[ContentSection(heading="Answer", content=["x" * 2000])]
+    )
+    task_manager.extraction_service.extract_reddit_answers = AsyncMock(return_value=big)
+    small_id = task_manager.create_task("water pressure")
+    big_id = task_manager.create_task("big question")
+    await task_manager.execute_task(small_id)
+    await task_manager.execute_task(big_id)
+    
+    for task_id in (small_id, big_id):
+        stored = task_manager.get_task(task_id, load_result=False)
+        expected = task_manager.task_snapshot(task_manager.get_task(task_id))
+        assert json.loads(task_manager.task_status_json(stored)) == json.loads(expected.model_dump_json())
+    assert task_manager.get_task(big_id, load_result=False).result is None
+    assert task_manager.result_json.get_statistics()["hits"] == 2
+    
+    listing = json.loads(task_manager.task_list_json(task_manager.list_tasks(load_results=False)))
+    assert [t["task_id"] for t in listing] == [big_id, small_id]
+    assert listing[0]["result"] == json.loads(big.model_dump_json())
+    
+    # Without the cache the spilled bytes are read back as stored
+    task_manager.result_json.discard(big_id)
+    with patch.object(task_manager.result_spill, "load", side_effect=AssertionError):
+        data = task_manager.task_status_json(task_manager.get_task(big_id, load_result=False))
+    assert json.loads(data)["result"]["question"] == "big question"
+
+
+@pytest.mark.asyncio
+async def test_task_etags_change_with_updates(task_manager):
+    """Test task and listing ETags change exactly when tasks are updated"""
+    first = task_manager.create_task("water pressure")
+    second = task_manager.create_task("leaky faucet")
+    
+    pending = task_manager.task_status_etag(task_manager.get_task(second))
+    listing = task_manager.task_list_etag(task_manager.list_tasks())
+    assert task_manager.task_status_etag(task_manager.get_task(second)) == pending
+    
+    await task_manager.execute_task(first)
+    assert task_manager.task_list_etag(task_manager.list_tasks()) != listing
+    assert task_manager.task_status_etag(task_manager.get_task(second)) == pending
+    
+    task_manager.update_task_status(second, TaskStatus.RUNNING, progress="Starting extraction...")
+    assert task_manager.task_status_etag(task_manager.get_task(second)) != pending
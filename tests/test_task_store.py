@@ -0,0 +1,267 @@
+"""
+Tests for task storage backends.
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+from src.models import ExtractionResult, TaskGroupInfo, TaskInfo, TaskStatus
+from src.services.task_manager import TaskManager
+from src.services.task_store import MemoryTaskStore, SQLiteTaskStore
+
+
+def make_task(task_id: str, status: TaskStatus = TaskStatus.PENDING, offset: int = 0) -> TaskInfo:
+    created = datetime(2025, 1, 1) + timedelta(seconds=offset)
+    return TaskInfo(
+        task_id=task_id,
+        status=status,
+        question=f"question {task_id}",
+        created_at=created,
+        updated_at=created
+    )
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_persists_across_reopen(tmp_path):
+    """Test tasks survive closing and reopening the database"""
+    path = str(tmp_path / "tasks.db")
+    store = SQLiteTaskStore(path)
+    task = make_task("t1")
+    store.add(task)
+    task.status = TaskStatus.COMPLETED
+    task.result = ExtractionResult(url="https://www.reddit.com/answers/abc", question="q")
+    store.save(task)
+    await store.close()
+    
+    reopened = SQLiteTaskStore(path)
+    loaded = reopened.get("t1")
+    assert loaded.status == TaskStatus.COMPLETED
+    assert loaded.result.url == "https://www.reddit.com/answers/abc"
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cancelled_task_only_takes_cancelled_writes(tmp_path):
+    """Test a cancelled row ignores other statuses but keeps metadata updates"""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    store.add(make_task("t1", TaskStatus.CANCELLED))
+    store.flush()
+    
+    store.save(make_task("t1", TaskStatus.COMPLETED))
+    store.flush()
+    assert store.reload("t1").status == TaskStatus.CANCELLED
+    
+    cancelled = make_task("t1", TaskStatus.CANCELLED)
+    cancelled.metadata["tokens"] = {"total_tokens": 1000}
+    store.save(cancelled)
+    store.flush()
+    assert store.reload("t1").metadata["tokens"] == {"total_tokens": 1000}
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_list_and_counts(tmp_path):
+    """Test listing is newest first, filterable, and counts group by status"""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"), batch_size=2)
+    store.add(make_task("old", TaskStatus.COMPLETED, offset=0))
+    store.add(make_task("mid", TaskStatus.FAILED, offset=1))
+    store.add(make_task("new", TaskStatus.COMPLETED, offset=2))
+    
+    assert [t.task_id for t in store.list()] == ["new", "mid", "old"]
+    assert [t.task_id for t in store.list(status=TaskStatus.COMPLETED, limit=1)] == ["new"]
+    
+    counts = store.count_by_status()
+    assert counts[TaskStatus.COMPLETED] == 2
+    assert counts[TaskStatus.FAILED] == 1
+    assert counts[TaskStatus.PENDING] == 0
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_unfinished_tasks_requeued_on_start(tmp_path):
+    """Test PENDING and RUNNING tasks are resumed after a restart"""
+    path = str(tmp_path / "tasks.db")
+    store = SQLiteTaskStore(path)
+    store.add(make_task("pending", TaskStatus.PENDING))
+    store.add(make_task("running", TaskStatus.RUNNING, offset=1))
+    store.add(make_task("done", TaskStatus.COMPLETED, offset=2))
+    await store.close()
+    
+    with patch.dict('os.environ', {
+        'OPENAI_API_KEY': 'test_key',
+        'RESULT_CACHE_BACKEND': 'none',
+        'RESULT_SPILL_ENABLED': 'false'
+    }):
+        manager = TaskManager(store=SQLiteTaskStore(path))
+    manager.extraction_service.start = AsyncMock()
+    manager.submit_task = lambda task_id, force=False: None
+    
+    await manager.start()
+    
+    assert manager.get_task("pending").status == TaskStatus.PENDING
+    assert manager.get_task("running").status == TaskStatus.PENDING
+    assert manager.get_task("running").metadata["progress"] == "Re-queued after restart"
+    assert manager.get_task("done").status == TaskStatus.COMPLETED
+    await manager.store.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_evicts_finished_tasks(tmp_path):
+    """Test eviction by age and count folds tasks into persistent counters"""
+    path = str(tmp_path / "tasks.db")
+    store = SQLiteTaskStore(path)
+    store.add(make_task("stale", TaskStatus.FAILED, offset=0))
+    store.add(make_task("older", TaskStatus.COMPLETED, offset=100))
+    store.add(make_task("newest", TaskStatus.COMPLETED, offset=200))
+    store.add(make_task("active", TaskStatus.RUNNING, offset=0))
+    
+    evicted = store.evict_finished(datetime(2025, 1, 1, 0, 0, 50), keep=1)
+    
+    assert evicted == {"stale": TaskStatus.FAILED, "older": TaskStatus.COMPLETED}
+    assert store.get("active") is not None
+    assert store.get("newest") is not None
+    await store.close()
+    
+    reopened = SQLiteTaskStore(path)
+    counts = reopened.evicted_counts()
+    assert counts[TaskStatus.FAILED] == 1
+    assert counts[TaskStatus.COMPLETED] == 1
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_status_counts_follow_writes_and_backfill(tmp_path):
+    """Test status counts are kept by the writes and built once for old databases"""
+    path = str(tmp_path / "tasks.db")
+    store = SQLiteTaskStore(path)
+    store.add(make_task("a", TaskStatus.RUNNING, offset=0))
+    store.add(make_task("b", TaskStatus.RUNNING, offset=1))
+    store.flush()
+    task = store.get("a")
+    task.status = TaskStatus.COMPLETED
+    store.save(task)
+    store.evict_finished(datetime(2026, 1, 1), keep=0)
+    
+    counts = store.count_by_status()
+    assert counts[TaskStatus.RUNNING] == 1
+    assert counts[TaskStatus.COMPLETED] == 0
+    
+    # A database from before the counts table gets it filled on open
+    with store._lock:
+        store._conn.executescript(
+            "DROP TRIGGER tasks_count_insert; DROP TRIGGER tasks_count_update; "
+            "DROP TRIGGER tasks_count_delete; DROP TABLE task_status_counts;"
+        )
+    await store.close()
+    
+    reopened = SQLiteTaskStore(path)
+    assert reopened.count_by_status()[TaskStatus.RUNNING] == 1
+    reopened.add(make_task("c", TaskStatus.PENDING, offset=2))
+    assert reopened.count_by_status()[TaskStatus.PENDING] == 1
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_keeps_groups_through_eviction(tmp_path):
+    """Test stored groups count their tasks, evicted ones included, until evicted"""
+    path = str(tmp_path / "tasks.db")
+    store = SQLiteTaskStore(path)
+    for offset, task_id in enumerate(("g1", "g2")):
+        task = make_task(task_id, TaskStatus.RUNNING, offset=offset)
+        task.metadata["group_id"] = "group"
+        store.add(task)
+    store.add_group(TaskGroupInfo(group_id="group", created_at=datetime(2025, 1, 1), task_ids=["g1", "g2"]))
+    task = store.get("g1")
+    task.status = TaskStatus.FAILED
+    store.save(task)
+    store.evict_finished(datetime(2026, 1, 1), keep=0)
+    await store.close()
+    
+    reopened = SQLiteTaskStore(path)
+    group = reopened.get_group("group")
+    assert group.task_ids == ["g1", "g2"]
+    assert group.counts[TaskStatus.FAILED] == 1
+    assert group.counts[TaskStatus.RUNNING] == 1
+    assert reopened.get_group("missing") is None
+    
+    assert reopened.evict_groups(datetime(2026, 1, 1)) == 0
+    task = reopened.get("g2")
+    task.status = TaskStatus.COMPLETED
+    reopened.save(task)
+    assert reopened.evict_groups(datetime(2026, 1, 1)) == 1
+    assert reopened.get_group("group") is None
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_group_status_after_restart(tmp_path):
+    """Test a group created before a restart can still be read"""
+    path = str(tmp_path / "tasks.db")
+    env = {
+        'OPENAI_API_KEY': 'test_key',
+        'RESULT_CACHE_BACKEND': 'none',
+        'RESULT_SPILL_ENABLED': 'false'
+    }
+    with patch.dict('os.environ', env):
+        manager = TaskManager(store=SQLiteTaskStore(path))
+    manager.submit_task = lambda task_id, force=False: None
+    group = manager.create_group(["first question", "second question"])
+    manager.update_task_status(group.task_ids[0], TaskStatus.COMPLETED)
+    await manager.store.close()
+    
+    with patch.dict('os.environ', env):
+        restarted = TaskManager(store=SQLiteTaskStore(path))
+    status = restarted.get_group_status(group.group_id)
+    assert status.task_ids == group.task_ids
+    assert status.finished == 1
+    assert status.counts[TaskStatus.PENDING] == 1
+    assert not status.done
+    
+    restarted.update_task_status(group.task_ids[1], TaskStatus.COMPLETED)
+    assert restarted.get_group_status(group.group_id).done
+    await restarted.store.close()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Each task store backend"""
+    if request.param == "memory":
+        yield MemoryTaskStore()
+    else:
+        store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+        yield store
+        store.flush()
+
+
+def test_cursor_pagination(store):
+    """Test keyset pagination with after/before cursors"""
+    for i in range(5):
+        store.add(make_task(f"t{i}", offset=i))
+    
+    first_page = store.list(limit=2)
+    assert [t.task_id for t in first_page] == ["t4", "t3"]
+    
+    second_page = store.list(limit=2, after=first_page[-1].task_id)
+    assert [t.task_id for t in second_page] == ["t2", "t1"]
+    
+    previous_page = store.list(limit=2, before=second_page[0].task_id)
+    assert [t.task_id for t in previous_page] == ["t4", "t3"]
+    
+    with pytest.raises(ValueError, match="Unknown cursor"):
+        store.list(after="missing")
+
+
+def test_status_index_tracks_transitions(store):
+    """Test per-status listing and counts follow status updates"""
+    for i in range(3):
+        store.add(make_task(f"t{i}", offset=i))
+    
+    task = store.get("t1")
+    task.status = TaskStatus.COMPLETED
+    store.save(task)
+    
+    assert [t.task_id for t in store.list(status=TaskStatus.PENDING)] == ["t2", "t0"]
+    assert [t.task_id for t in store.list(status=TaskStatus.COMPLETED)] == ["t1"]
+    counts = store.count_by_status()
+    assert counts[TaskStatus.PENDING] == 2
+    assert counts[TaskStatus.COMPLETED] == 1
+    assert [t.task_id for t in store.unfinished()] == ["t0", "t2"]
@@ -0,0 +1,43 @@
+"""
+Tests for LLM token accounting.
+"""
+import pytest
+from src.services.token_usage import TokenUsage
+
+
+def test_usage_cost_and_budget():
+    """Test cost follows the configured prices and budgets trip at their limit"""
+    usage = TokenUsage(prompt_price=2.5, completion_price=10.0)
+    usage.add(100_000, 10_000)
+    usage.add(100_000, 10_000)
+
+    assert usage.total_tokens == 220_000
+    assert usage.cost == pytest.approx(0.7)
+    assert usage.exceeded() is None
+    assert usage.exceeded(max_tokens=300_000, max_cost=1.0) is None
+    assert "Token budget" in usage.exceeded(max_tokens=220_000)
+    assert "Cost budget" in usage.exceeded(max_cost=0.5)
+
+
+def test_merge_counts_runs():
+    """Test merged runs add up in the totals"""
+    total = TokenUsage()
+    run = TokenUsage()
+    run.add(10, 5)
+    total.merge(run)
+    total.merge(run)
+
+    assert total.to_dict()["total_tokens"] == 30
+    assert total.calls == 2
+    assert total.runs == 2
+
+
+def test_merge_without_run():
+    """Test usage merged without a run adds tokens but no run"""
+    total = TokenUsage()
+    run = TokenUsage()
+    run.add(10, 5)
+    total.merge(run, count_run=False)
+
+    assert total.total_tokens == 15
+    assert total.runs == 0
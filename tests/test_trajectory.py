@@ -0,0 +1,88 @@
+"""
+Tests for recorded agent trajectories.
+"""
+from src.services.trajectory import QUESTION_PLACEHOLDER, TrajectoryStore, navigation_steps
+
+QUESTION = "best budget headphones"
+
+
+def step(actions, error=None, elements=None):
+    return {
+        "model_output": {
+            "evaluation_previous_goal": "",
+            "memory": "",
+            "next_goal": f"Work on {QUESTION}",
+            "action": actions
+        },
+        "result": [{"error": error}],
+        "state": {
+            "url": "https://www.reddit.com/answers/",
+            "title": "Reddit Answers",
+            "tabs": [{"url": "https://www.reddit.com/answers/"}],
+            "interacted_element": elements or [None] * len(actions),
+            "screenshot_path": "/tmp/shot.png"
+        },
+        "metadata": {"step_number": 1, "step_start_time": 0.0, "step_end_time": 1.0}
+    }
+
+
+HISTORY = {
+    "history": [
+        step([{"navigate": {"url": "https://www.reddit.com/answers/", "new_tab": False}}]),
+        step([{"input": {"index": 12, "text": QUESTION}}], elements=[{"x_path": "html/body/form/input"}]),
+        step([{"click": {"index": 40}}], error="Element not found"),
+        step([{"navigate": {"url": "https://www.reddit.com/answers/?q=best+budget+headphones"}}]),
+        step([{"scroll": {"down": True}}, {"click": {"index": 7}}]),
+        step([{"extract": {"query": "related posts"}}]),
+        step([{"scroll": {"down": True}}]),
+        step([{"done": {"text": "{}", "success": True}}])
+    ]
+}
+
+
+def test_navigation_steps_stop_at_extraction():
+    """Test only the successful steps before the first extraction are kept"""
+    steps = navigation_steps(HISTORY, QUESTION)
+
+    assert [next(iter(s["model_output"]["action"][0])) for s in steps] == ["navigate", "input", "navigate", "scroll"]
+    assert steps[1]["model_output"]["action"][0]["input"]["text"] == QUESTION_PLACEHOLDER
+    assert steps[2]["model_output"]["action"][0]["navigate"]["url"].endswith("?q={{question_plus}}")
+    assert steps[1]["state"]["interacted_element"] == [{"x_path": "html/body/form/input"}]
+    assert steps[0]["state"]["screenshot_path"] is None
+    assert steps[0]["result"] == []
+
+
+def test_store_round_trip_substitutes_question(tmp_path):
+    """Test a recorded trajectory is persisted and replayed for a new question"""
+    store = TrajectoryStore(str(tmp_path / "trajectory.json"))
+    assert store.load("anything") is None
+    assert store.record(HISTORY, QUESTION)
+
+    reloaded = TrajectoryStore(str(tmp_path / "trajectory.json"))
+    history = reloaded.load("how to fix a leaky faucet")
+    steps = history["history"]
+    assert len(steps) == 4
+    assert steps[1]["model_output"]["action"][0]["input"]["text"] == "how to fix a leaky faucet"
+    assert reloaded.get_statistics()["steps"] == 4
+
+
+def test_discard_after_consecutive_failed_replays(tmp_path):
+    """Test failed replays drop the trajectory only after max_failures in a row"""
+    path = tmp_path / "trajectory.json"
+    store = TrajectoryStore(str(path), max_failures=2)
+    store.record(HISTORY, QUESTION)
+
+    assert not store.mark_failed()
+    store.mark_replayed()
+    assert not store.mark_failed()
+    assert path.exists()
+    assert store.load(QUESTION) is not None
+
+    assert store.mark_failed()
+    assert not path.exists()
+    assert store.load(QUESTION) is None
+    assert store.get_statistics()["replay_failures_total"] == 3
+    assert store.get_statistics()["consecutive_failures"] == 0
+
+    # Nothing replayable is not recorded
+    assert not store.record({"history": [HISTORY["history"][5]]}, QUESTION)
@@ -0,0 +1,89 @@
+"""
+Tests for the shared work queue.
+"""
+import time
+import pytest
+from src.models import TaskPriority
+from src.services.scheduler import QueueFullError
+from src.services.work_queue import SQLiteWorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), lease_seconds=30, max_depth=5)
+    yield queue
+    queue.close()
+
+
+def test_claims_by_priority_then_fifo(queue):
+    """Test higher priorities are claimed first and ties keep submission order"""
+    queue.enqueue("low", TaskPriority.LOW)
+    queue.enqueue("normal-1")
+    queue.enqueue("high", TaskPriority.HIGH)
+    assert queue.enqueue("normal-2") == 3
+
+    order = [queue.claim("worker") for _ in range(4)]
+    assert order == ["high", "normal-1", "normal-2", "low"]
+    assert queue.claim("worker") is None
+
+
+def test_groups_take_turns_with_interactive_tasks(queue):
+    """Test a batch queued first does not hold back later interactive tasks"""
+    for i in range(3):
+        queue.enqueue(f"batch-{i}", group="g1")
+    queue.enqueue("interactive")
+
+    order = [queue.claim("worker") for _ in range(4)]
+    assert order == ["batch-0", "interactive", "batch-1", "batch-2"]
+
+
+def test_claims_are_exclusive_until_the_lease_expires(tmp_path):
+    """Test a second process cannot claim a leased task until its lease lapses"""
+    path = str(tmp_path / "queue.db")
+    first = SQLiteWorkQueue(path, lease_seconds=0.05)
+    second = SQLiteWorkQueue(path, lease_seconds=0.05)
+    first.enqueue("task")
+
+    assert first.claim("w1") == "task"
+    assert second.claim("w2") is None
+    assert first.renew("task", "w1")
+
+    time.sleep(0.1)
+    assert second.claim("w2") == "task"
+    assert not first.renew("task", "w1")
+
+    # Only the current owner can finish it
+    first.complete("task", "w1")
+    assert len(second) == 0 and second.get_statistics()["claimed"] == 1
+    second.complete("task", "w2")
+    assert second.get_statistics()["claimed"] == 0
+    first.close()
+    second.close()
+
+
+def test_remove_revokes_the_claim(queue):
+    """Test removing a claimed task makes the owner's renewal fail"""
+    queue.enqueue("task")
+    queue.claim("worker")
+
+    assert queue.remove("task")
+    assert not queue.renew("task", "worker")
+    assert not queue.remove("task")
+
+
+def test_depth_limit_and_release(queue):
+    """Test the depth limit counts waiting tasks and released tasks wait again"""
+    for i in range(5):
+        queue.enqueue(f"task-{i}")
+    with pytest.raises(QueueFullError):
+        queue.enqueue("overflow")
+    with pytest.raises(QueueFullError):
+        queue.enqueue_many([("a", TaskPriority.NORMAL, None), ("b", TaskPriority.NORMAL, None)])
+
+    task_id = queue.claim("worker")
+    assert queue.position(task_id) is None
+    queue.enqueue("sixth")
+
+    queue.release(task_id, "worker")
+    assert queue.position(task_id) == 1
+    assert queue.get_statistics()["depth"] == 6
@@ -0,0 +1,168 @@
+"""
+Tests for queue execution mode and the extraction worker.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from src.models import ContentSection, ExtractionResult, TaskStatus
+from src.services.task_manager import TaskManager
+from src.services.task_store import SQLiteTaskStore
+from src.services.work_queue import SQLiteWorkQueue
+from src.worker import ExtractionWorker
+
+
+@pytest.fixture
+def shared(tmp_path):
+    """API and worker task managers sharing one store file and one queue"""
+    with patch.dict('os.environ', {
+        'OPENAI_API_KEY': 'test_key',
+        'RESULT_CACHE_BACKEND': 'none',
+        'RESULT_SPILL_DIR': str(tmp_path / 'results')
+    }):
+        store_path = str(tmp_path / "tasks.db")
+        api = TaskManager(
+            store=SQLiteTaskStore(store_path, track_changes=True),
+            work_queue=SQLiteWorkQueue(str(tmp_path / "queue.db"))
+        )
+        worker_manager = TaskManager(
+            max_concurrent_tasks=2,
+            store=SQLiteTaskStore(store_path, track_changes=True)
+        )
+    worker_manager.extraction_service.extract_reddit_answers = AsyncMock(
+        side_effect=lambda question, **kwargs: ExtractionResult(
+            url="https://www.reddit.com/answers/abc",
+            question=question,
+            sections=[ContentSection(heading="Answer", content=["text"])]
+        )
+    )
+    worker = ExtractionWorker(
+        worker_manager,
+        SQLiteWorkQueue(str(tmp_path / "queue.db")),
+        worker_id="worker-1"
+    )
+    yield api, worker
+    api.work_queue.close()
+    worker.work_queue.close()
+
+
+@pytest.mark.asyncio
+async def test_api_enqueues_and_worker_writes_result_back(shared):
+    """Test a task submitted to the API runs on the worker and syncs back"""
+    api, worker = shared
+    task_id = api.create_task("water pressure")
+    assert api.submit_task(task_id) == 1
+    assert api.get_queue_statistics()["depth"] == 1
+
+    waiter = asyncio.create_task(api.wait_for_task(task_id, timeout=5))
+    assert await worker.claim_next() == task_id
+    await asyncio.gather(*worker._runners.values())
+
+    assert api.sync_shared_updates() == 1
+    task = await waiter
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result.sections[0].content == ["text"]
+    assert api.get_queue_statistics()["claimed"] == 0
+    assert api.get_statistics()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancel_through_queue_stops_worker_run(shared):
+    """Test cancelling in the API removes the entry and stops the worker's run"""
+    api, worker = shared
+    release = asyncio.Event()
+
+    async def slow_extract(question, **kwargs):
+        await release.wait()
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+
+    worker.task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=slow_extract)
+    task_id = api.create_task("water pressure")
+    api.submit_task(task_id)
+    await worker.claim_next()
+    await asyncio.sleep(0.01)
+
+    # The claim check notices the removed queue entry well before the
+    # next renewal of the 60 second lease and stops the run
+    worker.cancel_check_interval = 0.01
+    renewer = asyncio.create_task(worker._renew_loop())
+    runner = worker._runners[task_id]
+    assert api.cancel_task(task_id)
+    api.store.flush()
+    try:
+        await asyncio.wait_for(asyncio.gather(runner, return_exceptions=True), 0.5)
+    finally:
+        renewer.cancel()
+
+    assert runner.cancelled()
+    assert not release.is_set()
+    assert worker.task_manager.store.get(task_id).status == TaskStatus.CANCELLED
+    assert worker.task_manager.semaphore.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_finishing_after_cancel_does_not_revive_task(shared):
+    """Test a result written after the API cancelled the task is discarded"""
+    api, worker = shared
+    release = asyncio.Event()
+
+    async def slow_extract(question, **kwargs):
+        await release.wait()
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+
+    worker.task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=slow_extract)
+    task_id = api.create_task("water pressure")
+    api.submit_task(task_id)
+    await worker.claim_next()
+    await asyncio.sleep(0.01)
+
+    # Cancelled before the worker's next renewal, then the run finishes
+    assert api.cancel_task(task_id)
+    api.store.flush()
+    release.set()
+    await asyncio.gather(*worker._runners.values())
+
+    api.sync_shared_updates()
+    assert api.get_task(task_id).status == TaskStatus.CANCELLED
+    assert worker.task_manager.store.reload(task_id).status == TaskStatus.CANCELLED
+
+
+@pytest.mark.asyncio
+async def test_worker_metadata_reaches_api(shared):
+    """Test metadata set by the worker on a task is saved to the shared store"""
+    api, worker = shared
+    release = asyncio.Event()
+
+    async def slow_extract(question, **kwargs):
+        await release.wait()
+        return ExtractionResult(url="https://www.reddit.com/answers/abc", question=question)
+
+    worker.task_manager.extraction_service.extract_reddit_answers = AsyncMock(side_effect=slow_extract)
+    first = api.create_task("water pressure")
+    second = api.create_task("Water pressure?")
+    api.submit_task(first)
+    api.submit_task(second)
+    await worker.claim_next()
+    await asyncio.sleep(0.01)
+    await worker.claim_next()
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(*worker._runners.values())
+
+    api.sync_shared_updates()
+    assert api.get_task(second).metadata["coalesced"] is True
+    assert "coalesced" not in api.get_task(first).metadata
+
+
+def test_worker_needs_sqlite_store():
+    """Test a worker refuses a task manager on the process-local store"""
+    with patch.dict('os.environ', {'OPENAI_API_KEY': 'test_key', 'TASK_STORE': 'memory'}):
+        manager = TaskManager()
+    with pytest.raises(ValueError):
+        ExtractionWorker(manager, work_queue=None)
+
+
+def test_queue_mode_needs_sqlite_store(tmp_path):
+    """Test queue execution mode refuses a process-local store"""
+    with patch.dict('os.environ', {'OPENAI_API_KEY': 'test_key', 'TASK_STORE': 'memory'}):
+        with pytest.raises(ValueError):
+            TaskManager(work_queue=SQLiteWorkQueue(str(tmp_path / "queue.db")))